@@ -8,9 +8,9 @@ from typing import Optional, Sequence, Union
 
 from gridsync import APP_NAME
 from gridsync import __doc__ as description
-from gridsync import __version__, msg
-from gridsync.core import Core
+from gridsync import __version__
 from gridsync.errors import FilesystemLockError
+from gridsync.profiling import ImportTimer
 
 
 class TahoeVersion(argparse.Action):
@@ -36,12 +36,31 @@ def main() -> Union[int, str]:
         action=TahoeVersion,
         help="Call 'tahoe --version-and-path' and exit. For debugging.",
     )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Write the time taken to import each module, and to reach each "
+        "stage of starting up, to the debug log. For debugging.",
+    )
     parser.add_argument(
         "-V", "--version", action="version", version="%(prog)s " + __version__
     )
 
+    args = parser.parse_args()
+
+    # The (GUI and Twisted) imports below are the bulk of what happens
+    # before anything appears on screen, so time them if asked to
+    import_timer = ImportTimer() if args.profile_startup else None
+    if import_timer is not None:
+        import_timer.install()
+    from gridsync import msg
+    from gridsync.core import Core
+
+    if import_timer is not None:
+        import_timer.uninstall()
+
     try:
-        Core(parser.parse_args()).start()
+        Core(args, import_timer).start()
     except FilesystemLockError:
         msg.critical(
             "{} already running".format(APP_NAME),
@@ -1,32 +1,85 @@
 # -*- coding: utf-8 -*-
 
+import os
+import threading
 from collections import defaultdict
-from configparser import NoOptionError, NoSectionError, RawConfigParser
+from configparser import RawConfigParser
 from typing import Optional
 
 from atomicwrites import atomic_write
 
+# Parsed configuration files, by (absolute) path, along with the inode,
+# modification time, and size of the file when it was parsed
+_cache: dict[str, tuple[tuple[int, int, int], dict]] = {}
+_cache_lock = threading.Lock()
+
+
+def _stat_key(path: str) -> Optional[tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _parse(path: str) -> dict:
+    config = RawConfigParser(allow_no_value=True)
+    config.read(path)
+    settings_dict: defaultdict = defaultdict(dict)
+    for section in config.sections():
+        for option, value in config.items(section):
+            settings_dict[section][option] = value
+    return dict(settings_dict)
+
 
 class Config:
+    """
+    Read and write an ini-syntax configuration file.
+
+    Parsed files are cached -- and shared between ``Config`` instances for
+    the same file -- until the file's inode, modification time, or size
+    changes, so that repeated reads are dictionary lookups (plus a ``stat``)
+    rather than re-parsing the file each time.
+    """
+
     def __init__(self, filename: str) -> None:
         self.filename = filename
 
+    def _read(self) -> dict:
+        path = os.path.abspath(self.filename)
+        # Stat before parsing, so that a change made while parsing can only
+        # cause an unnecessary re-parse later (rather than a stale result)
+        key = _stat_key(path)
+        with _cache_lock:
+            cached = _cache.get(path)
+        if key is not None and cached is not None and cached[0] == key:
+            return cached[1]
+        settings_dict = _parse(path)
+        if key is not None:
+            with _cache_lock:
+                _cache[path] = (key, settings_dict)
+        return settings_dict
+
+    def _write(self, config: RawConfigParser) -> None:
+        with atomic_write(self.filename, mode="w", overwrite=True) as f:
+            config.write(f)
+        with _cache_lock:
+            _cache.pop(os.path.abspath(self.filename), None)
+
     def set(self, section: str, option: str, value: str) -> None:
         config = RawConfigParser(allow_no_value=True)
         config.read(self.filename)
         if not config.has_section(section):
             config.add_section(section)
         config.set(section, option, value)
-        with atomic_write(self.filename, mode="w", overwrite=True) as f:
-            config.write(f)
+        self._write(config)
 
     def get(self, section: str, option: str) -> Optional[str]:
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
-        try:
-            return config.get(section, option)
-        except (NoOptionError, NoSectionError):
+        options = self._read().get(section)
+        if options is None:
             return None
+        # Option names are case-insensitive (see RawConfigParser.optionxform)
+        return options.get(option.lower())
 
     def save(self, settings_dict: dict) -> None:
         config = RawConfigParser(allow_no_value=True)
@@ -36,14 +89,10 @@ class Config:
                 config.add_section(section)
             for option, value in d.items():
                 config.set(section, option, value)
-        with atomic_write(self.filename, mode="w", overwrite=True) as f:
-            config.write(f)
+        self._write(config)
 
     def load(self) -> dict:
-        config = RawConfigParser(allow_no_value=True)
-        config.read(self.filename)
-        settings_dict: defaultdict = defaultdict(dict)
-        for section in config.sections():
-            for option, value in config.items(section):
-                settings_dict[section][option] = value
-        return dict(settings_dict)
+        # Copied, so that callers can't modify the cached values
+        return {
+            section: dict(options) for section, options in self._read().items()
+        }
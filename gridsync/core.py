@@ -2,11 +2,12 @@
 from __future__ import annotations
 
 import argparse
-import collections
 import logging
 import os
 import sys
+import time
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Optional, Union
 
 from qtpy.QtCore import Qt
@@ -58,7 +59,12 @@ qtreactor.install()  # type: ignore
 
 # pylint: disable=wrong-import-order
 from twisted.internet import reactor
-from twisted.internet.defer import Deferred, DeferredList, inlineCallbacks
+from twisted.internet.defer import (
+    Deferred,
+    DeferredList,
+    inlineCallbacks,
+    succeed,
+)
 from twisted.python.log import PythonLoggingObserver, startLogging
 
 from gridsync import (
@@ -73,22 +79,29 @@ from gridsync import (
 from gridsync.desktop import autostart_enable
 from gridsync.gui import Gui
 from gridsync.lock import FilesystemLock
-from gridsync.magic_folder import MagicFolder
+from gridsync.log_buffer import LogBuffer, shared_log_budget
 from gridsync.preferences import get_preference, set_preference
+from gridsync.profiling import ImportTimer, process_started
+from gridsync.system import get_version, which
 from gridsync.tahoe import Tahoe, get_nodedirs
 from gridsync.tor import get_tor
 from gridsync.types import TwistedDeferred
+from gridsync.util import PhaseTimer
 
 app.setWindowIcon(QIcon(resource(settings["application"]["tray_icon"])))
 
+# The output of each executable's "--version", along with the size and
+# modification time of the executable when it was run
+version_cache_path = Path(config_dir, "versions.json")
+
 
-class DequeHandler(logging.Handler):
-    def __init__(self, deque: collections.deque) -> None:
+class LogBufferHandler(logging.Handler):
+    def __init__(self, buffer: LogBuffer) -> None:
         super().__init__()
-        self.deque = deque
+        self.buffer = buffer
 
     def emit(self, record: logging.LogRecord) -> None:
-        self.deque.append(self.format(record))
+        self.buffer.append(self.format(record).encode("utf-8"))
 
 
 class LogFormatter(logging.Formatter):
@@ -99,33 +112,45 @@ class LogFormatter(logging.Formatter):
 
 
 class Core:
-    def __init__(self, args: argparse.Namespace) -> None:
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        import_timer: Optional[ImportTimer] = None,
+    ) -> None:
         self.args = args
+        self.import_timer = import_timer
+        self.initialized: Optional[float] = None
         self.gateways: list = []
         self.tahoe_version: str = ""
         self.magic_folder_version: str = ""
-        log_deque_maxlen = 100000  # XXX
+        self.startup_timer = PhaseTimer(APP_NAME)
+        log_buffer_maxlen = 100000  # XXX
+        log_budget = shared_log_budget()
         debug_settings = settings.get("debug")
         if debug_settings:
             log_maxlen = debug_settings.get("log_maxlen")
             if log_maxlen is not None:
-                log_deque_maxlen = int(log_maxlen)
-        self.log_deque: collections.deque = collections.deque(
-            maxlen=log_deque_maxlen
+                log_buffer_maxlen = int(log_maxlen)
+            log_max_bytes = debug_settings.get("log_max_bytes")
+            if log_max_bytes is not None:
+                log_budget.max_bytes = int(log_max_bytes)
+        self.log_buffer = LogBuffer(
+            maxlen=log_buffer_maxlen, budget=log_budget
         )
 
         self.initialize_logger(self.args.debug)
         # The `Gui` object must be initialized after initialize_logger,
         # otherwise log messages will be duplicated.
         self.gui = Gui(self)
+        self.initialized = time.time()
 
     def initialize_logger(self, to_stdout: bool = False) -> None:
-        handler: Union[logging.StreamHandler, DequeHandler]
+        handler: Union[logging.StreamHandler, LogBufferHandler]
         if to_stdout:
             handler = logging.StreamHandler(stream=sys.stdout)
             startLogging(sys.stdout)
         else:
-            handler = DequeHandler(self.log_deque)
+            handler = LogBufferHandler(self.log_buffer)
             observer = PythonLoggingObserver()
             observer.start()
         fmt = "%(asctime)s %(levelname)s %(funcName)s %(message)s"
@@ -137,8 +162,9 @@ class Core:
 
     @inlineCallbacks
     def get_tahoe_version(self) -> TwistedDeferred[None]:
-        tahoe = Tahoe()
-        version = yield Deferred.fromCoroutine(tahoe.command(["--version"]))
+        version = yield Deferred.fromCoroutine(
+            get_version(which("tahoe"), version_cache_path)
+        )
         if version:
             self.tahoe_version = version.split("\n")[0]
             if self.tahoe_version.startswith("tahoe-lafs: "):
@@ -146,8 +172,9 @@ class Core:
 
     @inlineCallbacks
     def get_magic_folder_version(self) -> TwistedDeferred[None]:
-        magic_folder = MagicFolder(Tahoe())
-        version = yield Deferred.fromCoroutine(magic_folder.version())
+        version = yield Deferred.fromCoroutine(
+            get_version(which("magic-folder"), version_cache_path)
+        )
         if version:
             self.magic_folder_version = version.lstrip("Magic Folder version ")
 
@@ -166,7 +193,7 @@ class Core:
             )
 
     @inlineCallbacks
-    def _get_executable_versions(self) -> TwistedDeferred[None]:
+    def _get_tahoe_version(self) -> TwistedDeferred[None]:
         try:
             yield self.get_tahoe_version()
         except Exception as e:  # pylint: disable=broad-except
@@ -174,6 +201,9 @@ class Core:
                 "Error getting Tahoe-LAFS version",
                 "{}: {}".format(type(e).__name__, str(e)),
             )
+
+    @inlineCallbacks
+    def _get_magic_folder_version(self) -> TwistedDeferred[None]:
         try:
             yield self.get_magic_folder_version()
         except Exception as e:  # pylint: disable=broad-except
@@ -182,40 +212,92 @@ class Core:
                 "{}: {}".format(type(e).__name__, str(e)),
             )
 
+    @inlineCallbacks
+    def _get_executable_versions(self) -> TwistedDeferred[None]:
+        yield DeferredList(
+            [self._get_tahoe_version(), self._get_magic_folder_version()],
+            consumeErrors=True,
+        )
+        self.startup_timer.mark("versions")
+
+    @inlineCallbacks
+    def _warn_if_tor_unavailable(
+        self, gateways: list[Tahoe]
+    ) -> TwistedDeferred[None]:
+        tor_gateways = [
+            gateway
+            for gateway in gateways
+            if gateway.config_get("connections", "tcp") == "tor"
+        ]
+        if not tor_gateways:
+            return
+        tor_available = yield get_tor(reactor)
+        self.startup_timer.mark("tor")
+        if tor_available:
+            return
+        for gateway in tor_gateways:
+            logging.error("No running tor daemon found")
+            msg.error(
+                self.gui.main_window,
+                "Error Connecting To Tor Daemon",
+                'The "{}" connection is configured to use Tor, '
+                "however, no running tor daemon was found.\n\n"
+                "This connection will be disabled until you launch "
+                "Tor again.".format(gateway.name),
+            )
+
     @inlineCallbacks
     def start_gateways(self) -> TwistedDeferred[None]:
+        if self.startup_timer.started is None:  # Not profiling from launch
+            self.startup_timer.start()
+        self.startup_timer.mark("reactor running")
         nodedirs = get_nodedirs(config_dir)
+        started = []
         if nodedirs:
             minimize_preference = get_preference("startup", "minimize")
             if not minimize_preference or minimize_preference == "false":
                 self.gui.show_main_window()
-            tor_available = yield get_tor(reactor)
             logging.debug("Starting Tahoe-LAFS gateway(s)...")
-            for nodedir in nodedirs:
-                gateway = Tahoe(nodedir)
-                tcp = gateway.config_get("connections", "tcp")
-                if tcp == "tor" and not tor_available:
-                    logging.error("No running tor daemon found")
-                    msg.error(
-                        self.gui.main_window,
-                        "Error Connecting To Tor Daemon",
-                        'The "{}" connection is configured to use Tor, '
-                        "however, no running tor daemon was found.\n\n"
-                        "This connection will be disabled until you launch "
-                        "Tor again.".format(gateway.name),
-                    )
-                self.gateways.append(gateway)
-                self._start_gateway(gateway)
+            gateways = [Tahoe(nodedir) for nodedir in nodedirs]
+            self.gateways.extend(gateways)
+            # The gateways are started concurrently; neither they, nor the
+            # GUI, need to wait for one another (or for Tor discovery)
+            started = [self._start_gateway(gateway) for gateway in gateways]
             self.gui.populate(self.gateways)
+            for gateway in self.gateways:
+                # Show the last-known state of each folder while starting
+                # XXX Something should handle errors
+                Deferred.fromCoroutine(
+                    gateway.magic_folder.monitor.load_file_index()
+                )
             cheatcode = settings.get("connection", {}).get("default")
             if cheatcode and not cheatcode_used(cheatcode):
                 self.gui.show_welcome_dialog()
+            tor_checked = self._warn_if_tor_unavailable(gateways)
         else:
             self.gui.show_welcome_dialog()
             if DEFAULT_AUTOSTART:
                 autostart_enable()
                 self.gui.preferences_window.general_pane.load_preferences()
-        yield self._get_executable_versions()
+            tor_checked = succeed(None)
+        yield DeferredList(
+            [tor_checked, self._get_executable_versions()], consumeErrors=True
+        )
+        yield DeferredList(started, consumeErrors=True)
+        self.startup_timer.mark("gateways started")
+        logging.debug("Startup timings:\n%s", self.get_startup_report())
+
+    def get_startup_report(self) -> str:
+        """
+        Return a summary of how long each phase of starting up took (in
+        seconds since ``start_gateways`` was called -- or, if started with
+        ``--profile-startup``, since the process was launched -- or since
+        each gateway began starting).
+        """
+        lines = [f"{APP_NAME}: {self.startup_timer.report()}"]
+        for gateway in self.gateways:
+            lines.append(f"{gateway.name}: {gateway.startup_timer.report()}")
+        return "\n".join(lines)
 
     @staticmethod
     def show_message() -> None:
@@ -260,7 +342,23 @@ class Core:
             ]
         )
 
+    def _start_profiling(self) -> None:
+        # Time each phase from when the process was launched, so that the
+        # trace also covers the interpreter's own startup and all imports
+        self.startup_timer.start(process_started())
+        if self.import_timer is not None:
+            # Anything imported before the timer was installed (such as the
+            # gridsync package itself) is only accounted for here
+            self.startup_timer.mark(
+                "import timer installed", self.import_timer.started
+            )
+            self.startup_timer.mark("imports done", self.import_timer.stopped)
+            logging.debug("Import times:\n%s", self.import_timer.report())
+        self.startup_timer.mark("core initialized", self.initialized)
+
     def start(self) -> None:
+        if self.args.profile_startup:
+            self._start_profiling()
         try:
             os.makedirs(config_dir)
         except OSError:
@@ -271,6 +369,7 @@ class Core:
             os.path.join(config_dir, "{}.lock".format(APP_NAME))
         )
         lock.acquire()
+        self.startup_timer.mark("lock acquired")
 
         logging.debug("Core starting with args: %s", self.args)
         logging.debug("Loaded config.txt settings: %s", settings)
@@ -278,6 +377,7 @@ class Core:
         self.show_message()
 
         self.gui.show_systray()
+        self.startup_timer.mark("systray shown")
 
         reactor.callLater(0, self.start_gateways)  # type: ignore
         reactor.addSystemEventTrigger(  # type: ignore
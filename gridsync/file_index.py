@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import attr
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred
+
+# folder, relpath, size, mtime, last_updated
+_FileRow = tuple[str, str, Optional[int], Optional[float], Optional[float]]
+
+
+@attr.s
+class FileIndexChanges:
+    """
+    The differences found by a single ``FileIndex`` update.
+
+    Each attribute is a list of file status entries (as returned by
+    Magic-Folder's **GET /v1/magic-folder/<folder>/file-status** endpoint,
+    with an additional "path" key giving the resolved local path).
+    ``updated`` contains every entry that was added or replaced, including
+    those whose changes are not reflected in any of the other lists.
+    """
+
+    added: list[dict] = attr.ib(default=attr.Factory(list))
+    updated: list[dict] = attr.ib(default=attr.Factory(list))
+    removed: list[dict] = attr.ib(default=attr.Factory(list))
+    mtime_updated: list[dict] = attr.ib(default=attr.Factory(list))
+    size_updated: list[dict] = attr.ib(default=attr.Factory(list))
+    modified: list[dict] = attr.ib(default=attr.Factory(list))
+
+
+def _entry_size(entry: dict) -> int:
+    return int(entry.get("size") or 0)  # XXX "size" is None if deleted
+
+
+class FileIndex:
+    """
+    The most recently seen file status of a single Magic-Folder, indexed by
+    relpath.
+
+    Entries are retained between updates (along with their resolved local
+    paths and the folder's total size and latest mtime) so that an update
+    only needs to do any real work for the entries that actually changed.
+
+    Updates may be applied all at once with ``update`` or, for entries that
+    are parsed incrementally, with ``start_update``, ``add`` and
+    ``finish_update``.
+
+    :ivar files: The current file status entries, keyed by relpath.
+    :ivar total_size: The sum of the sizes of all current entries.
+    :ivar latest_mtime: The most recent "last-updated" time of any entry.
+    :ivar updating: Whether an incremental update is in progress.
+    """
+
+    def __init__(self, magic_path: str) -> None:
+        self.magic_path = magic_path
+        self.files: dict[str, dict] = {}
+        self.total_size: int = 0
+        self.latest_mtime: int = 0
+        self._seen: set[str] = set()
+        self._changes = FileIndexChanges()
+        self._latest_mtime_stale = False
+        self.updating = False
+
+    def start_update(self) -> None:
+        self.updating = True
+        self._seen = set()
+        self._changes = FileIndexChanges()
+        self._latest_mtime_stale = False
+
+    def _remove(self, relpath: str) -> dict:
+        entry = self.files.pop(relpath)
+        self.total_size -= _entry_size(entry)
+        if entry.get("last-updated", 0) >= self.latest_mtime:
+            self._latest_mtime_stale = True
+        return entry
+
+    def _insert(self, relpath: str, entry: dict) -> None:
+        self.files[relpath] = entry
+        self.total_size += _entry_size(entry)
+        mtime = entry.get("last-updated", 0)
+        if mtime >= self.latest_mtime:
+            # Nothing else in the index can be newer than this entry
+            self.latest_mtime = mtime
+            self._latest_mtime_stale = False
+
+    def add(self, entry: dict) -> None:
+        """
+        Apply a single file status entry to the index.
+        """
+        relpath = entry.get("relpath", "")
+        self._seen.add(relpath)
+        previous = self.files.get(relpath)
+        if previous is None:
+            entry["path"] = str(Path(self.magic_path, relpath).resolve())
+            self._insert(relpath, entry)
+            self._changes.added.append(entry)
+            self._changes.updated.append(entry)
+            return
+        mtime = entry.get("mtime")
+        size = entry.get("size")
+        if (
+            mtime == previous.get("mtime")
+            and size == previous.get("size")
+            and entry.get("last-updated") == previous.get("last-updated")
+        ):
+            return  # Unchanged
+        # The relpath (and so the resolved path) is the same as before
+        entry["path"] = previous.get("path", "")
+        self._remove(relpath)
+        self._insert(relpath, entry)
+        self._changes.updated.append(entry)
+        modified = False
+        if mtime != previous.get("mtime", 0):
+            modified = True
+            self._changes.mtime_updated.append(entry)
+        if size != previous.get("size", 0):
+            modified = True
+            self._changes.size_updated.append(entry)
+        if modified:
+            self._changes.modified.append(entry)
+
+    def finish_update(self, remove_missing: bool = True) -> FileIndexChanges:
+        """
+        Complete the current update.
+
+        :param remove_missing: Whether to remove the entries which were not
+            seen during this update. This should be ``False`` if the update
+            was interrupted before all entries could be received.
+
+        :return: The changes made to the index by the update.
+        """
+        if remove_missing and len(self._seen) != len(self.files):
+            for relpath in [r for r in self.files if r not in self._seen]:
+                self._changes.removed.append(self._remove(relpath))
+        if self._latest_mtime_stale:
+            self.latest_mtime = max(
+                (e.get("last-updated", 0) for e in self.files.values()),
+                default=0,
+            )
+        changes = self._changes
+        self.updating = False
+        self._seen = set()
+        self._changes = FileIndexChanges()
+        self._latest_mtime_stale = False
+        return changes
+
+    def load_entry(self, entry: dict) -> None:
+        """
+        Add an entry (that already includes its "path") to the index without
+        recording it as a change; used to restore a previously saved index.
+        """
+        self._insert(entry.get("relpath", ""), entry)
+
+    def update(self, entries: list[dict]) -> FileIndexChanges:
+        """
+        Replace the contents of the index with the given file status entries.
+
+        :return: The changes made to the index.
+        """
+        self.start_update()
+        for entry in entries:
+            self.add(entry)
+        return self.finish_update()
+
+
+class FileIndexStore:
+    """
+    An on-disk (SQLite) copy of the ``FileIndex`` of each Magic-Folder.
+
+    This allows the last-known state of every folder to be shown as soon
+    as the application starts, before Magic-Folder is running and the
+    (potentially very large) file status of each folder can be requested.
+    Only the fields needed to reconstruct an index are stored.
+
+    Reads and writes are made on a single worker thread (in the order in
+    which they were requested), so that loading or saving a large index
+    doesn't block the reactor.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        # Each worker thread (see _get_executor) has its own connection, so
+        # that a worker started after ``close`` never shares the connection
+        # that its predecessor is closing.
+        self._local = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="FileIndexStore"
+            )
+        return self._executor
+
+    def wait(self) -> None:
+        """
+        Block until every write requested so far has been made.
+        """
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection: Optional[sqlite3.Connection] = getattr(
+            self._local, "connection", None
+        )
+        if connection is None:
+            connection = sqlite3.connect(str(self.path))
+            self._local.connection = connection
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS folders "
+                    "(name TEXT PRIMARY KEY, magic_path TEXT NOT NULL)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS files ("
+                    "folder TEXT NOT NULL, "
+                    "relpath TEXT NOT NULL, "
+                    "size INTEGER, "
+                    "mtime NUMERIC, "
+                    "last_updated NUMERIC, "
+                    "PRIMARY KEY (folder, relpath)"
+                    ") WITHOUT ROWID"
+                )
+        return connection
+
+    def _close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def close(self) -> None:
+        """
+        Close the database once any pending writes have been made, without
+        waiting for them.
+        """
+        executor = self._executor
+        if executor is None:
+            return
+        self._executor = None
+        executor.submit(self._close)
+        executor.shutdown(wait=False)
+
+    def load(self) -> Deferred[dict[str, FileIndex]]:
+        """
+        Read the stored indexes (once any pending writes have been made).
+
+        :return: A Deferred that fires with a dict mapping folder names to
+            their ``FileIndex``; this is empty if nothing has been stored
+            (or the store is unreadable).
+        """
+        d: Deferred[dict[str, FileIndex]] = Deferred()
+
+        def deliver(future: Future[dict[str, FileIndex]]) -> None:
+            try:
+                result = future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                reactor.callFromThread(d.errback, e)  # type: ignore
+            else:
+                reactor.callFromThread(d.callback, result)  # type: ignore
+
+        self._get_executor().submit(self._load).add_done_callback(deliver)
+        return d
+
+    def _load(self) -> dict[str, FileIndex]:
+        if not self.path.exists():
+            return {}
+        indexes: dict[str, FileIndex] = {}
+        roots: dict[str, str] = {}
+        try:
+            connection = self._connect()
+            for name, magic_path in connection.execute(
+                "SELECT name, magic_path FROM folders"
+            ):
+                indexes[name] = FileIndex(magic_path)
+                # Resolved once per folder (like the paths that
+                # FileIndex.add resolves) so that joining is enough for
+                # each entry below, avoiding a syscall per entry.
+                roots[name] = str(Path(magic_path).resolve())
+            for (
+                folder,
+                relpath,
+                size,
+                mtime,
+                last_updated,
+            ) in connection.execute(
+                "SELECT folder, relpath, size, mtime, last_updated "
+                "FROM files"
+            ):
+                index = indexes.get(folder)
+                if index is None:
+                    continue
+                index.load_entry(
+                    {
+                        "relpath": relpath,
+                        "path": os.path.join(roots[folder], relpath),
+                        "size": size,
+                        "mtime": mtime,
+                        "last-updated": last_updated,
+                    }
+                )
+        except sqlite3.Error as e:
+            logging.warning("Error loading file index %s: %s", self.path, e)
+            return {}
+        return indexes
+
+    def save(
+        self, folder_name: str, index: FileIndex, changes: FileIndexChanges
+    ) -> None:
+        """
+        Write the changes made to a folder's ``FileIndex`` by an update (in
+        the background; see ``wait``).
+        """
+        # Copied now, since the index may change before the rows are written
+        updated: list[_FileRow] = [
+            (
+                folder_name,
+                entry.get("relpath", ""),
+                entry.get("size"),
+                entry.get("mtime"),
+                entry.get("last-updated"),
+            )
+            for entry in changes.updated
+        ]
+        removed = [
+            (folder_name, entry.get("relpath", ""))
+            for entry in changes.removed
+        ]
+        self._get_executor().submit(
+            self._save, folder_name, index.magic_path, updated, removed
+        )
+
+    def _save(
+        self,
+        folder_name: str,
+        magic_path: str,
+        updated: list[_FileRow],
+        removed: list[tuple[str, str]],
+    ) -> None:
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO folders (name, magic_path) "
+                    "VALUES (?, ?)",
+                    (folder_name, magic_path),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO files "
+                    "(folder, relpath, size, mtime, last_updated) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    updated,
+                )
+                connection.executemany(
+                    "DELETE FROM files WHERE folder = ? AND relpath = ?",
+                    removed,
+                )
+        except sqlite3.Error as e:
+            logging.warning("Error saving file index %s: %s", self.path, e)
+
+    def remove(self, folder_name: str) -> None:
+        """
+        Remove a folder (and all of its entries) from the store (in the
+        background; see ``wait``).
+        """
+        self._get_executor().submit(self._remove, folder_name)
+
+    def _remove(self, folder_name: str) -> None:
+        if not self.path.exists():
+            return
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "DELETE FROM files WHERE folder = ?", (folder_name,)
+                )
+                connection.execute(
+                    "DELETE FROM folders WHERE name = ?", (folder_name,)
+                )
+        except sqlite3.Error as e:
+            logging.warning("Error saving file index %s: %s", self.path, e)
@@ -2,14 +2,19 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
-from typing import TYPE_CHECKING, Optional
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterator, Optional
 
 from gridsync import autostart_file_path, config_dir, pkgdir
 from gridsync.crypto import trunchash
 
 if TYPE_CHECKING:
     from gridsync.core import Core
+    from gridsync.log_buffer import LogBuffer
 
 
 def get_filters(core: Core) -> list:
@@ -112,11 +117,94 @@ def get_filters(core: Core) -> list:
     return filters
 
 
+def _overlap_tails(x: str, y: str) -> list[str]:
+    """
+    Return the remainders of ``y`` that would follow ``x`` in any text in
+    which an occurrence of ``y`` begins within, and runs past the end of,
+    an occurrence of ``x``.
+    """
+    tails = []
+    pos = x.find(y[0])
+    while pos != -1:
+        overlap = len(x) - pos
+        if len(y) > overlap and y.startswith(x[pos:]):
+            tails.append(y[overlap:])
+        pos = x.find(y[0], pos + 1)
+    return tails
+
+
+def _compile_filters(
+    replacements: list[tuple[str, str]]
+) -> Optional[tuple[re.Pattern, dict[str, str], dict[str, re.Pattern]]]:
+    """
+    Compile the (secret, replacement) pairs into a single pattern which, at
+    each position, matches whichever secret comes first in ``replacements``.
+
+    Replacing the matches of that pattern in one pass gives the same result
+    as replacing each secret in turn (in the output of the last) as long as
+    no occurrences of the secrets overlap in ways that the earlier
+    replacements would have changed. This returns ``None`` if that can be
+    ruled out in advance -- because a secret could match part of an earlier
+    secret's replacement or contains an earlier secret -- and otherwise
+    returns, for each secret, a pattern matching any text which, following
+    an occurrence of that secret, would complete an overlapping occurrence.
+    """
+    masks: dict[str, str] = {}
+    for i, (secret, replacement) in enumerate(replacements):
+        if "<" in secret or ">" in secret:
+            return None
+        # Including the earlier replacements of this same secret (which a
+        # duplicate filter would be applied to)
+        if any(secret in r for _, r in replacements[:i]):
+            return None
+        masks.setdefault(secret, replacement)
+    secrets = list(masks)
+    overlaps: dict[str, re.Pattern] = {}
+    for i, x in enumerate(secrets):
+        if any(y in x for y in secrets[:i]):
+            return None
+        tails = [t for y in secrets for t in _overlap_tails(x, y)]
+        if tails:
+            overlaps[x] = re.compile("|".join(re.escape(t) for t in tails))
+    pattern = re.compile("|".join(re.escape(s) for s in secrets))
+    return pattern, masks, overlaps
+
+
+def _replace_in_one_pass(
+    in_str: str,
+    pattern: re.Pattern,
+    masks: dict[str, str],
+    overlaps: dict[str, re.Pattern],
+) -> Optional[str]:
+    pieces = []
+    last = 0
+    for match in pattern.finditer(in_str):
+        secret = match.group(0)
+        overlap = overlaps.get(secret)
+        if overlap is not None and overlap.match(in_str, match.end()):
+            return None
+        pieces.append(in_str[last : match.start()])
+        pieces.append(masks[secret])
+        last = match.end()
+    pieces.append(in_str[last:])
+    return "".join(pieces)
+
+
 def apply_filters(in_str: str, filters: list) -> str:
+    replacements = [
+        (s, "<Filtered:{}>".format(mask)) for s, mask in filters if s and mask
+    ]
+    if not replacements:
+        return in_str
+    compiled = _compile_filters(replacements)
+    if compiled is not None:
+        filtered = _replace_in_one_pass(in_str, *compiled)
+        if filtered is not None:
+            return filtered
+    # Overlapping secrets; fall back to replacing one secret at a time
     filtered = in_str
-    for s, mask in filters:
-        if s and mask:
-            filtered = filtered.replace(s, "<Filtered:{}>".format(mask))
+    for s, replacement in replacements:
+        filtered = filtered.replace(s, replacement)
     return filtered
 
 
@@ -134,192 +222,262 @@ def apply_filter(
         dictionary[key] = get_mask(value, tag, identifier=identifier)
 
 
-def _apply_filter_by_action_type(  # noqa: max-complexity=30
-    msg: dict, action_type: str, identifier: Optional[str] = None
-) -> dict:
-    if action_type == "dirnode:add-file":
-        apply_filter(msg, "name", "Path")
-
-    elif action_type == "invite-to-magic-folder":
-        apply_filter(msg, "nickname", "MemberName")
-
-    elif action_type == "join-magic-folder":
-        apply_filter(msg, "local_dir", "Path")
-        apply_filter(msg, "invite_code", "InviteCode")
-
-    elif action_type == "magic-folder-db:update-entry":
-        apply_filter(msg, "last_downloaded_uri", "Capability")
-        apply_filter(msg, "last_uploaded_uri", "Capability")
-        apply_filter(msg, "relpath", "Path")
-
-    elif action_type == "magic-folder:add-pending":
-        apply_filter(msg, "relpath", "Path")
-
-    elif action_type == "magic-folder:downloader:get-latest-file":
-        apply_filter(msg, "name", "Path")
-
-    elif action_type == "magic-folder:full-scan":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:iteration":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:notified":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-        apply_filter(msg, "path", "Path")
-
-    elif action_type == "magic-folder:process-directory":
-        apply_filter(msg, "created_directory", "Path")
-
-    elif action_type == "magic-folder:process-item":
-        item = msg.get("item")
-        if item:
-            relpath = item.get("relpath")
-            if relpath:
-                msg["item"]["relpath"] = get_mask(relpath, "Path")
-
-    elif action_type == "magic-folder:processing-loop":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:remove-from-pending":
-        apply_filter(msg, "relpath", "Path")
-        pending = msg.get("pending")
-        if pending:
-            new = []
-            for path in pending:
-                new.append(get_mask(path, "Path"))
-            msg["pending"] = new
-
-    elif action_type == "magic-folder:rename-conflicted":
-        apply_filter(msg, "abspath_u", "Path")
-        apply_filter(msg, "replacement_path_u", "Path")
-        apply_filter(msg, "result", "Path")
-
-    elif action_type == "magic-folder:rename-deleted":
-        apply_filter(msg, "abspath_u", "Path")
-        apply_filter(msg, "result", "Path")
-
-    elif action_type == "magic-folder:scan-remote-dmd":
-        apply_filter(msg, "nickname", "MemberName")
-
-    elif action_type == "magic-folder:start-downloading":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:start-monitoring":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:start-uploading":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:stop":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:stop-monitoring":
-        apply_filter(msg, "nickname", "GatewayName", identifier)
-
-    elif action_type == "magic-folder:write-downloaded-file":
-        apply_filter(msg, "abspath", "Path")
-
-    elif action_type == "notify-when-pending":
-        apply_filter(msg, "filename", "Path")
-
-    elif action_type == "watchdog:inotify:any-event":
-        apply_filter(msg, "path", "Path")
-
-    return msg
-
-
-def _apply_filter_by_message_type(  # noqa: max-complexity
-    msg: dict, message_type: str
-) -> dict:
-    if message_type == "fni":
-        apply_filter(msg, "info", "Event")
-
-    elif message_type == "magic-folder:add-to-download-queue":
-        apply_filter(msg, "relpath", "Path")
-
-    elif message_type == "magic-folder:all-files":
-        files = msg.get("files")
-        if files:
-            new = []
-            for path in files:
-                new.append(get_mask(path, "Path"))
-            msg["files"] = new
-
-    elif message_type == (
-        "magic-folder:downloader:get-latest-file:collective-scan"
-    ):
-        dmds = msg.get("dmds")
-        if dmds:
-            new = []
-            for dmd in dmds:
-                new.append(get_mask(dmd, "MemberName"))
-            msg["dmds"] = new
-
-    elif message_type == "magic-folder:item:status-change":
-        apply_filter(msg, "relpath", "Path")
-
-    elif message_type == "magic-folder:maybe-upload":
-        apply_filter(msg, "relpath", "Path")
-
-    elif message_type == "magic-folder:notified-object-disappeared":
-        apply_filter(msg, "path", "Path")
-
-    elif message_type == "magic-folder:remote-dmd-entry":
-        apply_filter(msg, "relpath", "Path")
-        apply_filter(msg, "remote_uri", "Capability")
-        pathentry = msg.get("pathentry")
-        if pathentry:
-            last_downloaded_uri = pathentry.get("last_downloaded_uri")
-            if last_downloaded_uri:
-                pathentry["last_downloaded_uri"] = get_mask(
-                    last_downloaded_uri, "Capability"
-                )
-            last_uploaded_uri = pathentry.get("last_uploaded_uri")
-            if last_uploaded_uri:
-                pathentry["last_uploaded_uri"] = get_mask(
-                    last_uploaded_uri, "Capability"
-                )
-
-    elif message_type == "magic-folder:scan-batch":
-        batch = msg.get("batch")
-        if batch:
-            new = []
-            for path in batch:
-                new.append(get_mask(path, "Path"))
-            msg["batch"] = new
-
-    elif message_type == "processing":
-        apply_filter(msg, "info", "Event")
-
-    return msg
+# The (possibly sensitive) fields of Eliot log messages, by action type
+# and by message type. Each rule is a (path, tag) pair, where the path is
+# the key of the field -- or, for fields of nested objects, a tuple of
+# keys -- and "*" stands for every item of a list. "GatewayName" fields are
+# masked with the gateway's identifier (if given) rather than with a hash.
+_ACTION_TYPE_RULES: dict[str, tuple] = {
+    "dirnode:add-file": (("name", "Path"),),
+    "invite-to-magic-folder": (("nickname", "MemberName"),),
+    "join-magic-folder": (
+        ("local_dir", "Path"),
+        ("invite_code", "InviteCode"),
+    ),
+    "magic-folder-db:update-entry": (
+        ("last_downloaded_uri", "Capability"),
+        ("last_uploaded_uri", "Capability"),
+        ("relpath", "Path"),
+    ),
+    "magic-folder:add-pending": (("relpath", "Path"),),
+    "magic-folder:downloader:get-latest-file": (("name", "Path"),),
+    "magic-folder:full-scan": (("nickname", "GatewayName"),),
+    "magic-folder:iteration": (("nickname", "GatewayName"),),
+    "magic-folder:notified": (
+        ("nickname", "GatewayName"),
+        ("path", "Path"),
+    ),
+    "magic-folder:process-directory": (("created_directory", "Path"),),
+    "magic-folder:process-item": ((("item", "relpath"), "Path"),),
+    "magic-folder:processing-loop": (("nickname", "GatewayName"),),
+    "magic-folder:remove-from-pending": (
+        ("relpath", "Path"),
+        (("pending", "*"), "Path"),
+    ),
+    "magic-folder:rename-conflicted": (
+        ("abspath_u", "Path"),
+        ("replacement_path_u", "Path"),
+        ("result", "Path"),
+    ),
+    "magic-folder:rename-deleted": (
+        ("abspath_u", "Path"),
+        ("result", "Path"),
+    ),
+    "magic-folder:scan-remote-dmd": (("nickname", "MemberName"),),
+    "magic-folder:start-downloading": (("nickname", "GatewayName"),),
+    "magic-folder:start-monitoring": (("nickname", "GatewayName"),),
+    "magic-folder:start-uploading": (("nickname", "GatewayName"),),
+    "magic-folder:stop": (("nickname", "GatewayName"),),
+    "magic-folder:stop-monitoring": (("nickname", "GatewayName"),),
+    "magic-folder:write-downloaded-file": (("abspath", "Path"),),
+    "notify-when-pending": (("filename", "Path"),),
+    "watchdog:inotify:any-event": (("path", "Path"),),
+}
+
+_MESSAGE_TYPE_RULES: dict[str, tuple] = {
+    "fni": (("info", "Event"),),
+    "magic-folder:add-to-download-queue": (("relpath", "Path"),),
+    "magic-folder:all-files": ((("files", "*"), "Path"),),
+    "magic-folder:downloader:get-latest-file:collective-scan": (
+        (("dmds", "*"), "MemberName"),
+    ),
+    "magic-folder:item:status-change": (("relpath", "Path"),),
+    "magic-folder:maybe-upload": (("relpath", "Path"),),
+    "magic-folder:notified-object-disappeared": (("path", "Path"),),
+    "magic-folder:remote-dmd-entry": (
+        ("relpath", "Path"),
+        ("remote_uri", "Capability"),
+        (("pathentry", "last_downloaded_uri"), "Capability"),
+        (("pathentry", "last_uploaded_uri"), "Capability"),
+    ),
+    "magic-folder:scan-batch": ((("batch", "*"), "Path"),),
+    "processing": (("info", "Event"),),
+}
+
+
+# Reused by ``filter_tahoe_log_message`` to avoid re-creating them (as
+# ``json.loads`` and ``json.dumps(sort_keys=True)`` would) for every message
+_json_decoder = json.JSONDecoder()
+_json_encoder = json.JSONEncoder(sort_keys=True)
+
+
+def _apply_rules(
+    msg: dict, rules: tuple, identifier: Optional[str] = None
+) -> None:
+    for path, tag in rules:
+        ident = identifier if tag == "GatewayName" else None
+        if isinstance(path, str):
+            apply_filter(msg, path, tag, ident)
+            continue
+        parent, key = path
+        container = msg.get(parent)
+        if not container:
+            continue
+        if key == "*":
+            msg[parent] = [get_mask(item, tag, ident) for item in container]
+        else:
+            apply_filter(container, key, tag, ident)
 
 
 def filter_tahoe_log_message(message: str, identifier: Optional[str]) -> str:
-    msg = json.loads(message)
+    msg = _json_decoder.decode(message)
 
     action_type = msg.get("action_type")
-    if action_type:
-        _apply_filter_by_action_type(msg, action_type, identifier)
+    if isinstance(action_type, str):
+        rules = _ACTION_TYPE_RULES.get(action_type)
+        if rules:
+            _apply_rules(msg, rules, identifier)
 
     message_type = msg.get("message_type")
-    if message_type:
-        _apply_filter_by_message_type(msg, message_type)
+    if isinstance(message_type, str):
+        rules = _MESSAGE_TYPE_RULES.get(message_type)
+        if rules:
+            _apply_rules(msg, rules, identifier)
 
-    return json.dumps(msg, sort_keys=True)
+    return _json_encoder.encode(msg)
 
 
 def filter_eliot_logs(
     messages: list[str], identifier: Optional[str] = None
 ) -> list[str]:
+    # Messages that cannot be parsed (and so cannot be filtered) are left
+    # out, as they are by ``LogRedactor``
     filtered = []
     for message in messages:
-        filtered.append(filter_tahoe_log_message(message, identifier))
+        try:
+            filtered.append(filter_tahoe_log_message(message, identifier))
+        except (ValueError, AttributeError):  # Not a JSON object
+            continue
     return filtered
 
 
+# Used in place of a gateway's identifier (i.e., its position in the list
+# of gateways, which may change) when masking "GatewayName" fields at ingest
+INGEST_IDENTIFIER = "*"
+
+
+class LogRedactor:
+    """
+    Filter Eliot log messages as they are received -- once each, on a
+    worker thread -- into a separate ``LogBuffer``, so that exporting the
+    filtered logs only needs to copy them.
+
+    Messages that cannot be parsed (and so cannot be filtered) are left
+    out of the filtered buffer. So are messages received while more than
+    ``max_pending_bytes`` are already waiting to be filtered, so that a
+    burst of logging can't hold an unbounded amount of (unfiltered) memory
+    outside of the buffer's ``LogBudget``.
+
+    :ivar buffer: The buffer in which to keep the filtered messages.
+    :ivar max_pending_bytes: The maximum number of bytes of messages to
+        hold while they wait to be filtered.
+    :ivar dropped: The number of messages dropped because too many bytes
+        were already waiting to be filtered.
+    """
+
+    def __init__(
+        self, buffer: LogBuffer, max_pending_bytes: int = 4 * 1024 * 1024
+    ) -> None:
+        self.buffer = buffer
+        self.max_pending_bytes = max_pending_bytes
+        self.dropped: int = 0
+        self._dropped_since_accepted: int = 0
+        self._pending_bytes: int = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # A single worker keeps the filtered messages in order
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="LogRedactor"
+            )
+        return self._executor
+
+    def add_message(self, message: bytes) -> None:
+        size = len(message)
+        with self._lock:
+            if self._pending_bytes + size > self.max_pending_bytes:
+                if not self._dropped_since_accepted:
+                    logging.warning(
+                        "Log redaction is falling behind; dropping messages"
+                    )
+                self.dropped += 1
+                self._dropped_since_accepted += 1
+                return
+            if self._dropped_since_accepted:
+                logging.warning(
+                    "Dropped %i messages while log redaction was behind",
+                    self._dropped_since_accepted,
+                )
+                self._dropped_since_accepted = 0
+            self._pending_bytes += size
+        self._get_executor().submit(self._redact, message)
+
+    def _redact(self, message: bytes) -> None:
+        try:
+            filtered = filter_tahoe_log_message(
+                message.decode("utf-8"), INGEST_IDENTIFIER
+            )
+        except (ValueError, AttributeError):  # Not a JSON object
+            return
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Error redacting log message")
+            return
+        finally:
+            with self._lock:
+                self._pending_bytes -= len(message)
+        self.buffer.append(filtered.encode("utf-8"))
+
+    def wait(self) -> None:
+        """
+        Block until every message added so far has been filtered.
+        """
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def stop(self) -> None:
+        """
+        Stop the worker thread (without waiting for it to finish filtering
+        the messages already added). A new worker is started if more
+        messages are added.
+        """
+        executor = self._executor
+        if executor is None:
+            return
+        self._executor = None
+        executor.shutdown(wait=False)
+
+    def iter_messages(self, identifier: str) -> Iterator[str]:
+        """
+        Yield the filtered messages, oldest first, masking "GatewayName"
+        fields with the given gateway identifier.
+        """
+        self.wait()
+        pending = get_mask("", "GatewayName", INGEST_IDENTIFIER)
+        mask = get_mask("", "GatewayName", identifier)
+        for message in self.buffer.iter_messages():
+            yield message.replace(pending, mask)
+
+    def tail_messages(
+        self, identifier: str, limit: int
+    ) -> tuple[list[str], int]:
+        """
+        Return the ``limit`` most recent filtered messages (as with
+        ``iter_messages``) and the number of earlier messages left out.
+        """
+        self.wait()
+        pending = get_mask("", "GatewayName", INGEST_IDENTIFIER)
+        mask = get_mask("", "GatewayName", identifier)
+        messages, omitted = self.buffer.tail(limit)
+        return [m.replace(pending, mask) for m in messages], omitted
+
+
 def join_eliot_logs(messages: list[str]) -> str:
     reordered = []
     for message in messages:
-        reordered.append(json.dumps(json.loads(message), sort_keys=True))
+        try:
+            reordered.append(json.dumps(json.loads(message), sort_keys=True))
+        except ValueError:  # Not valid JSON; include it as it is
+            reordered.append(message)
     return "\n".join(reordered)
@@ -1,12 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Protocol
+from typing import TYPE_CHECKING, Optional, Protocol
 
 import attr
 
 from gridsync.desktop import notify
-from gridsync.gui.debug import DebugExporter
 from gridsync.gui.main_window import MainWindow
 from gridsync.gui.preferences import PreferencesWindow
 from gridsync.gui.systray import SystemTrayIcon
@@ -15,16 +14,24 @@ from gridsync.preferences import Preferences
 
 if TYPE_CHECKING:
     from gridsync.core import Core
+    from gridsync.gui.debug import DebugExporter
 
 
 class AbstractGui(Protocol):
     core: Core
 
-    welcome_dialog: WelcomeDialog
     main_window: MainWindow
     unread_messages: list[tuple]
     systray: SystemTrayIcon
 
+    @property
+    def welcome_dialog(self) -> WelcomeDialog:
+        pass
+
+    @property
+    def preferences_window(self) -> PreferencesWindow:
+        pass
+
     def show(self) -> None:
         pass
 
@@ -53,31 +60,43 @@ class Gui:
     preferences: Preferences = attr.ib(default=attr.Factory(Preferences))
     unread_messages: list[tuple] = attr.ib(default=attr.Factory(list))
 
-    welcome_dialog: WelcomeDialog = attr.ib()
     main_window: MainWindow = attr.ib()
-    preferences_window: PreferencesWindow = attr.ib()
     systray: SystemTrayIcon = attr.ib()
-    debug_exporter: DebugExporter = attr.ib()
 
-    @welcome_dialog.default
-    def _default_welcome_dialog(self) -> WelcomeDialog:
-        return WelcomeDialog(self, [])
+    # Secondary windows are created on first use (see the properties below)
+    _welcome_dialog: Optional[WelcomeDialog] = attr.ib(default=None)
+    _preferences_window: Optional[PreferencesWindow] = attr.ib(default=None)
+    _debug_exporter: Optional[DebugExporter] = attr.ib(default=None)
 
     @main_window.default
     def _main_window_default(self) -> MainWindow:
         return MainWindow(self)
 
-    @preferences_window.default
-    def _default_preferences_window(self) -> PreferencesWindow:
-        return PreferencesWindow(self.preferences)
-
     @systray.default
     def _systray_default(self) -> SystemTrayIcon:
         return SystemTrayIcon(self)
 
-    @debug_exporter.default
-    def _debug_exporter_default(self) -> DebugExporter:
-        return DebugExporter(self.core)
+    @property
+    def welcome_dialog(self) -> WelcomeDialog:
+        if self._welcome_dialog is None:
+            self._welcome_dialog = WelcomeDialog(self, [])
+        return self._welcome_dialog
+
+    @property
+    def preferences_window(self) -> PreferencesWindow:
+        if self._preferences_window is None:
+            self._preferences_window = PreferencesWindow(self.preferences)
+        return self._preferences_window
+
+    @property
+    def debug_exporter(self) -> DebugExporter:
+        # Created (and its module imported) on first use, since it is not
+        # needed until the user asks to export debug information
+        if self._debug_exporter is None:
+            from gridsync.gui.debug import DebugExporter
+
+            self._debug_exporter = DebugExporter(self.core)
+        return self._debug_exporter
 
     def show_message(
         self, title: str, message: str, duration: int = 5000
@@ -118,7 +137,8 @@ class Gui:
     def hide(self) -> None:
         self.systray.hide()
         self.main_window.hide()
-        self.preferences_window.hide()
+        if self._preferences_window is not None:
+            self._preferences_window.hide()
 
     def toggle(self) -> None:
         if self.main_window.isVisible():
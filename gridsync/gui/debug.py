@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import gzip
 import logging
 import os
 import platform
 import sys
 import time
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Optional
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
 
 from atomicwrites import atomic_write
 from qtpy.QtCore import QObject, QSize, Qt, QThread, Signal
@@ -43,6 +46,7 @@ from gridsync.msg import error
 
 if TYPE_CHECKING:
     from gridsync.core import Core
+    from gridsync.tahoe import Tahoe
 
 
 if sys.platform == "darwin":
@@ -84,18 +88,212 @@ warning_text = (
 )
 
 
-def log_fmt(gateway_name: str, tahoe_log: str, magic_folder_log: str) -> str:
+# The number of messages read (and filtered) at a time while exporting
+EXPORT_BATCH_SIZE = 100000
+# The number of (most recent) messages of each log shown in the dialog
+PREVIEW_MAX_MESSAGES = 2000
+
+
+def _omitted_note(omitted: int) -> str:
+    if not omitted:
+        return ""
+    return (
+        f"[{omitted} earlier messages are not shown here; save to a file "
+        "to include them]\n"
+    )
+
+
+def _read_log(
+    iter_messages: Callable[[], Iterable[str]],
+    tail_messages: Callable[[int], tuple[list[str], int]],
+    limit: Optional[int],
+) -> tuple[Iterable[str], str]:
+    """
+    Return a log's messages -- or, if ``limit`` is given, only the last
+    ``limit`` of them -- along with a note saying how many were left out.
+    """
+    if limit is None:
+        return iter_messages(), ""
+    messages, omitted = tail_messages(limit)
+    return messages, _omitted_note(omitted)
+
+
+def _join_in_batches(
+    messages: Iterable[str], transform: Callable[[list[str]], str]
+) -> Iterator[str]:
+    """
+    Join ``messages`` with newlines, ``EXPORT_BATCH_SIZE`` messages (passed
+    through ``transform``) at a time.
+    """
+    separator = ""
+    iterator = iter(messages)
+    batch = list(islice(iterator, EXPORT_BATCH_SIZE))
+    while batch:
+        yield separator + transform(batch)
+        separator = "\n"
+        batch = list(islice(iterator, EXPORT_BATCH_SIZE))
+
+
+def _filter_and_join(messages: list[str], identifier: str) -> str:
+    # Filtered messages are already serialized with sorted keys, so they
+    # can be joined as-is (rather than by ``join_eliot_logs``)
+    return "\n".join(filter_eliot_logs(messages, identifier))
+
+
+def _iter_app_log(
+    core: Core, filters: list, preview_limit: Optional[int]
+) -> Iterator[str]:
+    messages, note = _read_log(
+        core.log_buffer.iter_messages, core.log_buffer.tail, preview_limit
+    )
+    yield apply_filters(
+        header
+        + "Tahoe-LAFS:   {}\n".format(core.tahoe_version)
+        + "Magic-Folder: {}\n".format(core.magic_folder_version)
+        + "Datetime:     {}\n\n".format(datetime.now(timezone.utc).isoformat())
+        + "Startup timings:\n{}\n\n\n".format(core.get_startup_report())
+        + warning_text
+        + "\n----- Beginning of {} debug log -----\n".format(APP_NAME)
+        + note,
+        filters,
+    )
+    yield from _join_in_batches(
+        messages, lambda batch: apply_filters("\n".join(batch), filters)
+    )
+    yield "\n----- End of {} debug log -----\n".format(APP_NAME)
+
+
+def _select_log(  # pylint: disable=too-many-arguments
+    iter_messages: Callable[[], Iterable[str]],
+    tail_messages: Callable[[int], tuple[list[str], int]],
+    iter_filtered_messages: Callable[[str], Optional[Iterable[str]]],
+    tail_filtered_messages: Callable[
+        [str, int], Optional[tuple[list[str], int]]
+    ],
+    gateway_id: str,
+    filtered: bool,
+    preview_limit: Optional[int],
+) -> tuple[Iterable[str], str, Callable[[list[str]], str]]:
+    """
+    Return a log's messages, a note saying how many were left out, and how
+    to join a batch of them for export.
+    """
+    if not filtered:
+        return (
+            *_read_log(iter_messages, tail_messages, preview_limit),
+            join_eliot_logs,
+        )
+    # Filtered (and serialized with sorted keys) when received, if at all
+    if preview_limit is None:
+        prefiltered = iter_filtered_messages(gateway_id)
+        if prefiltered is not None:
+            return prefiltered, "", "\n".join
+    else:
+        tail = tail_filtered_messages(gateway_id, preview_limit)
+        if tail is not None:
+            return tail[0], _omitted_note(tail[1]), "\n".join
     return (
-        f"\n------ Beginning of Tahoe-LAFS log for {gateway_name} ------\n"
-        f"{tahoe_log}"
-        f"\n------ End of Tahoe-LAFS log for {gateway_name} ------\n"
-        f"\n------ Beginning of Magic-Folder log for {gateway_name} ------\n"
-        f"{magic_folder_log}"
-        f"\n------ End of Magic-Folder log for {gateway_name} ------\n"
+        *_read_log(iter_messages, tail_messages, preview_limit),
+        partial(_filter_and_join, identifier=gateway_id),
     )
 
 
+def _iter_gateway_logs(
+    gateway: Tahoe,
+    gateway_id: str,
+    filtered: bool,
+    preview_limit: Optional[int],
+) -> Iterator[str]:
+    if filtered:
+        name = get_mask(gateway.name, "GatewayName", gateway_id)
+    else:
+        name = gateway.name
+    for (
+        label,
+        iter_messages,
+        tail_messages,
+        iter_filtered_messages,
+        tail_filtered_messages,
+    ) in (
+        (
+            "Tahoe-LAFS",
+            gateway.iter_streamed_log_messages,
+            gateway.tail_streamed_log_messages,
+            gateway.iter_filtered_streamed_log_messages,
+            gateway.tail_filtered_streamed_log_messages,
+        ),
+        (
+            "Magic-Folder",
+            gateway.magic_folder.iter_log_messages,
+            gateway.magic_folder.tail_log_messages,
+            gateway.magic_folder.iter_filtered_log_messages,
+            gateway.magic_folder.tail_filtered_log_messages,
+        ),
+    ):
+        messages, note, transform = _select_log(
+            iter_messages,
+            tail_messages,
+            iter_filtered_messages,
+            tail_filtered_messages,
+            gateway_id,
+            filtered,
+            preview_limit,
+        )
+        yield f"\n------ Beginning of {label} log for {name} ------\n{note}"
+        yield from _join_in_batches(messages, transform)
+        yield f"\n------ End of {label} log for {name} ------\n"
+
+
+def iter_debug_log(
+    core: Core,
+    filtered: bool = False,
+    preview_limit: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Yield the debug information -- a header, the application log, and the
+    Tahoe-LAFS and Magic-Folder logs of each gateway -- a piece at a time,
+    so that it can be written out without holding all of it in memory.
+
+    :param filtered: Whether to conceal potentially-identifying information.
+    :param preview_limit: If given, include only this many of the most
+        recent messages of each log.
+    """
+    filters = get_filters(core) if filtered else []
+    yield from _iter_app_log(core, filters, preview_limit)
+    for i, gateway in enumerate(core.gui.main_window.gateways):
+        yield from _iter_gateway_logs(
+            gateway, str(i + 1), filtered, preview_limit
+        )
+
+
+def _write_pieces(
+    write: Callable[[bytes], object], pieces: Iterable[str]
+) -> None:
+    for piece in pieces:
+        # Use the platform's line endings, as writing in text mode would
+        write(piece.replace("\n", os.linesep).encode("utf-8"))
+
+
+def write_debug_log(path: str, pieces: Iterable[str]) -> None:
+    """
+    Atomically write ``pieces`` of text to ``path``, compressing them with
+    gzip if ``path`` ends with ".gz".
+    """
+    with atomic_write(path, mode="wb", overwrite=True) as f:
+        if path.endswith(".gz"):
+            # A fixed mtime keeps the output reproducible
+            with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+                _write_pieces(gz.write, pieces)
+        else:
+            _write_pieces(f.write, pieces)
+
+
 class LogLoader(QObject):
+    """
+    Load a preview -- limited to the most recent ``PREVIEW_MAX_MESSAGES``
+    messages of each log -- of the debug information, both with and without
+    potentially-identifying information filtered.
+    """
 
     done = Signal()
 
@@ -107,44 +305,50 @@ class LogLoader(QObject):
 
     def load(self) -> None:
         start_time = time.time()
-        self.content = (
-            header
-            + "Tahoe-LAFS:   {}\n".format(self.core.tahoe_version)
-            + "Magic-Folder: {}\n".format(self.core.magic_folder_version)
-            + "Datetime:     {}\n\n\n".format(
-                datetime.now(timezone.utc).isoformat()
-            )
-            + warning_text
-            + "\n----- Beginning of {} debug log -----\n".format(APP_NAME)
-            + "\n".join(self.core.log_deque)
-            + "\n----- End of {} debug log -----\n".format(APP_NAME)
+        self.content = "".join(
+            iter_debug_log(self.core, preview_limit=PREVIEW_MAX_MESSAGES)
         )
-        filters = get_filters(self.core)
-        self.filtered_content = apply_filters(self.content, filters)
-        for i, gateway in enumerate(self.core.gui.main_window.gateways):
-            gateway_id = str(i + 1)
-            self.content = self.content + log_fmt(
-                gateway.name,
-                join_eliot_logs(gateway.get_streamed_log_messages()),
-                join_eliot_logs(gateway.magic_folder.get_log_messages()),
-            )
-            self.filtered_content = self.filtered_content + log_fmt(
-                get_mask(gateway.name, "GatewayName", gateway_id),
-                join_eliot_logs(
-                    filter_eliot_logs(
-                        gateway.get_streamed_log_messages(), gateway_id
-                    )
-                ),
-                join_eliot_logs(
-                    filter_eliot_logs(
-                        gateway.magic_folder.get_log_messages(), gateway_id
-                    )
-                ),
+        self.filtered_content = "".join(
+            iter_debug_log(
+                self.core, filtered=True, preview_limit=PREVIEW_MAX_MESSAGES
             )
+        )
         self.done.emit()
         logging.debug("Loaded logs in %f seconds", time.time() - start_time)
 
 
+class LogExporter(QObject):
+    """
+    Write the complete debug information to a file, a piece at a time.
+
+    :ivar path: The path of the file to write (gzip-compressed if it ends
+        with ".gz").
+    :ivar filtered: Whether to conceal potentially-identifying information.
+    """
+
+    done = Signal()
+    failed = Signal(str)
+
+    def __init__(self, core: Core) -> None:
+        super().__init__()
+        self.core = core
+        self.path = ""
+        self.filtered = True
+
+    def export(self) -> None:
+        start_time = time.time()
+        try:
+            write_debug_log(
+                self.path, iter_debug_log(self.core, self.filtered)
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error("%s: %s", type(e).__name__, str(e))
+            self.failed.emit(str(e))
+            return
+        logging.debug("Exported logs in %f seconds", time.time() - start_time)
+        self.done.emit()
+
+
 class DebugExporter(QDialog):
     def __init__(self, core: Core, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
@@ -156,6 +360,13 @@ class DebugExporter(QDialog):
         self.log_loader.done.connect(self.on_loaded)
         self.log_loader_thread.started.connect(self.log_loader.load)
 
+        self.log_exporter = LogExporter(self.core)
+        self.log_exporter_thread = QThread()
+        self.log_exporter.moveToThread(self.log_exporter_thread)
+        self.log_exporter.done.connect(self.on_exported)
+        self.log_exporter.failed.connect(self.on_export_failed)
+        self.log_exporter_thread.started.connect(self.log_exporter.export)
+
         self.setMinimumSize(800, 600)
         self.setWindowTitle("{} - Debug Information".format(APP_NAME))
 
@@ -258,25 +469,46 @@ class DebugExporter(QDialog):
         self.log_loader_thread.start()
 
     def copy_to_clipboard(self) -> None:
+        # The dialog only shows a preview, so read the complete logs again
+        text = "".join(
+            iter_debug_log(
+                self.core, filtered=self.checkbox.checkState() == Qt.Checked
+            )
+        )
         for mode in get_clipboard_modes():
-            set_clipboard_text(self.plaintextedit.toPlainText(), mode)
+            set_clipboard_text(text, mode)
         self.close()
 
     def export_to_file(self) -> None:
+        if self.log_exporter_thread.isRunning():
+            logging.warning("LogExporter thread is already running; returning")
+            return
         dest, _ = QFileDialog.getSaveFileName(
             self,
             "Select a destination",
             os.path.join(
                 os.path.expanduser("~"), APP_NAME + " Debug Information.txt"
             ),
+            "Text files (*.txt);;Compressed text files (*.txt.gz)",
         )
         if not dest:
             return
-        try:
-            with atomic_write(dest, mode="w", overwrite=True) as f:
-                f.write(self.plaintextedit.toPlainText())
-        except Exception as e:  # pylint: disable=broad-except
-            logging.error("%s: %s", type(e).__name__, str(e))
-            error(self, "Error saving debug information", str(e))
-            return
+        self.log_exporter.path = dest
+        self.log_exporter.filtered = self.checkbox.checkState() == Qt.Checked
+        self.export_button.setEnabled(False)
+        self.export_button.setText("Saving...")
+        self.log_exporter_thread.start()
+
+    def _on_export_finished(self) -> None:
+        self.log_exporter_thread.quit()
+        self.log_exporter_thread.wait()
+        self.export_button.setEnabled(True)
+        self.export_button.setText("Save to file...")
+
+    def on_exported(self) -> None:
+        self._on_export_finished()
         self.close()
+
+    def on_export_failed(self, message: str) -> None:
+        self._on_export_finished()
+        error(self, "Error saving debug information", message)
@@ -171,9 +171,9 @@ class HistoryListWidget(QListWidget):
         )
 
         mf_monitor = self.gateway.magic_folder.monitor
-        mf_monitor.file_added.connect(self._on_file_added)
-        mf_monitor.file_modified.connect(self._on_file_modified)
-        mf_monitor.file_removed.connect(self._on_file_removed)
+        mf_monitor.files_added.connect(self._on_files_added)
+        mf_monitor.files_modified.connect(self._on_files_modified)
+        mf_monitor.files_removed.connect(self._on_files_removed)
 
     def on_double_click(self, item: QListWidgetItem) -> None:
         w = self.itemWidget(item)
@@ -228,17 +228,33 @@ class HistoryListWidget(QListWidget):
         item.setText(str(mtime))
         self.sortItems(Qt.DescendingOrder)  # Sort by mtime; newest on top
 
-    def _on_file_added(self, _: str, data: dict) -> None:
-        # data["action"] = "added"  # XXX
-        self.add_item(data)
+    def _on_files_added(self, _: str, items: list[tuple[str, dict]]) -> None:
+        for _, data in items:
+            # data["action"] = "added"  # XXX
+            self.add_item(data)
 
-    def _on_file_modified(self, _: str, data: dict) -> None:
-        # data["action"] = "modified"  # XXX
-        self.add_item(data)
-
-    def _on_file_removed(self, _: str, data: dict) -> None:
-        # data["action"] = "removed"  # XXX
-        self.add_item(data)
+    def _on_files_modified(
+        self, _: str, items: list[tuple[str, dict]]
+    ) -> None:
+        for _, data in items:
+            # data["action"] = "modified"  # XXX
+            self.add_item(data)
+
+    def _on_files_removed(self, _: str, items: list[tuple[str, dict]]) -> None:
+        for _, data in items:
+            # data["action"] = "removed"  # XXX
+            self.add_item(data)
+
+    def load_state(self) -> None:
+        """
+        Add the gateway's most recently updated files (for when this widget
+        is created after the gateway has already started).
+        """
+        mf_monitor = self.gateway.magic_folder.monitor
+        for data in reversed(
+            mf_monitor.get_recent_file_statuses(self.max_items)
+        ):
+            self.add_item(data)
 
     def update_visible_widgets(self) -> None:
         if not self.isVisible():
@@ -270,6 +286,11 @@ class HistoryView(QWidget):
         super().__init__()
         layout = QGridLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
-        layout.addWidget(HistoryListWidget(gateway, deduplicate, max_items))
+        self.history_list = HistoryListWidget(gateway, deduplicate, max_items)
+        layout.addWidget(self.history_list)
         self.status_panel = StatusPanel(gateway, gui)
         layout.addWidget(self.status_panel)
+
+    def load_state(self) -> None:
+        self.history_list.load_state()
+        self.status_panel.load_state()
@@ -28,12 +28,6 @@ from qtpy.QtWidgets import (
 from twisted.internet import reactor
 from twisted.internet.defer import CancelledError, inlineCallbacks
 from twisted.python.failure import Failure
-from wormhole.errors import (
-    LonelyError,
-    ServerConnectionError,
-    WelcomeError,
-    WrongPasswordError,
-)
 
 from gridsync import APP_NAME, resource
 from gridsync.desktop import get_clipboard_modes, get_clipboard_text
@@ -41,7 +35,7 @@ from gridsync.errors import UpgradeRequiredError
 from gridsync.gui.color import BlendedColor
 from gridsync.gui.font import Font
 from gridsync.gui.widgets import HSpacer, VSpacer
-from gridsync.invite import is_valid_code, wordlist
+from gridsync.invite import get_wordlist, is_valid_code
 from gridsync.tor import get_tor
 from gridsync.types import TwistedDeferred
 
@@ -71,7 +65,7 @@ class InviteCodeLineEdit(QLineEdit):
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
         model = QStringListModel()
-        model.setStringList(wordlist)
+        model.setStringList(get_wordlist())
         completer = InviteCodeCompleter()
         completer.setModel(model)
         self.setFont(Font(16))
@@ -388,6 +382,13 @@ class InviteCodeWidget(QWidget):
 
 
 def show_failure(failure: Failure, parent: Optional[QWidget] = None) -> None:
+    from wormhole.errors import (
+        LonelyError,
+        ServerConnectionError,
+        WelcomeError,
+        WrongPasswordError,
+    )
+
     msg = QMessageBox(parent)
     msg.setIcon(QMessageBox.Warning)
     msg.setStandardButtons(QMessageBox.Retry)
@@ -5,6 +5,7 @@ import logging
 import os
 import sys
 from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING, Coroutine, Generator, Optional, Union, cast
 
@@ -15,7 +16,14 @@ from qtpy.QtCore import (
     Qt,
     QTimer,
 )
-from qtpy.QtGui import QCloseEvent, QIcon, QKeyEvent, QKeySequence, QShowEvent
+from qtpy.QtGui import (
+    QCloseEvent,
+    QHideEvent,
+    QIcon,
+    QKeyEvent,
+    QKeySequence,
+    QShowEvent,
+)
 from qtpy.QtWidgets import (
     QFileDialog,
     QGridLayout,
@@ -40,7 +48,7 @@ from gridsync.gui.usage import UsageView
 from gridsync.gui.view import View
 from gridsync.gui.welcome import WelcomeDialog
 from gridsync.msg import error, info
-from gridsync.recovery import export_recovery_key, get_recovery_key
+from gridsync.scheduler import shared_scheduler
 from gridsync.tahoe import Tahoe
 from gridsync.util import strip_html_tags
 
@@ -67,7 +75,10 @@ class CentralWidget(QStackedWidget):
         super().__init__()
         self.gui = gui
         self.views: list[View] = []
+        self.gateways: list[Tahoe] = []
         self.folders_views: dict[Tahoe, QWidget] = {}
+        # The history and usage views are only created when first shown;
+        # these contain only those views which have been created so far
         self.history_views: dict[Tahoe, HistoryView] = {}
         self.usage_views: dict[Tahoe, QWidget] = {}
 
@@ -93,10 +104,12 @@ class CentralWidget(QStackedWidget):
         view = HistoryView(gateway, self.gui)
         self.addWidget(view)
         self.history_views[gateway] = view
+        view.load_state()
 
     def _add_usage_view(self, gateway: Tahoe) -> None:
         gateway.load_settings()  # Ensure that zkap_unit_name is read/updated
         view = UsageView(gateway, self.gui)
+        status_panel = StatusPanel(gateway, self.gui)
         widget = QWidget()
         layout = QGridLayout(widget)
         if sys.platform == "darwin":
@@ -106,14 +119,49 @@ class CentralWidget(QStackedWidget):
             left, _, right, _ = layout.getContentsMargins()
             layout.setContentsMargins(left, 0, right, 0)
         layout.addWidget(view)
-        layout.addWidget(StatusPanel(gateway, self.gui))
+        layout.addWidget(status_panel)
         self.addWidget(widget)
+        # Registered before loading the state, since doing so may (via the
+        # toolbar) look this view up again
         self.usage_views[gateway] = widget
+        view.load_state()
+        status_panel.load_state()
+
+    def get_history_view(self, gateway: Tahoe) -> HistoryView:
+        """
+        Return the history view for the given gateway, creating it if it has
+        not been already. Raise ``KeyError`` if the gateway was not added.
+        """
+        if gateway not in self.history_views:
+            if gateway not in self.gateways:
+                raise KeyError(gateway)
+            self._add_history_view(gateway)
+        return self.history_views[gateway]
+
+    def get_usage_view(self, gateway: Tahoe) -> QWidget:
+        """
+        Return the usage view for the given gateway, creating it if it has
+        not been already. Raise ``KeyError`` if the gateway was not added.
+        """
+        if gateway not in self.usage_views:
+            if gateway not in self.gateways:
+                raise KeyError(gateway)
+            self._add_usage_view(gateway)
+        return self.usage_views[gateway]
+
+    def _on_low_zkaps_warning(self, gateway: Tahoe) -> None:
+        widget = self.get_usage_view(gateway)
+        view = cast(UsageView, widget.layout().itemAt(0).widget())
+        view.on_low_zkaps_warning()
 
     def add_gateway(self, gateway: Tahoe) -> None:
+        # Only the folders view is created up front; its model also drives
+        # the systray and (folder and connection) notifications
+        self.gateways.append(gateway)
         self._add_folders_view(gateway)
-        self._add_history_view(gateway)
-        self._add_usage_view(gateway)
+        gateway.monitor.low_zkaps_warning.connect(
+            partial(self._on_low_zkaps_warning, gateway)
+        )
 
 
 def get_save_filename(
@@ -259,6 +307,12 @@ class MainWindow(QMainWindow):
                 gateway.newscap_checker.upgrade_required.connect(
                     self.on_upgrade_required
                 )
+                # The toolbar's actions depend on the number of ZKAPs
+                # remaining, but the usage view (which would otherwise update
+                # them) might not have been created
+                gateway.monitor.check_finished.connect(
+                    self.toolbar.update_actions
+                )
         if gateways:
             if CONNECTION_DEFAULT_NICKNAME:
                 self.toolbar.combo_box.activate(CONNECTION_DEFAULT_NICKNAME)
@@ -349,7 +403,9 @@ class MainWindow(QMainWindow):
     def show_history_view(self) -> None:
         try:
             self.central_widget.setCurrentWidget(
-                self.central_widget.history_views[self.combo_box.currentData()]
+                self.central_widget.get_history_view(
+                    self.combo_box.currentData()
+                )
             )
         except KeyError:
             return
@@ -358,7 +414,9 @@ class MainWindow(QMainWindow):
     def show_usage_view(self) -> None:
         try:
             self.central_widget.setCurrentWidget(
-                self.central_widget.usage_views[self.combo_box.currentData()]
+                self.central_widget.get_usage_view(
+                    self.combo_box.currentData()
+                )
             )
         except KeyError:
             return
@@ -422,6 +480,8 @@ class MainWindow(QMainWindow):
         """
         The asynchronous implementation of ``export_recovery_key``.
         """
+        from gridsync.recovery import export_recovery_key, get_recovery_key
+
         # Blocking call!
         password = _get_encrypt_password(self)
         if password is None:
@@ -594,7 +654,12 @@ class MainWindow(QMainWindow):
             event.ignore()
             self.confirm_quit()
 
+    def hideEvent(self, _: QHideEvent) -> None:
+        # Nothing is being shown, so check for changes less often
+        shared_scheduler().pause()
+
     def showEvent(self, _: QShowEvent) -> None:
+        shared_scheduler().resume()
         if self.pending_news_message:
             gateway, title, message = self.pending_news_message
             self.pending_news_message = ()
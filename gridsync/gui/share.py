@@ -7,7 +7,6 @@ import sys
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-import wormhole.errors
 from qtpy.QtCore import QEvent, QFileInfo, Qt, QTimer, Signal
 from qtpy.QtGui import QCloseEvent, QFont, QIcon, QKeyEvent
 from qtpy.QtWidgets import (
@@ -276,7 +275,9 @@ class InviteSenderDialog(QDialog):
                         model.on_members_updated(folder, [None, None])
 
     def handle_failure(self, failure: Failure) -> None:
-        if failure.type == wormhole.errors.LonelyError:
+        from wormhole.errors import LonelyError
+
+        if failure.type == LonelyError:
             return
         logging.error(str(failure))
         show_failure(failure, self)
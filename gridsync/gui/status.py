@@ -141,6 +141,26 @@ class StatusPanel(QWidget):
 
         self.on_sync_status_updated(self.status)
 
+    def load_state(self) -> None:
+        """
+        Bring this panel up to date with the gateway's current state (for
+        when it is created after the gateway has already started).
+        """
+        grid_checker = self.gateway.monitor.grid_checker
+        if grid_checker.num_known:
+            self.on_nodes_updated(
+                grid_checker.num_connected, grid_checker.num_known
+            )
+        if grid_checker.available_space:
+            self.on_space_updated(grid_checker.available_space)
+        mf_monitor = self.gateway.magic_folder.monitor
+        if mf_monitor.total_folders_size:
+            self.on_total_folders_size_updated(mf_monitor.total_folders_size)
+        days_remaining = self.gateway.monitor.zkap_checker.days_remaining
+        if days_remaining:
+            self.on_days_remaining_updated(days_remaining)
+        self.on_sync_status_updated(mf_monitor.overall_status)
+
     def _update_status_label(self) -> None:
         if self.status in (
             MagicFolderStatus.LOADING,
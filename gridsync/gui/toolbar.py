@@ -326,7 +326,7 @@ class ToolBar(QToolBar):
             if not gateway.magic_folder.magic_folders:
                 try:
                     self.main_window.central_widget.setCurrentWidget(  # XXX
-                        self.main_window.central_widget.usage_views[gateway]
+                        self.main_window.central_widget.get_usage_view(gateway)
                     )
                 except KeyError:
                     return
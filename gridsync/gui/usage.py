@@ -18,7 +18,6 @@ from twisted.internet.defer import inlineCallbacks
 
 from gridsync import APP_NAME, resource
 from gridsync.desktop import get_browser_name
-from gridsync.gui.charts import ZKAPBarChartView
 from gridsync.gui.color import BlendedColor
 from gridsync.gui.font import Font
 from gridsync.gui.voucher import VoucherCodeDialog
@@ -28,6 +27,7 @@ from gridsync.types import TwistedDeferred
 
 if TYPE_CHECKING:
     from gridsync.gui import AbstractGui  # pylint: disable=cyclic-import
+    from gridsync.gui.charts import ZKAPBarChartView
     from gridsync.tahoe import Tahoe  # pylint: disable=cyclic-import
 
 
@@ -149,6 +149,9 @@ class UsageView(QWidget):
 
     @chart_view.default
     def _chart_view_default(self) -> ZKAPBarChartView:
+        # Imported here so that QtCharts is only loaded for ZKAP-enabled grids
+        from gridsync.gui.charts import ZKAPBarChartView
+
         chart_view = ZKAPBarChartView(self.gateway)
         chart_view.setFixedHeight(128)
         chart_view.setRenderHint(QPainter.Antialiasing)
@@ -233,12 +236,33 @@ class UsageView(QWidget):
         self.gateway.monitor.redeeming_vouchers_updated.connect(
             self.on_redeeming_vouchers_updated
         )
-        self.gateway.monitor.low_zkaps_warning.connect(
-            self.on_low_zkaps_warning
-        )
+        # low_zkaps_warning is connected by the CentralWidget instead, since
+        # the warning must be shown whether or not this view exists yet
 
         self._reset_status()
 
+    def load_state(self) -> None:
+        """
+        Bring this view up to date with the gateway's current state (for
+        when it is created after the gateway has already started).
+        """
+        zkap_checker = self.gateway.monitor.zkap_checker
+        if zkap_checker.redeeming_vouchers:
+            self.on_redeeming_vouchers_updated(zkap_checker.redeeming_vouchers)
+        if zkap_checker.zkaps_last_redeemed != "0":
+            self.on_zkaps_redeemed(zkap_checker.zkaps_last_redeemed)
+        if zkap_checker.last_zkaps_update is not None:
+            self.on_zkaps_updated(*zkap_checker.last_zkaps_update)
+        if zkap_checker.last_price_update is not None:
+            self.on_zkaps_renewal_cost_updated(*zkap_checker.last_price_update)
+        if zkap_checker.days_remaining:
+            self.on_days_remaining_updated(zkap_checker.days_remaining)
+        total_folders_size = (
+            self.gateway.magic_folder.monitor.total_folders_size
+        )
+        if total_folders_size:
+            self.on_total_folders_size_updated(total_folders_size)
+
     def _reset_status(self) -> None:
         p = self.palette()
         dimmer_grey = BlendedColor(
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import time
+from io import BufferedReader
+from typing import Callable, Optional, Union, cast
+from urllib.parse import urlsplit
+
+import attr
+import treq
+from twisted.internet.defer import Deferred, DeferredSemaphore
+from twisted.internet.defer import TimeoutError as DeferredTimeoutError
+from twisted.internet.error import TimeoutError as ConnectTimeoutError
+from twisted.internet.interfaces import IReactorTime
+from twisted.web.client import HTTPConnectionPool
+
+from gridsync.types import TreqResponse
+
+# A request body; either the complete body or an open file to send
+RequestBody = Union[bytes, BufferedReader]
+RequestHeaders = dict[Union[bytes, str], Union[bytes, str]]
+
+
+@attr.s(frozen=True)
+class HTTPResponse:
+    """
+    A response whose body has been read.
+
+    :ivar code: The HTTP status code.
+    :ivar content: The body of the response (or ``b""`` if it was passed to
+        a collector instead).
+    """
+
+    code: int = attr.ib()
+    content: bytes = attr.ib()
+
+
+@attr.s
+class RequestStats:
+    """
+    Request metrics for a single endpoint (i.e., "host:port").
+
+    :ivar count: The number of requests completed (successfully or not).
+    :ivar errors: The number of requests which failed (or timed out)
+        before the response had been read in full.
+    :ivar total_time: The sum of the latencies of all completed requests.
+    :ivar max_time: The highest latency of any completed request.
+    """
+
+    count: int = attr.ib(default=0)
+    errors: int = attr.ib(default=0)
+    total_time: float = attr.ib(default=0.0)
+    max_time: float = attr.ib(default=0.0)
+
+    @property
+    def mean_time(self) -> float:
+        if not self.count:
+            return 0.0
+        return self.total_time / self.count
+
+    def record(self, latency: float, error: bool = False) -> None:
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_time += latency
+        self.max_time = max(self.max_time, latency)
+
+
+class HTTPClient:
+    """
+    A ``treq`` wrapper that routes every request through a single
+    persistent (keep-alive) connection pool.
+
+    Each gateway has one of these, shared by its Tahoe-LAFS, Magic-Folder,
+    and ZKAPAuthorizer API clients. Since those APIs are polled frequently,
+    re-using connections avoids paying for a new TCP connection each time.
+
+    :ivar max_requests_per_endpoint: The maximum number of requests that
+        may be waiting on (or reading) a response from the same endpoint at
+        once; any further requests are queued until one of these completes.
+    :ivar timeout: The default number of seconds to wait for a response,
+        including its body, before giving up (or ``None`` to wait
+        indefinitely).
+    :ivar stats: Request metrics, keyed by endpoint.
+    """
+
+    def __init__(
+        self,
+        reactor: Optional[IReactorTime] = None,
+        max_requests_per_endpoint: int = 8,
+        max_persistent_per_host: int = 8,
+        cached_connection_timeout: int = 120,
+        timeout: Optional[float] = None,
+    ) -> None:
+        if reactor is None:
+            from twisted.internet import reactor as reactor_
+
+            # To avoid mypy "assignment" error ("expression has type Module")
+            reactor = cast(IReactorTime, reactor_)
+        self._reactor = reactor
+        self._pool = HTTPConnectionPool(reactor, persistent=True)
+        self._pool.maxPersistentPerHost = max_persistent_per_host
+        self._pool.cachedConnectionTimeout = cached_connection_timeout
+        self.max_requests_per_endpoint = max_requests_per_endpoint
+        self.timeout = timeout
+        self._semaphores: dict[str, DeferredSemaphore] = {}
+        self.stats: dict[str, RequestStats] = {}
+
+    @staticmethod
+    async def _receive(
+        send: Callable[[], Deferred[TreqResponse]],
+        collector: Optional[Callable[[bytes], None]],
+    ) -> HTTPResponse:
+        response = await send()
+        if collector is not None and response.code in (200, 201):
+            await treq.collect(response, collector)
+            return HTTPResponse(response.code, b"")
+        content = await treq.content(response)
+        return HTTPResponse(response.code, content)
+
+    async def _send(
+        self,
+        url: str,
+        send: Callable[[], Deferred[TreqResponse]],
+        timeout: Optional[float],
+        collector: Optional[Callable[[bytes], None]],
+    ) -> HTTPResponse:
+        # Only the "host:port" is used; paths may contain capabilities
+        endpoint = urlsplit(url).netloc
+        semaphore = self._semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = DeferredSemaphore(self.max_requests_per_endpoint)
+            self._semaphores[endpoint] = semaphore
+        stats = self.stats.setdefault(endpoint, RequestStats())
+        if timeout is None:
+            timeout = self.timeout
+        await semaphore.acquire()
+        start = time.monotonic()
+        # The semaphore is held, and the timeout runs, until the body has
+        # been read; otherwise, many slow responses could still pile up
+        d = Deferred.fromCoroutine(self._receive(send, collector))
+        if timeout:
+            d.addTimeout(timeout, self._reactor)
+        error = True
+        try:
+            response = await d
+            error = False
+        except DeferredTimeoutError as e:
+            raise ConnectTimeoutError(
+                string=f"No response from {endpoint} after {timeout}s"
+            ) from e
+        finally:
+            stats.record(time.monotonic() - start, error)
+            semaphore.release()
+        return response
+
+    async def request(  # pylint: disable=too-many-arguments
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[RequestHeaders] = None,
+        params: Optional[dict[str, str]] = None,
+        data: Optional[RequestBody] = None,
+        collector: Optional[Callable[[bytes], None]] = None,
+    ) -> HTTPResponse:
+        """
+        Send a request and read its response.
+
+        :param collector: A function to pass each part of the body to as it
+            is received, instead of buffering it in ``HTTPResponse.content``.
+            This is only done for successful (200 or 201) responses; the
+            body of any other response is buffered as usual (so that it can
+            be included in error messages).
+        """
+        return await self._send(
+            url,
+            lambda: treq.request(
+                method,
+                url,
+                headers=headers,
+                params=params,
+                data=data,
+                pool=self._pool,
+            ),
+            timeout,
+            collector,
+        )
+
+    async def get(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[RequestHeaders] = None,
+        params: Optional[dict[str, str]] = None,
+        collector: Optional[Callable[[bytes], None]] = None,
+    ) -> HTTPResponse:
+        return await self._send(
+            url,
+            lambda: treq.get(
+                url, headers=headers, params=params, pool=self._pool
+            ),
+            timeout,
+            collector,
+        )
+
+    async def post(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[RequestHeaders] = None,
+        params: Optional[dict[str, str]] = None,
+        data: Optional[RequestBody] = None,
+    ) -> HTTPResponse:
+        return await self._send(
+            url,
+            lambda: treq.post(
+                url,
+                headers=headers,
+                params=params,
+                data=data,
+                pool=self._pool,
+            ),
+            timeout,
+            None,
+        )
+
+    async def put(
+        self,
+        url: str,
+        timeout: Optional[float] = None,
+        headers: Optional[RequestHeaders] = None,
+        params: Optional[dict[str, str]] = None,
+        data: Optional[RequestBody] = None,
+    ) -> HTTPResponse:
+        return await self._send(
+            url,
+            lambda: treq.put(
+                url,
+                headers=headers,
+                params=params,
+                data=data,
+                pool=self._pool,
+            ),
+            timeout,
+            None,
+        )
+
+    def close(self) -> Deferred[None]:
+        """
+        Close all of the idle connections held by the pool.
+        """
+        return self._pool.closeCachedConnections()
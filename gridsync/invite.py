@@ -1,31 +1,46 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import TYPE_CHECKING, Optional
 
 from qtpy.QtCore import QObject, Signal
 from twisted.internet.defer import Deferred, inlineCallbacks
 
-try:
-    from wormhole.wordlist import raw_words
-except ImportError:  # TODO: Switch to new magic-wormhole completion API?
-    from wormhole._wordlist import raw_words
-
 from gridsync import cheatcodes, load_settings_from_cheatcode
 from gridsync.setup import SetupRunner, validate_settings
 from gridsync.types import TwistedDeferred
-from gridsync.wormhole_ import Wormhole
 
 if TYPE_CHECKING:
     from gridsync.tahoe import Tahoe
+    from gridsync.wormhole_ import Wormhole
+
+
+@lru_cache(maxsize=None)
+def get_wordlist() -> list[str]:
+    """
+    Return the (sorted, lower-case) words that may appear in an invite
+    code. The list is built on first use, rather than at import time, since
+    doing so requires importing (most of) magic-wormhole.
+    """
+    try:
+        from wormhole.wordlist import raw_words
+    except ImportError:  # TODO: Switch to new magic-wormhole completion API?
+        from wormhole._wordlist import raw_words
+
+    words: list[str] = []
+    for word in raw_words.items():
+        words.extend(word[1])
+    for c in cheatcodes:
+        words.extend(c.split("-"))
+    return sorted([word.lower() for word in words])
+
 
+def _create_wormhole(use_tor: bool) -> Wormhole:
+    # Imported here so that magic-wormhole is only loaded once it is needed
+    from gridsync.wormhole_ import Wormhole
 
-wordlist = []  # type: list
-for word in raw_words.items():
-    wordlist.extend(word[1])
-for c in cheatcodes:
-    wordlist.extend(c.split("-"))
-wordlist = sorted([word.lower() for word in wordlist])
+    return Wormhole(use_tor)
 
 
 def is_valid_code(code: str) -> bool:
@@ -34,6 +49,7 @@ def is_valid_code(code: str) -> bool:
         return False
     if not words[0].isdigit():
         return False
+    wordlist = get_wordlist()
     if not words[1] in wordlist:
         return False
     if not words[2] in wordlist:
@@ -75,7 +91,7 @@ class InviteReceiver(QObject):
         self.setup_runner.joined_folders.connect(self.joined_folders.emit)
         self.setup_runner.done.connect(self.done.emit)
 
-        self.wormhole = Wormhole(use_tor)
+        self.wormhole = _create_wormhole(use_tor)
         self.wormhole.got_welcome.connect(self.got_welcome.emit)
         self.wormhole.got_introduction.connect(self.got_introduction.emit)
         self.wormhole.got_message.connect(self.got_message.emit)
@@ -124,7 +140,7 @@ class InviteSender(QObject):
         super().__init__()
         self.use_tor = use_tor
 
-        self.wormhole = Wormhole(use_tor)
+        self.wormhole = _create_wormhole(use_tor)
         self.wormhole.got_welcome.connect(self.got_welcome.emit)
         self.wormhole.got_code.connect(self.got_code.emit)
         self.wormhole.got_introduction.connect(self.got_introduction.emit)
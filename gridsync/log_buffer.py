@@ -0,0 +1,538 @@
+# -*- coding: utf-8 -*-
+"""
+Bounded, compressed storage for log messages -- in memory and, optionally,
+on disk.
+"""
+from __future__ import annotations
+
+import logging
+import struct
+import threading
+import time
+import weakref
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count, islice
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import attr
+
+_FRAME = struct.Struct("!I")
+# The (compressed) size and message count of a chunk written to a segment
+_RECORD = struct.Struct("!II")
+_sequence = count()
+
+
+def _decode_chunk(data: bytes) -> list[bytes]:
+    raw = zlib.decompress(data)
+    messages = []
+    offset = 0
+    while offset < len(raw):
+        (length,) = _FRAME.unpack_from(raw, offset)
+        offset += _FRAME.size
+        messages.append(raw[offset : offset + length])
+        offset += length
+    return messages
+
+
+@attr.s(frozen=True)
+class _Chunk:
+    """
+    A sealed (and compressed) run of consecutive log messages.
+
+    :ivar data: The zlib-compressed, length-prefixed messages.
+    :ivar count: The number of messages in the chunk.
+    :ivar seq: A global sequence number, used to find the oldest chunk
+        across all of the buffers sharing a ``LogBudget``.
+    """
+
+    data: bytes = attr.ib()
+    count: int = attr.ib()
+    seq: int = attr.ib()
+
+    def decode(self) -> list[bytes]:
+        return _decode_chunk(self.data)
+
+
+@attr.s
+class _Segment:
+    path: Path = attr.ib()
+    size: int = attr.ib()
+
+
+class LogSegmentStore:
+    """
+    An on-disk history of log messages, into which a ``LogBuffer`` spills
+    the chunks it would otherwise discard.
+
+    Chunks are appended, still compressed, to numbered segment files in
+    ``directory``; once the newest segment reaches ``segment_size`` bytes,
+    a new one is started. The oldest segments are deleted once the total
+    size exceeds ``max_bytes`` or once they were last written to more than
+    ``max_age`` seconds ago.
+
+    Chunks are written by a worker thread (since they are discarded while
+    appending to a ``LogBuffer``, often on the reactor thread). The list of
+    segments and their sizes is read from disk only once, and is kept up
+    to date as chunks are written and segments are pruned.
+
+    :ivar directory: The directory in which to keep the segment files. It
+        is created when the first chunk is written.
+    """
+
+    def __init__(
+        self,
+        directory: Union[Path, str],
+        max_bytes: int = 256 * 1024 * 1024,
+        max_age: Optional[float] = 7 * 24 * 60 * 60,
+        segment_size: int = 4 * 1024 * 1024,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        # The segments (oldest first), and the sum of their sizes
+        self._listing: Optional[list[_Segment]] = None
+        self._total: int = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            # A single worker keeps the chunks in order
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="LogSegmentStore"
+            )
+        return self._executor
+
+    def _segments(self) -> list[_Segment]:
+        # Must be called with self._lock held
+        if self._listing is None:
+            listing = []
+            try:
+                paths = sorted(
+                    self.directory.glob("*.segment"), key=lambda p: int(p.stem)
+                )
+                for path in paths:
+                    listing.append(_Segment(path, path.stat().st_size))
+            except OSError:
+                pass
+            self._listing = listing
+            self._total = sum(segment.size for segment in listing)
+        return self._listing
+
+    def write_chunk(self, data: bytes, count_: int) -> None:
+        """
+        Queue a chunk to be appended to the newest segment.
+        """
+        self._get_executor().submit(self._write_chunk, data, count_)
+
+    def _write_chunk(self, data: bytes, count_: int) -> None:
+        record = _RECORD.pack(len(data), count_) + data
+        with self._lock:
+            segments = self._segments()
+            try:
+                if not segments or segments[-1].size >= self.segment_size:
+                    index = int(segments[-1].path.stem) + 1 if segments else 0
+                    path = Path(self.directory, f"{index:08d}.segment")
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    segments.append(_Segment(path, 0))
+                with open(segments[-1].path, "ab") as f:
+                    f.write(record)
+                segments[-1].size += len(record)
+                self._total += len(record)
+                self._prune(segments)
+            except OSError as e:
+                logging.warning("Error writing log history: %s", str(e))
+                self._listing = None  # Re-read it from disk next time
+
+    def _prune(self, segments: list[_Segment]) -> None:
+        now = time.time()
+        while len(segments) > 1:
+            oldest = segments[0]
+            if self._total <= self.max_bytes and (
+                self.max_age is None
+                or now - oldest.path.stat().st_mtime <= self.max_age
+            ):
+                break
+            oldest.path.unlink()
+            del segments[0]
+            self._total -= oldest.size
+
+    def wait(self) -> None:
+        """
+        Block until every chunk queued so far has been written.
+        """
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def stop(self) -> None:
+        """
+        Stop the worker thread once it has written the chunks already
+        queued. A new worker is started if more chunks are written.
+        """
+        executor = self._executor
+        if executor is None:
+            return
+        self._executor = None
+        executor.shutdown(wait=False)
+
+    def mark(self) -> list[tuple[Path, int]]:
+        """
+        Return the segments and their current sizes, so that reading can
+        stop at this point even if more chunks are written in the meantime.
+
+        This first waits for any queued chunks to be written, so that
+        messages discarded from a ``LogBuffer`` are not missed by readers.
+        """
+        self.wait()
+        with self._lock:
+            return [
+                (segment.path, segment.size) for segment in self._segments()
+            ]
+
+    def iter_messages(
+        self, marks: Optional[list[tuple[Path, int]]] = None
+    ) -> Iterator[bytes]:
+        """
+        Yield the stored messages, oldest first, reading (and decompressing)
+        a single chunk at a time.
+        """
+        if marks is None:
+            marks = self.mark()
+        for path, size in marks:
+            try:
+                f = open(path, "rb")  # pylint: disable=consider-using-with
+            except OSError:  # Pruned since being marked
+                continue
+            with f:
+                offset = 0
+                while offset + _RECORD.size <= size:
+                    length, _ = _RECORD.unpack(f.read(_RECORD.size))
+                    data = f.read(length)
+                    offset += _RECORD.size + length
+                    if len(data) < length or offset > size:
+                        break  # Truncated (e.g., by a crash mid-write)
+                    try:
+                        messages = _decode_chunk(data)
+                    except (zlib.error, struct.error):
+                        break
+                    yield from messages
+
+    def _index(
+        self, marks: list[tuple[Path, int]]
+    ) -> list[tuple[Path, int, int, int]]:
+        """
+        Return the path, offset, (compressed) size, and message count of
+        every stored chunk, reading only the record headers.
+        """
+        records = []
+        for path, size in marks:
+            try:
+                f = open(path, "rb")  # pylint: disable=consider-using-with
+            except OSError:  # Pruned since being marked
+                continue
+            with f:
+                offset = 0
+                while offset + _RECORD.size <= size:
+                    header = f.read(_RECORD.size)
+                    if len(header) < _RECORD.size:
+                        break
+                    length, count_ = _RECORD.unpack(header)
+                    start = offset + _RECORD.size
+                    offset = start + length
+                    if offset > size:
+                        break  # Truncated (e.g., by a crash mid-write)
+                    records.append((path, start, length, count_))
+                    f.seek(offset)
+        return records
+
+    def tail(
+        self, limit: int, marks: Optional[list[tuple[Path, int]]] = None
+    ) -> tuple[list[bytes], int]:
+        """
+        Return the ``limit`` most recently stored messages, oldest first,
+        along with the total number of stored messages.
+
+        Chunks are read newest first, and only until ``limit`` messages
+        have been found, so the rest of the history is never decompressed.
+        """
+        if marks is None:
+            marks = self.mark()
+        records = self._index(marks)
+        parts: list[list[bytes]] = []
+        needed = limit
+        for path, start, length, _ in reversed(records):
+            if needed <= 0:
+                break
+            try:
+                with open(path, "rb") as f:
+                    f.seek(start)
+                    messages = _decode_chunk(f.read(length))
+            except (OSError, zlib.error, struct.error):
+                continue
+            parts.append(messages[-needed:])
+            needed -= len(parts[-1])
+        messages = [m for part in reversed(parts) for m in part]
+        return messages, sum(record[3] for record in records)
+
+    def clear(self) -> None:
+        self.wait()
+        with self._lock:
+            for segment in self._segments():
+                try:
+                    segment.path.unlink()
+                except OSError as e:
+                    logging.warning("Error removing log history: %s", str(e))
+            self._listing = None
+
+
+class LogBudget:
+    """
+    A limit on the total number of bytes used by any number of
+    ``LogBuffer``s (e.g., the logs of every joined grid), enforced by
+    discarding the oldest chunk of messages from whichever buffer holds it.
+
+    :ivar max_bytes: The maximum number of bytes to keep across all of the
+        buffers using this budget.
+    :ivar used: The number of bytes currently used. This may over-count
+        the bytes held by buffers that have since been garbage-collected
+        until the next time the budget is exceeded.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self.used: int = 0
+        self.lock = threading.RLock()
+        self._buffers: weakref.WeakSet[LogBuffer] = weakref.WeakSet()
+
+    def register(self, buffer: LogBuffer) -> None:
+        self._buffers.add(buffer)
+
+    def enforce(self) -> None:
+        if self.used <= self.max_bytes:
+            return
+        with self.lock:
+            buffers = list(self._buffers)
+            self.used = sum(b.nbytes for b in buffers)
+            while self.used > self.max_bytes:
+                seqs = [(b.oldest_seq, b) for b in buffers]
+                sealed = [(seq, b) for seq, b in seqs if seq is not None]
+                if sealed:
+                    _, oldest = min(sealed, key=lambda item: item[0])
+                    oldest.drop_oldest_chunk()
+                    continue
+                largest = max(buffers, key=lambda b: b.nbytes, default=None)
+                if largest is None or not largest.nbytes:
+                    break
+                largest.drop_oldest_message()
+
+
+class LogBuffer:
+    """
+    A ring buffer of log messages, bounded by a shared ``LogBudget`` (and,
+    optionally, by a number of messages).
+
+    New messages are appended to an "open" chunk, which is compressed and
+    sealed once it reaches ``chunk_size`` bytes. Sealed chunks are only
+    decompressed when the messages are read (e.g., when exporting debug
+    logs), so memory usage stays low regardless of how many grids are
+    joined or how chatty their logs are.
+
+    :ivar maxlen: The maximum number of messages to keep (or ``None`` for
+        no limit other than the byte budget).
+    :ivar chunk_size: The number of (uncompressed) bytes at which the
+        current chunk is compressed and sealed.
+    :ivar nbytes: The number of bytes currently used by this buffer.
+    :ivar history: An optional ``LogSegmentStore`` to which chunks are
+        written when they are discarded from memory, rather than being
+        lost.
+    """
+
+    def __init__(
+        self,
+        maxlen: Optional[int] = None,
+        budget: Optional[LogBudget] = None,
+        chunk_size: int = 64 * 1024,
+        history: Optional[LogSegmentStore] = None,
+    ) -> None:
+        self.maxlen = maxlen
+        self.chunk_size = chunk_size
+        self.history = history
+        self.nbytes: int = 0
+        self._budget = budget
+        self._lock = budget.lock if budget else threading.RLock()
+        self._sealed: deque[_Chunk] = deque()
+        self._open: deque[bytes] = deque()
+        self._open_size: int = 0
+        # The number of messages already discarded from the oldest chunk
+        self._skip: int = 0
+        self._len: int = 0
+        if budget is not None:
+            budget.register(self)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[bytes]:
+        with self._lock:
+            marks = self.history.mark() if self.history else []
+            sealed = list(self._sealed)
+            # With a history, messages already discarded from the oldest
+            # chunk will be written to it (with the rest of the chunk) and
+            # so are still part of the log
+            skip = 0 if self.history else self._skip
+            open_ = list(self._open)
+        if self.history:
+            yield from self.history.iter_messages(marks)
+        for i, chunk in enumerate(sealed):
+            messages = chunk.decode()
+            yield from messages[skip:] if i == 0 else messages
+        yield from open_
+
+    @property
+    def oldest_seq(self) -> Optional[int]:
+        return self._sealed[0].seq if self._sealed else None
+
+    def _add_bytes(self, n: int) -> None:
+        self.nbytes += n
+        if self._budget is not None:
+            self._budget.used += n
+
+    def append(self, message: bytes) -> None:
+        if self.maxlen == 0:
+            return
+        size = _FRAME.size + len(message)
+        with self._lock:
+            self._open.append(message)
+            self._open_size += size
+            self._len += 1
+            self._add_bytes(size)
+            if self._open_size >= self.chunk_size:
+                self._seal()
+            if self.maxlen is not None:
+                while self._len > self.maxlen:
+                    self.drop_oldest_message()
+            if self._budget is not None:
+                self._budget.enforce()
+
+    def _seal(self) -> None:
+        raw = b"".join(_FRAME.pack(len(m)) + m for m in self._open)
+        chunk = _Chunk(zlib.compress(raw), len(self._open), next(_sequence))
+        self._sealed.append(chunk)
+        self._add_bytes(len(chunk.data) - self._open_size)
+        self._open.clear()
+        self._open_size = 0
+
+    def _discard(self, chunk: _Chunk) -> None:
+        self._add_bytes(-len(chunk.data))
+        if self.history is not None:
+            self.history.write_chunk(chunk.data, chunk.count)
+
+    def drop_oldest_chunk(self) -> None:
+        with self._lock:
+            if not self._sealed:
+                return
+            chunk = self._sealed.popleft()
+            self._len -= chunk.count - self._skip
+            self._skip = 0
+            self._discard(chunk)
+
+    def drop_oldest_message(self) -> None:
+        with self._lock:
+            if self.history is not None and self._open and not self._sealed:
+                self._seal()  # So that the message is kept in the history
+            if self._sealed:
+                self._skip += 1
+                self._len -= 1
+                if self._skip >= self._sealed[0].count:
+                    chunk = self._sealed.popleft()
+                    self._skip = 0
+                    self._discard(chunk)
+            elif self._open:
+                size = _FRAME.size + len(self._open.popleft())
+                self._open_size -= size
+                self._len -= 1
+                self._add_bytes(-size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sealed.clear()
+            self._open.clear()
+            self._open_size = 0
+            self._skip = 0
+            self._len = 0
+            self._add_bytes(-self.nbytes)
+
+    def iter_messages(self) -> Iterator[str]:
+        """
+        Yield the messages (including any in the history), oldest first,
+        decompressing a single chunk at a time.
+        """
+        for message in self:
+            yield message.decode("utf-8")
+
+    def tail(self, limit: int) -> tuple[list[str], int]:
+        """
+        Return the ``limit`` most recent messages (including any in the
+        history), oldest first, along with the number of earlier messages
+        that were left out.
+
+        Unlike ``iter_messages``, this reads backwards from the newest
+        chunk, decompressing only as many chunks as are needed.
+        """
+        with self._lock:
+            marks = self.history.mark() if self.history else []
+            sealed = list(self._sealed)
+            skip = 0 if self.history else self._skip
+            open_ = list(self._open)
+        total = len(open_)
+        parts: list[list[bytes]] = []
+        needed = limit
+        if needed > 0 and open_:
+            parts.append(open_[-needed:])
+            needed -= len(parts[-1])
+        for i in range(len(sealed) - 1, -1, -1):
+            chunk = sealed[i]
+            total += chunk.count - (skip if i == 0 else 0)
+            if needed <= 0:
+                continue
+            decoded = chunk.decode()
+            if i == 0:
+                decoded = decoded[skip:]
+            parts.append(decoded[-needed:])
+            needed -= len(parts[-1])
+        if self.history:
+            history, history_total = self.history.tail(max(needed, 0), marks)
+            parts.append(history)
+            total += history_total
+        lines = [m.decode("utf-8") for part in reversed(parts) for m in part]
+        return lines, total - len(lines)
+
+    def get_messages(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> list[str]:
+        """
+        Return the messages (including any in the history), oldest first.
+
+        :param offset: The number of (oldest) messages to skip.
+        :param limit: The maximum number of messages to return, allowing
+            the history to be paged through without reading all of it.
+        """
+        stop = None if limit is None else offset + limit
+        return [m.decode("utf-8") for m in islice(self, offset, stop)]
+
+
+_shared_budget: Optional[LogBudget] = None
+
+
+def shared_log_budget() -> LogBudget:
+    """
+    Return the ``LogBudget`` shared by every in-process log buffer.
+    """
+    global _shared_budget  # pylint: disable=global-statement
+    if _shared_budget is None:
+        _shared_budget = LogBudget()
+    return _shared_budget
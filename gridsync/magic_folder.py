@@ -1,30 +1,38 @@
 from __future__ import annotations
 
+import heapq
 import json
 import logging
 import os
-from collections import defaultdict, deque
+from collections import Counter, defaultdict
 from datetime import datetime
 from enum import Enum, auto
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, cast
 
-import treq
 from qtpy.QtCore import QObject, Signal
 from twisted.internet import reactor
 from twisted.internet.defer import Deferred, DeferredList
-from twisted.internet.task import deferLater
+from twisted.internet.interfaces import IReactorTime
 
 if TYPE_CHECKING:
-    from qtpy.QtCore import SignalInstance
+    from gridsync.filter import LogRedactor
+    from gridsync.http_client import HTTPResponse
     from gridsync.tahoe import Tahoe  # pylint: disable=cyclic-import
     from gridsync.types import JSON
 
 from gridsync import APP_NAME
 from gridsync.crypto import randstr
+from gridsync.file_index import FileIndex, FileIndexChanges, FileIndexStore
+from gridsync.log_buffer import (
+    LogBuffer,
+    LogSegmentStore,
+    shared_log_budget,
+)
 from gridsync.msg import critical
 from gridsync.supervisor import Supervisor
 from gridsync.system import SubprocessProtocol, which
+from gridsync.util import Batcher, Flag, JSONArrayParser, map_bounded
 from gridsync.watchdog import Watchdog
 from gridsync.websocket import WebSocketReaderService
 
@@ -54,18 +62,105 @@ class MagicFolderStatus(Enum):
     WAITING = auto()
 
 
+class OperationsIndex:
+    """
+    The in-progress uploads (or downloads) last reported by Magic-Folder's
+    status API, indexed by ``(folder_name, relpath)``.
+
+    Retaining the parsed operations between status messages allows each new
+    message to be diffed against the index directly rather than re-parsing
+    the previous state from scratch.
+    """
+
+    def __init__(self) -> None:
+        self._operations: dict[tuple[str, str], dict] = {}
+        self._counts: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._operations
+
+    def folders(self) -> list[str]:
+        """
+        Return the names of the folders that have operations in progress.
+        """
+        return list(self._counts)
+
+    def count(self, folder_name: str) -> int:
+        """
+        Return the number of operations currently in progress for the given
+        folder.
+        """
+        return self._counts[folder_name]
+
+    def update(
+        self, operations: dict[tuple[str, str], dict]
+    ) -> tuple[list[tuple[str, str, dict]], list[tuple[str, str, dict]]]:
+        """
+        Replace the indexed operations with ``operations``.
+
+        :return: A tuple of two lists of ``(folder_name, relpath, data)``
+            tuples; the first contains the operations that were added, the
+            second those that were removed (i.e., that have finished).
+        """
+        previous = self._operations
+        started = [
+            (folder, relpath, data)
+            for (folder, relpath), data in operations.items()
+            if (folder, relpath) not in previous
+        ]
+        if len(operations) - len(started) == len(previous):
+            finished = []  # Every previous operation is still present
+        else:
+            finished = [
+                (folder, relpath, data)
+                for (folder, relpath), data in previous.items()
+                if (folder, relpath) not in operations
+            ]
+        for folder, _, _ in started:
+            self._counts[folder] += 1
+        for folder, _, _ in finished:
+            self._counts[folder] -= 1
+            if not self._counts[folder]:
+                del self._counts[folder]
+        self._operations = operations
+        return started, finished
+
+
+def _parse_operations(
+    state: dict,
+) -> tuple[dict[tuple[str, str], dict], dict[tuple[str, str], dict]]:
+    """
+    Collect the uploads and downloads described by a Magic-Folder status API
+    state, keyed by ``(folder_name, relpath)``.
+    """
+    uploads: dict[tuple[str, str], dict] = {}
+    downloads: dict[tuple[str, str], dict] = {}
+    for folder, data in state.get("folders", {}).items():
+        for upload in data.get("uploads", []):
+            uploads[(folder, upload["relpath"])] = upload
+        for download in data.get("downloads", []):
+            downloads[(folder, download["relpath"])] = download
+    return (uploads, downloads)
+
+
 class MagicFolderMonitor(QObject):
 
     status_message_received = Signal(dict)
 
     sync_progress_updated = Signal(str, object, object)  # folder, cur, total
 
-    upload_started = Signal(str, str, dict)  # folder_name, relpath, data
-    upload_finished = Signal(str, str, dict)  # folder_name, relpath, data
-    download_started = Signal(str, str, dict)  # folder_name, relpath, data
-    download_finished = Signal(str, str, dict)  # folder_name, relpath, data
     files_updated = Signal(str, list)  # folder_name, relpaths
 
+    # Each of the following carries a list of (relpath, data) tuples for a
+    # single folder, so that a burst of operations can be handled at once.
+    uploads_started = Signal(str, list)  # folder_name, [(relpath, data)]
+    uploads_finished = Signal(str, list)  # folder_name, [(relpath, data)]
+    downloads_started = Signal(str, list)  # folder_name, [(relpath, data)]
+    downloads_finished = Signal(str, list)  # folder_name, [(relpath, data)]
+
     error_occurred = Signal(str, str, int)  # folder_name, summary, timestamp
 
     folder_added = Signal(str)  # folder_name
@@ -77,31 +172,46 @@ class MagicFolderMonitor(QObject):
     backup_added = Signal(str)  # folder_name
     backup_removed = Signal(str)  # folder_name
 
-    file_added = Signal(str, dict)  # folder_name, status
-    file_removed = Signal(str, dict)  # folder_name, status
-    file_mtime_updated = Signal(str, dict)  # folder_name, status
-    file_size_updated = Signal(str, dict)  # folder_name, status
-    file_modified = Signal(str, dict)  # folder_name, status
+    files_added = Signal(str, list)  # folder_name, [(relpath, status)]
+    files_removed = Signal(str, list)  # folder_name, [(relpath, status)]
+    file_mtimes_updated = Signal(str, list)  # folder_name, [(relpath, status)]
+    file_sizes_updated = Signal(str, list)  # folder_name, [(relpath, status)]
+    files_modified = Signal(str, list)  # folder_name, [(relpath, status)]
 
     overall_status_changed = Signal(object)  # MagicFolderStatus
     total_folders_size_updated = Signal(object)  # "object" avoids overflows
 
-    def __init__(self, magic_folder: MagicFolder) -> None:
+    def __init__(
+        self,
+        magic_folder: MagicFolder,
+        clock: Optional[IReactorTime] = None,
+        batch_interval: float = 0.25,
+        max_batch_size: int = 1000,
+        file_index_store: Optional[FileIndexStore] = None,
+    ) -> None:
         super().__init__()
         self.magic_folder = magic_folder
+        if clock is None:
+            clock = cast(IReactorTime, reactor)
+        self._clock: IReactorTime = clock
 
         self._ws_reader: Optional[WebSocketReaderService] = None
-        self.running: bool = False
+        self.running = Flag()
         self.errors: list = []
 
         self._prev_state: dict = {}
         self._known_folders: dict[str, dict] = {}
         self._known_backups: list[str] = []
 
+        self._file_indexes: dict[str, FileIndex] = {}
+        self._file_index_store = file_index_store
+        self._unwatched_folders: set[str] = set()
         self._folder_sizes: dict[str, int] = {}
         self._folder_statuses: dict[str, MagicFolderStatus] = {}
         self._total_folders_size: int = 0
 
+        self._uploads = OperationsIndex()
+        self._downloads = OperationsIndex()
         self._operations_queued: defaultdict[str, set] = defaultdict(set)
         self._operations_completed: defaultdict[str, dict] = defaultdict(dict)
 
@@ -112,6 +222,44 @@ class MagicFolderMonitor(QObject):
 
         self._overall_status: MagicFolderStatus = MagicFolderStatus.LOADING
 
+        # A single queue (rather than one per signal) preserves the order
+        # in which changes were observed, so that, e.g., an upload's
+        # "finished" signal never reaches listeners before its "started" one
+        self._batcher = Batcher(
+            clock,
+            self._emit_batch,
+            interval=batch_interval,
+            max_size=max_batch_size,
+        )
+
+    def _emit_batch(self, items: list[tuple[str, str, str, dict]]) -> None:
+        # Consecutive items for the same signal and folder are emitted
+        # together; anything else starts a new emission so that the overall
+        # order of the queue is kept.
+        runs: list[tuple[str, str, list[tuple[str, dict]]]] = []
+        for signal_name, folder_name, relpath, data in items:
+            if runs and runs[-1][:2] == (signal_name, folder_name):
+                runs[-1][2].append((relpath, data))
+            else:
+                runs.append((signal_name, folder_name, [(relpath, data)]))
+        for signal_name, folder_name, batch in runs:
+            getattr(self, signal_name).emit(folder_name, batch)
+
+    def _queue_signal(
+        self, signal_name: str, folder_name: str, relpath: str, data: dict
+    ) -> None:
+        """
+        Queue the given (relpath, data) item for emission by the named
+        batched signal.
+        """
+        self._batcher.add((signal_name, folder_name, relpath, data))
+
+    def flush_signals(self) -> None:
+        """
+        Emit all queued batched signals immediately.
+        """
+        self._batcher.flush()
+
     # XXX The `_maybe_do_...` functions could probably be refactored to
     # duplicate less
     def _maybe_do_scan(self, event_id: str, path: str) -> None:
@@ -172,43 +320,20 @@ class MagicFolderMonitor(QObject):
                     # so this will persist indefinitely...
                     self.errors.append(error)
 
-    @staticmethod
-    def _parse_operations(
-        state: dict,
-    ) -> tuple[defaultdict[str, dict], defaultdict[str, dict]]:
-        uploads: defaultdict[str, dict] = defaultdict(dict)
-        downloads: defaultdict[str, dict] = defaultdict(dict)
-        for folder, data in state.get("folders", {}).items():
-            for upload in data.get("uploads", []):
-                uploads[folder][upload["relpath"]] = upload
-            for download in data.get("downloads", []):
-                downloads[folder][download["relpath"]] = download
-        return (uploads, downloads)
-
     def _check_operations_started(
-        self,
-        current_operations: defaultdict[str, dict],
-        previous_operations: defaultdict[str, dict],
-        started_signal: SignalInstance,
+        self, started: list[tuple[str, str, dict]], started_signal_name: str
     ) -> None:
-        for folder, operation in current_operations.items():
-            for relpath, data in operation.items():
-                if relpath not in previous_operations[folder]:
-                    self._operations_queued[folder].add(relpath)
-                    started_signal.emit(folder, relpath, data)
+        for folder, relpath, data in started:
+            self._operations_queued[folder].add(relpath)
+            self._queue_signal(started_signal_name, folder, relpath, data)
 
     def _check_operations_finished(
-        self,
-        current_operations: defaultdict[str, dict],
-        previous_operations: defaultdict[str, dict],
-        finished_signal: SignalInstance,
+        self, finished: list[tuple[str, str, dict]], finished_signal_name: str
     ) -> None:
-        for folder, operation in previous_operations.items():
-            for relpath, data in operation.items():
-                if relpath not in current_operations[folder]:
-                    # XXX: Confirm in "recent" list?
-                    self._operations_completed[folder][relpath] = data
-                    finished_signal.emit(folder, relpath, data)
+        for folder, relpath, data in finished:
+            # XXX: Confirm in "recent" list?
+            self._operations_completed[folder][relpath] = data
+            self._queue_signal(finished_signal_name, folder, relpath, data)
 
     def _parse_folder_statuses(self, state: dict) -> dict:
         folder_statuses = {}
@@ -254,30 +379,37 @@ class MagicFolderMonitor(QObject):
     def compare_states(
         self, current_state: dict, previous_state: dict
     ) -> None:
+        """
+        Compare the given status API state against the previous one, emitting
+        signals for anything that changed.
+
+        Only errors are compared against ``previous_state`` directly; the
+        in-progress uploads and downloads are diffed against the operations
+        indexes, which retain the parsed form of the previous state so that
+        it doesn't need to be re-parsed for every status message.
+        """
         self._check_errors(current_state, previous_state)
-        current_uploads, current_downloads = self._parse_operations(
-            current_state
-        )
-        previous_uploads, previous_downloads = self._parse_operations(
-            previous_state
-        )
-        self._check_operations_started(
-            current_uploads, previous_uploads, self.upload_started
+        uploads, downloads = _parse_operations(current_state)
+        syncing_folders = list(
+            dict.fromkeys(self._uploads.folders() + self._downloads.folders())
         )
-        self._check_operations_started(
-            current_downloads, previous_downloads, self.download_started
+        uploads_started, uploads_finished = self._uploads.update(uploads)
+        downloads_started, downloads_finished = self._downloads.update(
+            downloads
         )
+        self._check_operations_started(uploads_started, "uploads_started")
+        self._check_operations_started(downloads_started, "downloads_started")
+        self._check_operations_finished(uploads_finished, "uploads_finished")
         self._check_operations_finished(
-            current_uploads, previous_uploads, self.upload_finished
+            downloads_finished, "downloads_finished"
         )
-        self._check_operations_finished(
-            current_downloads, previous_downloads, self.download_finished
-        )
-        for folder in list(previous_uploads) + list(previous_downloads):
+        for folder in syncing_folders:
             current = len(self._operations_completed[folder])
             total = len(self._operations_queued[folder])
             self.sync_progress_updated.emit(folder, current, total)
-            if not current_uploads[folder] and not current_downloads[folder]:
+            if not self._uploads.count(folder) and not self._downloads.count(
+                folder
+            ):
                 updated_files = list(self._operations_completed[folder])
                 try:
                     del self._operations_completed[folder]
@@ -287,36 +419,58 @@ class MagicFolderMonitor(QObject):
                     del self._operations_queued[folder]
                 except KeyError:
                     pass
+                # Deliver any pending "finished" signals first
+                self.flush_signals()
                 self.files_updated.emit(folder, updated_files)
         folder_statuses = self._parse_folder_statuses(current_state)
         self._check_folder_statuses(folder_statuses)
         self._check_overall_status(folder_statuses)
 
+    def _add_watch(self, magic_path: str) -> None:
+        try:
+            self._watchdog.add_watch(magic_path)
+        except Exception as exc:  # pylint: disable=broad-except
+            logging.warning(
+                "Error adding watch for %s: %s", magic_path, str(exc)
+            )
+
+    def _remove_watch(self, magic_path: str) -> None:
+        try:
+            self._watchdog.remove_watch(magic_path)
+        except Exception as exc:  # pylint: disable=broad-except
+            logging.warning(
+                "Error removing watch for %s: %s", magic_path, str(exc)
+            )
+
+    def _forget_folder(self, folder_name: str) -> None:
+        self._file_indexes.pop(folder_name, None)
+        self._folder_sizes.pop(folder_name, None)
+        if self._file_index_store is not None:
+            self._file_index_store.remove(folder_name)
+
     def compare_folders(
         self,
         current_folders: dict[str, dict],
         previous_folders: dict[str, dict],
     ) -> None:
         for folder, data in current_folders.items():
-            if folder not in previous_folders:
+            if folder in self._unwatched_folders:
+                # Already added (from the file index store) but not watched
+                self._unwatched_folders.discard(folder)
+            elif folder not in previous_folders:
                 self.folder_added.emit(folder)
-                magic_path = data.get("magic_path", "")
-                try:
-                    self._watchdog.add_watch(magic_path)
-                except Exception as exc:  # pylint: disable=broad-except
-                    logging.warning(
-                        "Error adding watch for %s: %s", magic_path, str(exc)
-                    )
+            else:
+                continue
+            self._add_watch(data.get("magic_path", ""))
         for folder, data in previous_folders.items():
-            if folder not in current_folders:
-                self.folder_removed.emit(folder)
-                magic_path = data.get("magic_path", "")
-                try:
-                    self._watchdog.remove_watch(magic_path)
-                except Exception as exc:  # pylint: disable=broad-except
-                    logging.warning(
-                        "Error removing watch for %s: %s", magic_path, str(exc)
-                    )
+            if folder in current_folders:
+                continue
+            self.folder_removed.emit(folder)
+            self._forget_folder(folder)
+            if folder in self._unwatched_folders:
+                self._unwatched_folders.discard(folder)
+                continue
+            self._remove_watch(data.get("magic_path", ""))
 
     def compare_backups(
         self, current_backups: list[str], previous_backups: list[str]
@@ -331,64 +485,98 @@ class MagicFolderMonitor(QObject):
             if backup not in current_backups:
                 self.backup_removed.emit(backup)
 
-    @staticmethod
-    def _parse_file_status(
-        file_status: list[dict], magic_path: str
-    ) -> tuple[dict[str, dict], list[int], int, int]:
-        files = {}
-        sizes = []
-        latest_mtime = 0
-        for item in file_status:
-            relpath = item.get("relpath", "")
-            item["path"] = str(Path(magic_path, relpath).resolve())
-            files[relpath] = item
-            size = int(item.get("size") or 0)  # XXX "size" is None if deleted
-            sizes.append(size)
-            mtime = item.get("last-updated", 0)
-            if mtime > latest_mtime:
-                latest_mtime = mtime
-        total_size = sum(sizes)
-        return files, sizes, total_size, latest_mtime
-
-    def _compare_file_status(
-        self,
-        folder_name: str,
-        magic_path: str,
-        file_status: list[dict],
-        previous_file_status: list[dict],
+    def _emit_file_changes(
+        self, folder_name: str, changes: FileIndexChanges
     ) -> None:
-        current = self._parse_file_status(file_status, magic_path)
-        current_files, _, current_total_size, current_latest_mtime = current
-        previous = self._parse_file_status(previous_file_status, magic_path)
-        prev_files, _, prev_total_size, prev_latest_mtime = previous
-
-        for file, status in current_files.items():
-            if file not in prev_files:
-                self.file_added.emit(folder_name, status)
-            else:
-                prev_status = prev_files.get(file, {})
-                prev_size = prev_status.get("size", 0)
-                prev_mtime = prev_status.get("mtime", 0)
-                size = status.get("size")
-                mtime = status.get("mtime")
-                modified = False
-                if mtime != prev_mtime:
-                    modified = True
-                    self.file_mtime_updated.emit(folder_name, status)
-                if size != prev_size:
-                    modified = True
-                    self.file_size_updated.emit(folder_name, status)
-                if modified:
-                    self.file_modified.emit(folder_name, status)
-        for file, status in prev_files.items():
-            if file not in prev_files:
-                self.file_removed.emit(folder_name, status)
-        if current_total_size != prev_total_size:
-            self.folder_size_updated.emit(folder_name, current_total_size)
-        if current_latest_mtime != prev_latest_mtime:
-            self.folder_mtime_updated.emit(folder_name, current_latest_mtime)
-
-        self._folder_sizes[folder_name] = current_total_size
+        for signal_name, statuses in (
+            ("files_added", changes.added),
+            ("file_mtimes_updated", changes.mtime_updated),
+            ("file_sizes_updated", changes.size_updated),
+            ("files_modified", changes.modified),
+            ("files_removed", changes.removed),
+        ):
+            for status in statuses:
+                relpath = status.get("relpath", "")
+                self._queue_signal(signal_name, folder_name, relpath, status)
+
+    async def _update_file_index(
+        self, folder_name: str, magic_path: str
+    ) -> None:
+        index = self._file_indexes.get(folder_name)
+        created = False
+        if index is None or index.magic_path != magic_path:
+            index = FileIndex(magic_path)
+            self._file_indexes[folder_name] = index
+            created = True
+        elif index.updating:
+            return  # Another check is already updating this folder
+        prev_total_size = index.total_size
+        prev_latest_mtime = index.latest_mtime
+        completed = False
+        index.start_update()
+        try:
+            await self.magic_folder.stream_file_status(folder_name, index.add)
+            completed = True
+        finally:
+            changes = index.finish_update(remove_missing=completed)
+            self._emit_file_changes(folder_name, changes)
+            if self._file_index_store is not None and (
+                created or changes.updated or changes.removed
+            ):
+                self._file_index_store.save(folder_name, index, changes)
+            if index.total_size != prev_total_size:
+                self.folder_size_updated.emit(folder_name, index.total_size)
+            if index.latest_mtime != prev_latest_mtime:
+                self.folder_mtime_updated.emit(folder_name, index.latest_mtime)
+            self._folder_sizes[folder_name] = index.total_size
+
+    async def load_file_index(self) -> None:
+        """
+        Restore the file indexes saved by a previous session and emit the
+        corresponding signals so that the last-known state of each folder
+        can be shown before Magic-Folder is running. Any differences from
+        the actual state will be emitted by the next ``do_check``.
+        """
+        if self._file_index_store is None:
+            return
+        indexes = await self._file_index_store.load()
+        for folder_name, index in indexes.items():
+            if folder_name in self._known_folders:
+                continue  # Already seen by a check; the cache is stale
+            self._known_folders[folder_name] = {"magic_path": index.magic_path}
+            self._unwatched_folders.add(folder_name)
+            self._file_indexes[folder_name] = index
+            self._folder_sizes[folder_name] = index.total_size
+            self.folder_added.emit(folder_name)
+            self.folder_size_updated.emit(folder_name, index.total_size)
+            self.folder_mtime_updated.emit(folder_name, index.latest_mtime)
+            for relpath, status in index.files.items():
+                self._queue_signal("files_added", folder_name, relpath, status)
+        self.flush_signals()
+        self._check_total_folders_size()
+
+    @property
+    def total_folders_size(self) -> int:
+        return self._total_folders_size
+
+    @property
+    def overall_status(self) -> MagicFolderStatus:
+        return self._overall_status
+
+    def get_recent_file_statuses(self, limit: int) -> list[dict]:
+        """
+        Return the (at most) ``limit`` most recently updated file status
+        entries across all folders, newest first.
+        """
+        return heapq.nlargest(
+            limit,
+            (
+                status
+                for index in self._file_indexes.values()
+                for status in index.files.values()
+            ),
+            key=lambda status: status.get("last-updated") or 0,
+        )
 
     def _check_total_folders_size(self) -> None:
         total = sum(self._folder_sizes.values())
@@ -396,24 +584,13 @@ class MagicFolderMonitor(QObject):
             self._total_folders_size = total
             self.total_folders_size_updated.emit(total)
 
-    def compare_files(
-        self, current_folders: dict, previous_folders: dict
-    ) -> None:
-        for folder_name, data in current_folders.items():
-            self._compare_file_status(
-                folder_name,
-                data.get("magic_path", ""),
-                data.get("file_status", []),
-                previous_folders.get(folder_name, {}).get("file_status", []),
-            )
-        self._check_total_folders_size()
-
     def _check_last_polls(self, state: dict) -> None:
         for folder_name, data in state.get("folders", {}).items():
             if not (data.get("poller", {}).get("last-poll") or 0):
                 self._schedule_magic_folder_poll(folder_name)
 
     def on_status_message_received(self, msg: str) -> None:
+        self.magic_folder.gateway.startup_timer.mark("first status message")
         data = json.loads(msg)
         self.status_message_received.emit(data)
         state = data.get("state")
@@ -421,12 +598,6 @@ class MagicFolderMonitor(QObject):
         self._check_last_polls(state)
         self._prev_state = state
 
-    async def _get_file_status(
-        self, folder_name: str
-    ) -> tuple[str, list[dict]]:
-        result = await self.magic_folder.get_file_status(folder_name)
-        return (folder_name, result)
-
     async def do_check(self) -> None:
         folders = await self.magic_folder.get_folders()
         current_folders = dict(folders)
@@ -443,19 +614,18 @@ class MagicFolderMonitor(QObject):
             self.compare_backups(current_backups, previous_backups)
             self._known_backups = current_backups
 
-        results = await DeferredList(
+        await DeferredList(
             [
-                Deferred.fromCoroutine(self._get_file_status(f))
-                for f in current_folders
+                Deferred.fromCoroutine(
+                    self._update_file_index(
+                        folder_name, data.get("magic_path", "")
+                    )
+                )
+                for folder_name, data in current_folders.items()
             ],
             consumeErrors=True,
         )
-        for success, result in results:
-            if success:  # XXX
-                folder_name, file_status = result
-                current_folders[folder_name]["file_status"] = file_status
-        self.compare_files(current_folders, previous_folders)
-        self._known_folders = current_folders
+        self._check_total_folders_size()
 
     def start(self) -> None:
         if self._ws_reader is not None:
@@ -468,16 +638,19 @@ class MagicFolderMonitor(QObject):
         )
         self._ws_reader.start()
         self._watchdog.start()
-        self.running = True
+        self.running.set()
         # XXX Something should wait on the result
         Deferred.fromCoroutine(self.do_check())
 
     def stop(self) -> None:
-        self.running = False
+        self.running.clear()
+        self.flush_signals()
         self._watchdog.stop()
         if self._ws_reader:
             self._ws_reader.stop()
             self._ws_reader = None
+        if self._file_index_store is not None:
+            self._file_index_store.close()
 
 
 class MagicFolder:
@@ -486,15 +659,25 @@ class MagicFolder:
         gateway: Tahoe,
         executable: Optional[str] = "",
         logs_maxlen: Optional[int] = 1000000,
+        log_history: Optional[LogSegmentStore] = None,
+        log_redactor: Optional[LogRedactor] = None,
     ) -> None:
         self.gateway = gateway
         self.executable = executable
-        self._log_buffer: deque[bytes] = deque(maxlen=logs_maxlen)
+        self._log_buffer = LogBuffer(
+            maxlen=logs_maxlen, budget=shared_log_budget(), history=log_history
+        )
+        self.log_redactor = log_redactor
 
         self.configdir = Path(gateway.nodedir, "private", "magic-folder")
         self.api_port: int = 0
         self.api_token: str = ""
-        self.monitor = MagicFolderMonitor(self)
+        self.monitor = MagicFolderMonitor(
+            self,
+            file_index_store=FileIndexStore(
+                Path(self.configdir, f"{APP_NAME}-file-index.sqlite")
+            ),
+        )
         self.magic_folders: dict[str, dict] = {}
         self.remote_magic_folders: dict[str, dict] = {}
         self.rootcap_manager = gateway.rootcap_manager
@@ -508,26 +691,52 @@ class MagicFolder:
 
     @staticmethod
     def _is_eliot_log_message(s: str) -> bool:
-        try:
-            data = json.loads(s)
-        except json.decoder.JSONDecodeError:
-            return False
-        if (
-            isinstance(data, dict)
-            and "timestamp" in data
-            and "task_uuid" in data
-        ):
-            return True
-        return False
+        # Eliot writes each message as a JSON object on a line of its own,
+        # so checking the line's framing and (required) keys is enough to
+        # tell log messages from other output -- without fully parsing
+        # every line of it. Lines that pass this check but are not valid
+        # JSON are handled when the logs are exported (see gridsync.filter)
+        s = s.strip()
+        return (
+            s.startswith("{")
+            and s.endswith("}")
+            and '"timestamp":' in s
+            and '"task_uuid":' in s
+        )
 
     def on_stderr_line_received(self, line: str) -> None:
         if self._is_eliot_log_message(line):
-            self._log_buffer.append(line.encode("utf-8"))
+            message = line.encode("utf-8")
+            self._log_buffer.append(message)
+            if self.log_redactor is not None:
+                self.log_redactor.add_message(message)
         else:
             logging.error("[magic-folder:stderr] %s", line)
 
-    def get_log_messages(self) -> list:
-        return list(msg.decode("utf-8") for msg in list(self._log_buffer))
+    def get_log_messages(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> list:
+        return self._log_buffer.get_messages(offset, limit)
+
+    def iter_log_messages(self) -> Iterator[str]:
+        return self._log_buffer.iter_messages()
+
+    def tail_log_messages(self, limit: int) -> tuple[list[str], int]:
+        return self._log_buffer.tail(limit)
+
+    def iter_filtered_log_messages(
+        self, identifier: str
+    ) -> Optional[Iterator[str]]:
+        if self.log_redactor is None:
+            return None
+        return self.log_redactor.iter_messages(identifier)
+
+    def tail_filtered_log_messages(
+        self, identifier: str, limit: int
+    ) -> Optional[tuple[list[str], int]]:
+        if self.log_redactor is None:
+            return None
+        return self.log_redactor.tail_messages(identifier, limit)
 
     def _base_command_args(self) -> list[str]:
         if not self.executable:
@@ -612,6 +821,7 @@ class MagicFolder:
                 stderr_line_collector=self.on_stderr_line_received,
                 call_after_start=self._on_started,
             )
+            self.gateway.startup_timer.mark("magic-folder ready")
         except Exception as exc:  # pylint: disable=broad-except
             critical(
                 "Error starting Magic-Folder",
@@ -624,34 +834,66 @@ class MagicFolder:
         logging.debug("Started magic-folder")
 
     async def await_running(self) -> None:
-        while not self.monitor.running:  # XXX
-            await deferLater(reactor, 0.2, lambda: None)  # type: ignore
+        await self.monitor.running.wait()
 
-    async def _request(
+    async def _send_request(
         self,
         method: str,
         path: str,
         body: bytes = b"",
-        error_404_ok: bool = False,
-    ) -> JSON:
+        collector: Optional[Callable[[bytes], None]] = None,
+    ) -> HTTPResponse:
         await self.await_running()  # XXX
         if not self.api_token:
             raise MagicFolderWebError("API token not found")
         if not self.api_port:
             raise MagicFolderWebError("API port not found")
-        resp = await treq.request(
+        return await self.gateway.http_client.request(
             method,
             f"http://127.0.0.1:{self.api_port}/v1{path}",
             headers={"Authorization": f"Bearer {self.api_token}"},
             data=body,
+            collector=collector,
         )
-        content = await treq.content(resp)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        error_404_ok: bool = False,
+    ) -> JSON:
+        resp = await self._send_request(method, path, body)
         if resp.code in (200, 201) or (resp.code == 404 and error_404_ok):
-            return json.loads(content)
+            return json.loads(resp.content)
         raise MagicFolderWebError(
-            f"Error {resp.code} requesting {method} /v1{path}: {content}"
+            f"Error {resp.code} requesting {method} /v1{path}: "
+            f"{resp.content!r}"
         )
 
+    async def _request_list(
+        self, method: str, path: str, collector: Callable[[JSON], None]
+    ) -> None:
+        """
+        Like ``_request`` but for endpoints that return a JSON list, passing
+        each element of the list to ``collector`` as soon as it has been
+        received and parsed (rather than waiting for the complete response).
+        """
+        parser = JSONArrayParser()
+
+        def collect(data: bytes) -> None:
+            for element in parser.feed(data):
+                collector(element)
+
+        resp = await self._send_request(method, path, collector=collect)
+        if resp.code not in (200, 201):
+            raise MagicFolderWebError(
+                f"Error {resp.code} requesting {method} /v1{path}: "
+                f"{resp.content!r}"
+            )
+        for element in parser.close():
+            collector(element)
+
     async def get_folders(self) -> dict[str, dict]:
         folders = await self._request(
             "GET", "/magic-folder?include_secret_information=1"
@@ -757,16 +999,31 @@ class MagicFolder:
             body=json.dumps(data).encode("utf-8"),
         )
 
-    async def get_file_status(self, folder_name: str) -> list[dict]:
-        output = await self._request(
-            "GET", f"/magic-folder/{folder_name}/file-status"
-        )
-        if isinstance(output, list):
-            return output
-        raise TypeError(
-            f"Expected file status as a list, instead got {type(output)!r}"
+    async def stream_file_status(
+        self, folder_name: str, collector: Callable[[dict], None]
+    ) -> None:
+        """
+        Request the file status of the given folder, passing each file status
+        entry to ``collector`` as soon as it has been parsed.
+        """
+
+        def collect(element: JSON) -> None:
+            if not isinstance(element, dict):
+                raise TypeError(
+                    f"Expected file status as a dict, instead got "
+                    f"{type(element)!r}"
+                )
+            collector(element)
+
+        await self._request_list(
+            "GET", f"/magic-folder/{folder_name}/file-status", collect
         )
 
+    async def get_file_status(self, folder_name: str) -> list[dict]:
+        output: list[dict] = []
+        await self.stream_file_status(folder_name, output.append)
+        return output
+
     async def get_object_sizes(self, folder_name: str) -> list[int]:
         sizes = await self._request(
             "GET", f"/magic-folder/{folder_name}/tahoe-objects"
@@ -779,11 +1036,12 @@ class MagicFolder:
             f"Expected object sizes as list, instead got {type(sizes)!r}"
         )
 
-    async def get_all_object_sizes(self) -> list[int]:
+    async def get_all_object_sizes(self, fan_out: int = 8) -> list[int]:
         all_sizes = []
         folders = await self.get_folders()
-        for folder in folders:
-            sizes = await self.get_object_sizes(folder)
+        for sizes in await map_bounded(
+            self.get_object_sizes, folders, fan_out
+        ):
             all_sizes.extend(sizes)
         return all_sizes
 
@@ -822,13 +1080,12 @@ class MagicFolder:
             raise ValueError("Collective dircap in folder data is missing")
         if upload_dircap is None:
             raise ValueError("Upload dircap in folder data is missing")
-        await self.rootcap_manager.add_backup(
+        await self.rootcap_manager.add_backups(
             ".magic-folders",
-            f"{folder_name} (collective)",
-            collective_dircap,
-        )
-        await self.rootcap_manager.add_backup(
-            ".magic-folders", f"{folder_name} (personal)", upload_dircap
+            {
+                f"{folder_name} (collective)": collective_dircap,
+                f"{folder_name} (personal)": upload_dircap,
+            },
         )
 
     async def get_folder_backups(self) -> Optional[dict[str, dict]]:
@@ -847,19 +1104,9 @@ class MagicFolder:
         return dict(folders)
 
     async def remove_folder_backup(self, folder_name: str) -> None:
-        await DeferredList(
-            [
-                Deferred.fromCoroutine(
-                    self.rootcap_manager.remove_backup(
-                        ".magic-folders", folder_name + " (collective)"
-                    )
-                ),
-                Deferred.fromCoroutine(
-                    self.rootcap_manager.remove_backup(
-                        ".magic-folders", folder_name + " (personal)"
-                    )
-                ),
-            ]
+        await self.rootcap_manager.remove_backups(
+            ".magic-folders",
+            [folder_name + " (collective)", folder_name + " (personal)"],
         )
         try:
             del self.remote_magic_folders[folder_name]
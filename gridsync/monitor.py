@@ -7,12 +7,13 @@ from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
 import attr
-from qtpy.QtCore import QObject, Signal
+from qtpy.QtCore import QObject, Signal, Slot
 from twisted.internet.defer import Deferred, inlineCallbacks
 from twisted.internet.error import ConnectError
-from twisted.internet.task import LoopingCall
 
 from gridsync.errors import TahoeWebError
+from gridsync.magic_folder import MagicFolderStatus
+from gridsync.scheduler import PollingTask, Scheduler, shared_scheduler
 from gridsync.types import TwistedDeferred
 
 if TYPE_CHECKING:
@@ -64,6 +65,14 @@ class GridChecker(QObject):
             self.num_known = num_known
             self.num_happy = num_happy
 
+    def state(self) -> tuple:
+        return (
+            self.num_connected,
+            self.num_known,
+            self.available_space,
+            self.is_connected,
+        )
+
 
 @attr.s
 class _VoucherParse:
@@ -169,6 +178,23 @@ class ZKAPChecker(QObject):
         self.days_remaining: int = 0
         self.unpaid_vouchers: list = []
         self.redeeming_vouchers: list = []
+        # The most recently emitted (used, remaining) and (price, period), so
+        # that views created later can be brought up to date
+        self.last_zkaps_update: Optional[tuple[int, int]] = None
+        self.last_price_update: Optional[tuple[int, int]] = None
+
+        self._price_update: Optional[Deferred[None]] = None
+        self._price_update_pending: bool = False
+
+    def state(self) -> tuple:
+        return (
+            self.zkaps_remaining,
+            self.zkaps_total,
+            self.zkaps_last_redeemed,
+            self.zkaps_renewal_cost,
+            self.unpaid_vouchers,
+            self.redeeming_vouchers,
+        )
 
     def consumption_rate(self) -> float:
         zkaps_spent = self.zkaps_total - self.zkaps_remaining
@@ -254,6 +280,7 @@ class ZKAPChecker(QObject):
             batches_consumed = 0
             tokens_to_trim = 0
             total_trimmed = total
+        self.last_zkaps_update = (used, remaining)
         self.zkaps_updated.emit(used, remaining)
         logging.debug(
             "ZKAPs updated: used: %i, remaining: %i; cumulative total: %i, "
@@ -267,10 +294,36 @@ class ZKAPChecker(QObject):
             batches_consumed,
             tokens_to_trim,
         )
-        self.update_price()  # XXX Maybe too expensive to call here?
+        self.update_price()
+
+    def update_price(self) -> Deferred[None]:
+        """
+        Update (and emit) the price of the currently stored data.
+
+        Calls made while an update is already in progress are coalesced
+        into a single follow-up update, which starts once the current one
+        has finished.
+        """
+        if self._price_update is not None:
+            self._price_update_pending = True
+            return self._price_update
+        d = Deferred.fromCoroutine(self._run_price_updates())
+        if not d.called:
+            self._price_update = d
+        return d
+
+    async def _run_price_updates(self) -> None:
+        try:
+            while True:
+                self._price_update_pending = False
+                await self._update_price()
+                if not self._price_update_pending:
+                    break
+        finally:
+            self._price_update = None
 
     @inlineCallbacks
-    def update_price(self) -> TwistedDeferred[None]:
+    def _update_price(self) -> TwistedDeferred[None]:
         # ZKAPAuthorizer.get_price() can fail with an HTTP 410 error if
         # called too soon during tahoe startup so wait until connected
         yield self.gateway.await_ready()
@@ -283,6 +336,7 @@ class ZKAPChecker(QObject):
             return
         price = p.get("price", 0)
         period = p.get("period", 0)
+        self.last_price_update = (price, period)
         self.zkaps_price_updated.emit(price, period)
         if price and period:
             seconds_remaining = self.zkaps_remaining / price * period
@@ -406,10 +460,19 @@ class Monitor(QObject):
     redeeming_vouchers_updated = Signal(list)
     low_zkaps_warning = Signal()
 
-    def __init__(self, gateway: Tahoe) -> None:
+    def __init__(
+        self, gateway: Tahoe, scheduler: Optional[Scheduler] = None
+    ) -> None:
         super().__init__()
         self.gateway = gateway
-        self.timer = LoopingCall(self.do_checks)
+        if scheduler is None:
+            scheduler = shared_scheduler()
+        self.scheduler = scheduler
+        # The longest that the checks may go without being run (while the
+        # monitor is started)
+        self.max_interval: float = 60
+        self._tasks: list[PollingTask] = []
+        self._syncing: bool = False
 
         self.grid_checker = GridChecker(self.gateway)
         self.grid_checker.connected.connect(self.connected.emit)
@@ -439,12 +502,62 @@ class Monitor(QObject):
         )
 
     @inlineCallbacks
-    def do_checks(self) -> TwistedDeferred[None]:
+    def do_checks(self) -> TwistedDeferred[bool]:
+        """
+        Check the ZKAP and grid state, emitting ``check_finished`` once both
+        checks have completed.
+
+        :return: A Deferred that fires with whether either state changed.
+        """
+        previous_states = (
+            self.zkap_checker.state(),
+            self.grid_checker.state(),
+        )
         yield self.zkap_checker.do_check()
         yield self.grid_checker.do_check()
         self.check_finished.emit()
+        return (
+            self.zkap_checker.state(),
+            self.grid_checker.state(),
+        ) != previous_states
+
+    def _zkaps_active(self) -> bool:
+        # ZKAPs are spent while syncing and become available while redeeming
+        return bool(
+            self._syncing
+            or self.zkap_checker.unpaid_vouchers
+            or self.zkap_checker.redeeming_vouchers
+        )
+
+    @Slot(object)
+    def on_sync_status_changed(self, status: MagicFolderStatus) -> None:
+        self._syncing = status == MagicFolderStatus.SYNCING
+        if self._syncing:
+            for task in self._tasks:
+                self.scheduler.wake(task)
 
-    def start(self, interval: int = 2) -> None:
+    def start(self, min_interval: float = 2, max_interval: float = 60) -> None:
+        """
+        Start checking for changes, at an interval that starts at (and is
+        reset to) ``min_interval`` whenever something changes but that
+        otherwise backs off exponentially to ``max_interval``.
+        """
         if not self._started:
             self._started = True
-            self.timer.start(interval, now=True)
+            self.max_interval = max_interval
+            # A single task, so that listeners to ``check_finished`` see
+            # the results of both checks at once
+            self._tasks = [
+                self.scheduler.add(
+                    self.do_checks,
+                    min_interval,
+                    max_interval,
+                    is_active=self._zkaps_active,
+                )
+            ]
+
+    def stop(self) -> None:
+        for task in self._tasks:
+            self.scheduler.remove(task)
+        self._tasks = []
+        self._started = False
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Tools for measuring how long it takes to start up (as enabled by the
+``--profile-startup`` command-line option).
+
+This module deliberately imports nothing beyond the standard library so
+that it can be loaded -- and an ``ImportTimer`` installed -- before any of
+the (comparatively expensive) imports that it is meant to measure.
+"""
+from __future__ import annotations
+
+import importlib.abc
+import sys
+import threading
+from importlib.machinery import ModuleSpec
+from time import perf_counter, time
+from types import ModuleType
+from typing import Optional, Sequence, Union
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(
+        self, loader: importlib.abc.Loader, timer: ImportTimer
+    ) -> None:
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> Optional[ModuleType]:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        # Restore the original loader so that, e.g., resource lookups made
+        # while (or after) executing the module behave as they normally would
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        module.__loader__ = self._loader
+        self._timer.enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.exit(module.__name__)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Measure how long each module takes to import, in the manner of
+    ``python -X importtime`` (but without needing to re-launch the
+    interpreter with that option).
+
+    :ivar records: For each imported module (in the order in which each
+        finished being imported): its name, its nesting depth, the number of
+        microseconds spent importing the module itself, and the number
+        spent importing it along with all of the modules it imported.
+    :ivar started: The time (per ``time.time``) at which the timer was
+        installed, or ``None`` if it has not been.
+    :ivar stopped: The time at which the timer was uninstalled, or ``None``.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[tuple[str, int, int, int]] = []
+        self.started: Optional[float] = None
+        self.stopped: Optional[float] = None
+        self._local = threading.local()
+
+    def _stack(self) -> list[list[float]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def install(self) -> None:
+        self.started = time()
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        self.stopped = time()
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[Union[bytes, str]]],
+        target: Optional[ModuleType] = None,
+    ) -> Optional[ModuleSpec]:
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def enter(self) -> None:
+        # [start time, time spent importing nested modules]
+        self._stack().append([perf_counter(), 0.0])
+
+    def exit(self, name: str) -> None:
+        stack = self._stack()
+        start, nested = stack.pop()
+        elapsed = perf_counter() - start
+        if stack:
+            stack[-1][1] += elapsed
+        self.records.append(
+            (
+                name,
+                len(stack),
+                round((elapsed - nested) * 1e6),
+                round(elapsed * 1e6),
+            )
+        )
+
+    def report(self, limit: Optional[int] = None) -> str:
+        """
+        Return the recorded import times formatted as they would be by
+        ``python -X importtime``, optionally only for the ``limit`` modules
+        that took the longest (cumulatively) to import.
+        """
+        records = self.records
+        if limit is not None:
+            slowest = sorted(
+                range(len(records)), key=lambda i: records[i][3], reverse=True
+            )
+            records = [records[i] for i in sorted(slowest[:limit])]
+        lines = ["import time: self [us] | cumulative | imported package"]
+        for name, depth, self_us, cumulative_us in records:
+            lines.append(
+                f"import time: {self_us:>9} | {cumulative_us:>10} | "
+                f"{'  ' * depth}{name}"
+            )
+        return "\n".join(lines)
+
+
+def process_started() -> float:
+    """
+    Return the time (per ``time.time``) at which the current process was
+    started, or -- if that cannot be determined -- the current time.
+    """
+    import psutil
+
+    try:
+        return psutil.Process().create_time()
+    except psutil.Error:
+        return time()
@@ -2,11 +2,14 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
+from time import monotonic
 from typing import TYPE_CHECKING, Optional
 
 from atomicwrites import atomic_write
 from twisted.internet.defer import DeferredLock
 
+from gridsync.util import ReadWriteLock
+
 if TYPE_CHECKING:
     from gridsync.tahoe import Tahoe  # pylint: disable=cyclic-import
 
@@ -39,11 +42,91 @@ class RootcapManager:
     def __init__(self, gateway: Tahoe, basedir: str = "v0") -> None:
         self.gateway = gateway
         self.basedir = basedir
+        # Guards the creation of the rootcap itself; changes to directories
+        # beneath it are guarded by per-directory locks (see `_get_lock`)
         self.lock = DeferredLock()
+        self.listing_ttl: float = 60
         self._rootcap_path = Path(gateway.nodedir, "private", "rootcap")
         self._rootcap: str = ""
         self._basedircap = ""
         self._backup_caps: dict = {}
+        self._dir_locks: dict[str, ReadWriteLock] = {}
+        self._listings: dict[str, tuple[float, dict[str, dict]]] = {}
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether any operation is currently reading or modifying the rootcap
+        (or any of the directories beneath it).
+        """
+        return self.lock.locked or any(
+            lock.locked for lock in self._dir_locks.values()
+        )
+
+    async def wait_until_idle(self) -> None:
+        await self.lock.acquire()
+        self.lock.release()
+        for lock in list(self._dir_locks.values()):
+            await lock.acquire_write()
+            lock.release_write()
+
+    def _get_lock(self, dircap: str) -> ReadWriteLock:
+        lock = self._dir_locks.get(dircap)
+        if lock is None:
+            lock = ReadWriteLock()
+            self._dir_locks[dircap] = lock
+        return lock
+
+    def invalidate(self, dircap: str = "") -> None:
+        """
+        Forget the cached listing of a directory (or, if no ``dircap`` is
+        given, of every directory) so that it will be re-read from the grid.
+        """
+        if dircap:
+            self._listings.pop(dircap, None)
+        else:
+            self._listings.clear()
+
+    async def _ls(self, dircap: str) -> Optional[dict[str, dict]]:
+        lock = self._get_lock(dircap)
+        await lock.acquire_read()
+        try:
+            cached = self._listings.get(dircap)
+            if cached and monotonic() - cached[0] < self.listing_ttl:
+                return dict(cached[1])
+            listing = await self.gateway.ls(dircap)
+            if listing is None:
+                return None
+            self._listings[dircap] = (monotonic(), listing)
+            return dict(listing)
+        finally:
+            lock.release_read()
+
+    def _update_listing(
+        self, dircap: str, added: dict[str, str], removed: list[str]
+    ) -> None:
+        # Write-through; reflect our own changes in the cached listing so
+        # that reading them back doesn't require another round-trip. Only
+        # the "cap" and "type" fields are known (and used) for new entries.
+        cached = self._listings.get(dircap)
+        if cached is None:
+            return
+        listing = cached[1]
+        for name, cap in added.items():
+            node_type = "dirnode" if cap.startswith("URI:DIR2") else "filenode"
+            listing[name] = {"cap": cap, "type": node_type}
+        for name in removed:
+            listing.pop(name, None)
+
+    async def _mkdir(self, parentcap: str, name: str) -> str:
+        lock = self._get_lock(parentcap)
+        await lock.acquire_write()
+        try:
+            dircap = await self.gateway.mkdir(parentcap, name)
+            self._update_listing(parentcap, {name: dircap}, [])
+        finally:
+            lock.release_write()
+        return dircap
 
     def get_rootcap(self) -> str:
         if self._rootcap:
@@ -61,6 +144,9 @@ class RootcapManager:
             f.write(cap)
         logging.debug("Rootcap saved to file: %s", self._rootcap_path)
         self._rootcap = cap
+        self._basedircap = ""
+        self._backup_caps = {}
+        self.invalidate()
 
     async def create_rootcap(self) -> str:
         logging.debug("Creating rootcap...")
@@ -97,32 +183,31 @@ class RootcapManager:
         rootcap = self.get_rootcap()
         if not rootcap:
             rootcap = await self.create_rootcap()
-        subdirs = await self.gateway.ls(rootcap, exclude_filenodes=True)
+        subdirs = await self._ls(rootcap)
         if subdirs is None:
             raise ValueError("Failed to list rootcap contents")
-        self._basedircap = subdirs.get(self.basedir, {}).get("cap", "")
+        basedir = subdirs.get(self.basedir, {})
+        if basedir.get("type") == "dirnode":
+            self._basedircap = basedir.get("cap", "")
         if self._basedircap:
             return self._basedircap
-        await self.lock.acquire()
-        if self._basedircap:
-            self.lock.release()
-            return self._basedircap
-        logging.debug('Creating base ("%s") dircap...', self.basedir)
+        lock = self._get_lock(rootcap)
+        await lock.acquire_write()
         try:
+            if self._basedircap:
+                return self._basedircap
+            logging.debug('Creating base ("%s") dircap...', self.basedir)
             self._basedircap = await self.gateway.mkdir(rootcap, self.basedir)
+            self._update_listing(rootcap, {self.basedir: self._basedircap}, [])
         finally:
-            self.lock.release()
+            lock.release_write()
         logging.debug('Base ("%s") dircap successfully created', self.basedir)
         return self._basedircap
 
     async def create_backup_cap(self, name: str, basedircap: str = "") -> str:
         if not basedircap:
             basedircap = await self._get_basedircap()
-        await self.lock.acquire()
-        try:
-            backup_cap = await self.gateway.mkdir(basedircap, name)
-        finally:
-            self.lock.release()
+        backup_cap = await self._mkdir(basedircap, name)
         self._backup_caps[name] = backup_cap
         return backup_cap
 
@@ -132,12 +217,13 @@ class RootcapManager:
             return backup_cap
         if not basedircap:
             basedircap = await self._get_basedircap()
-        ls_output = await self.gateway.ls(basedircap, exclude_filenodes=True)
+        ls_output = await self._ls(basedircap)
         if ls_output is None:
             raise ValueError("Failed to list backup contents")
         backup_caps = {}
         for dirname, data in ls_output.items():
-            backup_caps[dirname] = data.get("cap", "")
+            if data.get("type") == "dirnode":
+                backup_caps[dirname] = data.get("cap", "")
         backup_cap = backup_caps.get(name, "")
         if not backup_cap:
             backup_cap = await self.create_backup_cap(name, basedircap)
@@ -146,12 +232,26 @@ class RootcapManager:
         return backup_cap
 
     async def add_backup(self, dirname: str, name: str, cap: str) -> None:
+        await self.add_backups(dirname, {name: cap})
+
+    async def add_backups(self, dirname: str, backups: dict[str, str]) -> None:
+        """
+        Add many backups beneath the same directory using a single write.
+
+        :param dirname: The name of the backup directory (e.g.,
+            ".magic-folders") beneath the base dircap.
+        :param backups: A mapping of names to the capabilities to back up.
+        """
+        if not backups:
+            return
         backup_cap = await self.get_backup_cap(dirname)
-        await self.lock.acquire()
+        lock = self._get_lock(backup_cap)
+        await lock.acquire_write()
         try:
-            await self.gateway.link(backup_cap, name, cap)
+            await self.gateway.set_children(backup_cap, backups)
+            self._update_listing(backup_cap, backups, [])
         finally:
-            self.lock.release()
+            lock.release_write()
 
     async def get_backup(self, dirname: str, name: str) -> str:
         """
@@ -161,7 +261,7 @@ class RootcapManager:
         :param name: same meaning as add_backup
         """
         backup_cap = await self.get_backup_cap(dirname)
-        ls_output = await self.gateway.ls(backup_cap)
+        ls_output = await self._ls(backup_cap)
         if ls_output is None:
             raise ValueError("Failed to list backup contents")
         for directory, data in ls_output.items():
@@ -171,13 +271,23 @@ class RootcapManager:
 
     async def get_backups(self, dirname: str) -> Optional[dict]:
         backup_cap = await self.get_backup_cap(dirname)
-        ls_output = await self.gateway.ls(backup_cap)
+        ls_output = await self._ls(backup_cap)
         return ls_output
 
     async def remove_backup(self, dirname: str, name: str) -> None:
+        await self.remove_backups(dirname, [name])
+
+    async def remove_backups(self, dirname: str, names: list[str]) -> None:
+        if not names:
+            return
         backup_cap = await self.get_backup_cap(dirname)
-        await self.lock.acquire()
+        lock = self._get_lock(backup_cap)
+        await lock.acquire_write()
         try:
-            await self.gateway.unlink(backup_cap, name, missing_ok=True)
+            # Tahoe-LAFS has no batch equivalent of ``t=unlink`` but holding
+            # the lock across all of them avoids re-queuing behind others
+            for name in names:
+                await self.gateway.unlink(backup_cap, name, missing_ok=True)
+                self._update_listing(backup_cap, {}, [name])
         finally:
-            self.lock.release()
+            lock.release_write()
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+from typing import Awaitable, Callable, Optional, cast
+
+import attr
+from twisted.internet.defer import Deferred
+from twisted.internet.interfaces import IDelayedCall, IReactorTime
+
+
+@attr.s(eq=False)
+class PollingTask:
+    """
+    A check that is run periodically by a ``Scheduler``.
+
+    After each run, the interval until the next run is reset to
+    ``min_interval`` if the check reported a change (or ``is_active``
+    returns ``True``); otherwise it is multiplied by ``backoff``, up to a
+    limit of ``max_interval``.
+
+    :ivar function: The check to run. It should return (or fire with)
+        ``True`` if it noticed any changes.
+    :ivar is_active: A function returning whether something is currently
+        happening that should be checked as often as possible.
+    :ivar interval: The current interval, in seconds, between runs.
+    :ivar next_run: The (reactor) time at which the check should next run.
+    :ivar running: Whether the check is currently running.
+    """
+
+    function: Callable[[], Awaitable[object]] = attr.ib()
+    min_interval: float = attr.ib(default=2.0)
+    max_interval: float = attr.ib(default=60.0)
+    backoff: float = attr.ib(default=2.0)
+    is_active: Callable[[], bool] = attr.ib(default=lambda: False)
+    interval: float = attr.ib(default=0.0)
+    next_run: float = attr.ib(default=0.0)
+    running: bool = attr.ib(default=False)
+
+    def __attrs_post_init__(self) -> None:
+        self.interval = self.min_interval
+
+    def update_interval(self, changed: bool) -> None:
+        if changed or self.is_active():
+            self.interval = self.min_interval
+        else:
+            self.interval = min(
+                self.interval * self.backoff, self.max_interval
+            )
+
+
+class Scheduler:
+    """
+    Run many ``PollingTask``s (from any number of gateways) using a single
+    timer, which is always scheduled for whichever task is due next.
+
+    While paused (e.g., because the main window has been hidden), tasks
+    are not stopped altogether -- so that connection changes and low ZKAP
+    warnings are still noticed -- but are run only at their
+    ``max_interval``.
+
+    :ivar paused: Whether the scheduler is paused.
+    """
+
+    def __init__(
+        self, clock: Optional[IReactorTime] = None, paused: bool = False
+    ) -> None:
+        if clock is None:
+            from twisted.internet import reactor
+
+            clock = cast(IReactorTime, reactor)
+        self._clock: IReactorTime = clock
+        self._tasks: list[PollingTask] = []
+        self._delayed_call: Optional[IDelayedCall] = None
+        self.paused: bool = paused
+
+    def add(
+        self,
+        function: Callable[[], Awaitable[object]],
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        backoff: float = 2.0,
+        is_active: Optional[Callable[[], bool]] = None,
+    ) -> PollingTask:
+        """
+        Add a check to the schedule, running it as soon as possible.
+        """
+        task = PollingTask(
+            function,
+            min_interval,
+            max_interval,
+            backoff,
+            is_active or (lambda: False),
+        )
+        task.next_run = self._now()
+        self._tasks.append(task)
+        self._reschedule()
+        return task
+
+    def remove(self, task: PollingTask) -> None:
+        if task in self._tasks:
+            self._tasks.remove(task)
+            self._reschedule()
+
+    def wake(self, task: PollingTask) -> None:
+        """
+        Run a task as soon as possible and reset its interval to the
+        minimum (e.g., because something has started happening).
+        """
+        task.interval = task.min_interval
+        task.next_run = self._now()
+        self._reschedule()
+
+    def pause(self) -> None:
+        self.paused = True
+
+    def resume(self) -> None:
+        """
+        Stop using the maximum interval, running every task immediately so
+        that the information they provide is current.
+        """
+        if not self.paused:
+            return
+        self.paused = False
+        now = self._now()
+        for task in self._tasks:
+            task.next_run = min(task.next_run, now)
+        self._reschedule()
+
+    def _now(self) -> float:
+        return self._clock.seconds()  # type: ignore
+
+    def _reschedule(self) -> None:
+        delayed_call = self._delayed_call
+        if delayed_call is not None and delayed_call.active():  # type: ignore
+            delayed_call.cancel()  # type: ignore
+        self._delayed_call = None
+        waiting = [t.next_run for t in self._tasks if not t.running]
+        if not waiting:
+            return
+        delay = max(0.0, min(waiting) - self._now())
+        self._delayed_call = self._clock.callLater(
+            delay, self._run_due  # type: ignore
+        )
+
+    def _run_due(self) -> None:
+        self._delayed_call = None
+        now = self._now()
+        for task in list(self._tasks):
+            if not task.running and task.next_run <= now:
+                task.running = True
+                Deferred.fromCoroutine(self._run_task(task))
+        self._reschedule()
+
+    async def _run_task(self, task: PollingTask) -> None:
+        changed = False
+        try:
+            changed = bool(await task.function())
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning("Error running %s: %s", task.function, str(e))
+        task.update_interval(changed)
+        interval = task.max_interval if self.paused else task.interval
+        task.next_run = self._now() + interval
+        task.running = False
+        if task in self._tasks:
+            self._reschedule()
+
+
+_shared_scheduler: Optional[Scheduler] = None
+
+
+def shared_scheduler() -> Scheduler:
+    """
+    Return the ``Scheduler`` shared by every gateway's ``Monitor``.
+
+    It is paused and resumed as the main window is hidden and shown (see
+    ``MainWindow.hideEvent``). It starts out running, since a window that
+    is never shown (e.g., when starting in the tray) is never hidden
+    either, but a tray-only session should still back off as usual rather
+    than check only at each task's ``max_interval``.
+    """
+    global _shared_scheduler  # pylint: disable=global-statement
+    if _shared_scheduler is None:
+        _shared_scheduler = Scheduler()
+    return _shared_scheduler
@@ -6,8 +6,7 @@ node.
 """
 
 import logging
-from collections import deque
-from typing import Optional
+from typing import Iterator, Optional
 
 from autobahn.twisted.websocket import (
     WebSocketClientFactory,
@@ -19,6 +18,14 @@ from twisted.application.service import MultiService
 from twisted.internet.endpoints import TCP4ClientEndpoint
 from twisted.internet.interfaces import IReactorTime
 
+from gridsync.filter import LogRedactor
+from gridsync.log_buffer import (
+    LogBudget,
+    LogBuffer,
+    LogSegmentStore,
+    shared_log_budget,
+)
+
 
 class TahoeLogReader(
     WebSocketClientProtocol
@@ -38,26 +45,39 @@ class StreamedLogs(MultiService):
     :ivar _reactor: A reactor that can connect using whatever transport the
         Tahoe-LAFS node requires (TCP, etc).
 
-    :ivar deque _buffer: Bounded storage for the streamed messages.
+    :ivar LogBuffer _buffer: Bounded storage for the streamed messages.
+
+    :ivar redactor: An optional ``LogRedactor`` which also keeps a filtered
+        copy of each streamed message.
     """
 
     _started = False
 
     def __init__(
-        self, reactor: IReactorTime, maxlen: Optional[int] = None
+        self,
+        reactor: IReactorTime,
+        maxlen: Optional[int] = None,
+        budget: Optional[LogBudget] = None,
+        history: Optional[LogSegmentStore] = None,
+        redactor: Optional[LogRedactor] = None,
     ) -> None:
         super().__init__()
         self._reactor = reactor
         self._client_service: Optional[ClientService] = None
         if maxlen is None:
-            # This deque limit is based on average message size of 260 bytes
-            # and a desire to limit maximum memory consumption here to around
-            # 500 MiB.
+            # Memory usage is bounded by the (shared) byte budget; this
+            # limit on the number of messages is kept only for consistency
+            # with the "log_maxlen" debug setting.
             maxlen = 2000000
-        self._buffer: deque = deque(maxlen=maxlen)
+        if budget is None:
+            budget = shared_log_budget()
+        self._buffer = LogBuffer(maxlen=maxlen, budget=budget, history=history)
+        self.redactor = redactor
 
     def add_message(self, message: bytes) -> None:
         self._buffer.append(message)
+        if self.redactor is not None:
+            self.redactor.add_message(message)
 
     def start(self, nodeurl: str, api_token: str) -> None:
         """
@@ -81,11 +101,33 @@ class StreamedLogs(MultiService):
             return super().stopService()
         return None
 
-    def get_streamed_log_messages(self) -> list:
+    def get_streamed_log_messages(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> list:
+        """
+        :param int offset: The number of (oldest) messages to skip.
+        :param limit: The maximum number of messages to return.
+
+        :return list[str]: The messages currently in the message buffer
+            (preceded by those in its on-disk history, if it has one).
+        """
+        return self._buffer.get_messages(offset, limit)
+
+    def iter_streamed_log_messages(self) -> Iterator[str]:
+        """
+        :return: An iterator over the same messages as
+            ``get_streamed_log_messages``, which does not hold all of them
+            in memory at once.
+        """
+        return self._buffer.iter_messages()
+
+    def tail_streamed_log_messages(self, limit: int) -> tuple[list[str], int]:
         """
-        :return list[str]: The messages currently in the message buffer.
+        :return: The ``limit`` most recent of the same messages as
+            ``get_streamed_log_messages`` and the number of earlier
+            messages left out (see ``LogBuffer.tail``).
         """
-        return list(msg.decode("utf-8") for msg in list(self._buffer))
+        return self._buffer.tail(limit)
 
     def _create_client_service(
         self, nodeurl: str, api_token: str
@@ -15,6 +15,7 @@ from gridsync.system import (
     terminate,
 )
 from gridsync.types import TwistedDeferred
+from gridsync.util import Flag
 
 
 class Supervisor:
@@ -28,6 +29,9 @@ class Supervisor:
         self.pid: Optional[int] = None
         self.name: str = ""
         self.time_started: Optional[float] = None
+        # Set while the supervised process is running (i.e., once it has
+        # started and until it ends or is stopped)
+        self.running = Flag()
         self._keep_alive: bool = True
         self._args: list[str] = []
         self._started_trigger = ""
@@ -65,6 +69,7 @@ class Supervisor:
         logging.debug("Supervised process stopped: %s", " ".join(self._args))
         self.pid = None
         self.name = ""
+        self.running.clear()
 
     @inlineCallbacks
     def _start_process(self) -> TwistedDeferred[tuple[int, str]]:
@@ -101,11 +106,13 @@ class Supervisor:
         )
         self.pid = pid
         self.name = name
+        self.running.set()
         if self._call_after_start:
             self._call_after_start()
         return (pid, name)
 
     def _schedule_restart(self, _) -> None:  # type: ignore
+        self.running.clear()
         if self._keep_alive:
             logging.debug(
                 "Restarting supervised process: %s", " ".join(self._args)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import json
+import logging
+import os
 import shutil
 import time
-from io import BytesIO
+from pathlib import Path
 from typing import TYPE_CHECKING, Callable, Optional, Union
 
+from atomicwrites import atomic_write
 from psutil import NoSuchProcess, Process, TimeoutExpired
 from twisted.internet import reactor
 from twisted.internet.defer import Deferred, inlineCallbacks
@@ -89,6 +93,17 @@ class SubprocessError(Exception):
 
 
 class SubprocessProtocol(ProcessProtocol):
+    """
+    Collect the output of a subprocess, line by line, and fire ``done``
+    with that output once the process ends or once a line containing one
+    of the given "trigger" strings is received.
+
+    Output is split into lines at the byte level (so that lines -- and
+    multi-byte characters -- split across reads are reassembled before
+    being decoded), and only the most recent ``max_output`` bytes of it
+    are kept for the result of ``done``.
+    """
+
     def __init__(  # pylint: disable=too-many-arguments
         self,
         callback_triggers: Optional[list[str]] = None,
@@ -96,51 +111,158 @@ class SubprocessProtocol(ProcessProtocol):
         stdout_line_collector: Optional[Callable] = None,
         stderr_line_collector: Optional[Callable] = None,
         on_process_ended: Optional[Callable] = None,
+        max_output: int = 1024 * 1024,
     ) -> None:
         self.callback_triggers = callback_triggers
         self.errback_triggers = errback_triggers
         self.stdout_line_collector = stdout_line_collector
         self.stderr_line_collector = stderr_line_collector
         self._on_process_ended = on_process_ended
-        self._output = BytesIO()
+        self.max_output = max_output
+        self._output = bytearray()
+        # The (incomplete) last line received on each file descriptor
+        self._partial_lines: dict[int, bytes] = {}
         self.done: Deferred = Deferred()
 
-    def _check_triggers(self, line: str) -> None:
-        if self.callback_triggers:
-            for text in self.callback_triggers:
-                if text and text in line:
-                    self.done.callback(
-                        self._output.getvalue().decode("utf-8").strip()
-                    )
-        if self.errback_triggers:
-            for pair in self.errback_triggers:
-                if not pair:
-                    continue
-                text, exception = pair
-                if text and exception and text in line:
-                    self.done.errback(
-                        exception(
-                            self._output.getvalue().decode("utf-8").strip()
-                        )
-                    )
+    def _get_output(self) -> str:
+        output = bytes(self._output[-self.max_output :])
+        return output.decode("utf-8", errors="replace").strip()
+
+    def _capture(self, data: bytes) -> None:
+        self._output += data
+        # Trimmed only once it has grown well past the limit, so that the
+        # buffer is not shifted on every read
+        if len(self._output) > 2 * self.max_output:
+            del self._output[: -self.max_output]
+
+    def _check_triggers(self, text: str) -> None:
+        # Of the triggers found, the one on the earliest line wins (with
+        # callback triggers taking precedence over errback triggers)
+        found: list[tuple[int, int, Optional[type[Exception]]]] = []
+        for trigger in self.callback_triggers or []:
+            position = text.find(trigger) if trigger else -1
+            if position >= 0:
+                found.append((text.rfind("\n", 0, position), 0, None))
+        for pair in self.errback_triggers or []:
+            if not pair:
+                continue
+            trigger, exception = pair
+            position = text.find(trigger) if trigger and exception else -1
+            if position >= 0:
+                found.append((text.rfind("\n", 0, position), 1, exception))
+        if not found:
+            return
+        _, _, error = min(found, key=lambda f: f[:2])
+        if error is None:
+            self.done.callback(self._get_output())
+        else:
+            self.done.errback(error(self._get_output()))
+
+    def _lines_received(self, childFD: int, lines: bytes) -> None:
+        if childFD == 1:
+            collector = self.stdout_line_collector
+        elif childFD == 2:
+            collector = self.stderr_line_collector
+        else:
+            collector = None
+        check_triggers = not self.done.called and (
+            self.callback_triggers or self.errback_triggers
+        )
+        if not collector and not check_triggers:
+            return
+        text = lines.decode("utf-8", errors="replace")
+        if collector:
+            for line in text.split("\n"):
+                line = line.rstrip("\r")
+                if line:
+                    collector(line)
+        if check_triggers and not self.done.called:
+            self._check_triggers(text)
 
     def childDataReceived(self, childFD: int, data: bytes) -> None:
         if not self.done.called:
-            self._output.write(data)
-        for line in data.decode("utf-8").strip().split("\n"):
-            if self.stdout_line_collector and childFD == 1:
-                self.stdout_line_collector(line)
-            elif self.stderr_line_collector and childFD == 2:
-                self.stderr_line_collector(line)
-            if not self.done.called:
-                self._check_triggers(line)
+            self._capture(data)
+        data = self._partial_lines.pop(childFD, b"") + data
+        lines, newline, partial = data.rpartition(b"\n")
+        if len(partial) > self.max_output:
+            # Too long to keep waiting for the rest of the line
+            lines, newline, partial = data, b"\n", b""
+        if partial:
+            self._partial_lines[childFD] = partial
+        if newline:
+            self._lines_received(childFD, lines)
 
     def processEnded(self, reason: Failure) -> None:
+        for childFD in sorted(self._partial_lines):
+            self._lines_received(childFD, self._partial_lines.pop(childFD))
         if not self.done.called:
-            output = self._output.getvalue().decode("utf-8").strip()
             if isinstance(reason.value, ProcessDone):
-                self.done.callback(output)
+                self.done.callback(self._get_output())
             else:
-                self.done.errback(SubprocessError(output))
+                self.done.errback(SubprocessError(self._get_output()))
         if self._on_process_ended:
             self._on_process_ended(reason)
+
+
+def _fingerprint(path: str) -> Optional[list[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_version_cache(cache_path: Path) -> dict:
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_version_cache(cache_path: Path, path: str, entry: dict) -> None:
+    # Re-read just before writing, so that concurrent probes (of different
+    # executables) don't discard one another's results
+    cache = {
+        p: e
+        for p, e in _read_version_cache(cache_path).items()
+        if Path(p).exists()
+    }
+    cache[path] = entry
+    try:
+        with atomic_write(str(cache_path), mode="w", overwrite=True) as f:
+            f.write(json.dumps(cache))
+    except OSError as e:
+        logging.warning("Error writing version cache: %s", str(e))
+
+
+async def get_version(
+    executable: str, cache_path: Optional[Path] = None
+) -> str:
+    """
+    Return the output of running ``executable --version``.
+
+    If ``cache_path`` is given, the output is cached there, keyed by the
+    executable's path, and reused for as long as the executable's size and
+    modification time remain the same -- so that (slow-to-start, Python-
+    based) executables like tahoe and magic-folder need not be started on
+    every launch just to report their versions.
+    """
+    path = os.path.abspath(executable)
+    fingerprint = _fingerprint(path)
+    if cache_path is not None and fingerprint is not None:
+        entry = _read_version_cache(cache_path).get(path)
+        if isinstance(entry, dict) and entry.get("fingerprint") == fingerprint:
+            return str(entry.get("version", ""))
+    protocol = SubprocessProtocol()
+    env = dict(os.environ)
+    env["PYTHONUNBUFFERED"] = "1"
+    reactor.spawnProcess(  # type: ignore
+        protocol, executable, args=[executable, "--version"], env=env
+    )
+    version = await protocol.done
+    if cache_path is not None and fingerprint is not None and version:
+        _write_version_cache(
+            cache_path, path, {"fingerprint": fingerprint, "version": version}
+        )
+    return version
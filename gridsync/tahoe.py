@@ -1,16 +1,19 @@
 # -*- coding: utf-8 -*-
+from __future__ import annotations
 
 import json
 import logging as log
 import os
 import re
+from collections import defaultdict
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Union, cast
+from time import monotonic
+from typing import Iterator, Optional, Union, cast
 
-import treq
 import yaml
 from atomicwrites import atomic_write
-from twisted.internet.defer import Deferred
+from twisted.internet.defer import Deferred, succeed
 from twisted.internet.error import ConnectError
 from twisted.internet.interfaces import IReactorTime
 
@@ -19,6 +22,13 @@ from gridsync import settings as global_settings
 from gridsync.config import Config
 from gridsync.crypto import trunchash
 from gridsync.errors import TahoeCommandError, TahoeWebError
+from gridsync.filter import LogRedactor
+from gridsync.http_client import HTTPClient
+from gridsync.log_buffer import (
+    LogBuffer,
+    LogSegmentStore,
+    shared_log_budget,
+)
 from gridsync.magic_folder import MagicFolder
 from gridsync.monitor import Monitor
 from gridsync.msg import critical
@@ -27,10 +37,28 @@ from gridsync.rootcap import RootcapManager
 from gridsync.streamedlogs import StreamedLogs
 from gridsync.supervisor import Supervisor
 from gridsync.system import SubprocessProtocol, which
-from gridsync.util import Poller
+from gridsync.util import Flag, PhaseTimer, Poller, to_bool
 from gridsync.zkapauthorizer import PLUGIN_NAME as ZKAPAUTHZ_PLUGIN_NAME
 from gridsync.zkapauthorizer import ZKAPAuthorizer
 
+# The libyaml-based (and much faster) implementations, where available
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def read_servers_yaml(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            yaml_data = yaml.load(f, Loader=_SafeLoader)
+    except OSError:
+        return {}
+    return yaml_data if isinstance(yaml_data, dict) else {}
+
+
+def write_servers_yaml(path: str, yaml_data: dict) -> None:
+    with atomic_write(path, mode="w", overwrite=True) as f:
+        yaml.dump(yaml_data, f, Dumper=_SafeDumper, default_flow_style=False)
+
 
 def is_valid_furl(furl: str) -> bool:
     if re.match(r"^pb://[a-z2-7]+@[a-zA-Z0-9\.:,-]+:\d+/[a-z2-7]+$", furl):
@@ -52,6 +80,128 @@ def get_nodedirs(basedir: str) -> list:
     return sorted(nodedirs)
 
 
+def redact_logs_at_ingest(debug_settings: Optional[dict]) -> bool:
+    if not debug_settings:
+        return False
+    return to_bool(str(debug_settings.get("redact_logs_at_ingest", "")))
+
+
+def get_log_histories(
+    nodedir: str, debug_settings: Optional[dict]
+) -> dict[str, LogSegmentStore]:
+    """
+    Return the on-disk histories for the Tahoe-LAFS and Magic-Folder logs
+    of the given nodedir (if enabled by the "log_history_max_bytes" debug
+    setting).
+    """
+    if not debug_settings:
+        return {}
+    max_bytes = int(debug_settings.get("log_history_max_bytes", 0))
+    if max_bytes <= 0:
+        return {}
+    max_age = debug_settings.get("log_history_max_age")
+    names = ["tahoe", "magic-folder"]
+    if redact_logs_at_ingest(debug_settings):
+        names += ["tahoe-filtered", "magic-folder-filtered"]
+    return {
+        # Kept in "private" since unfiltered logs may contain secrets
+        name: LogSegmentStore(
+            Path(nodedir, "private", "logs", name),
+            max_bytes=max_bytes,
+            max_age=float(max_age) if max_age is not None else None,
+        )
+        for name in names
+    }
+
+
+def get_log_redactors(
+    debug_settings: Optional[dict],
+    maxlen: Optional[int],
+    histories: dict[str, LogSegmentStore],
+) -> dict[str, LogRedactor]:
+    """
+    Return the ``LogRedactor``s with which to filter the Tahoe-LAFS and
+    Magic-Folder logs as they are received (if enabled by the
+    "redact_logs_at_ingest" debug setting).
+    """
+    if not redact_logs_at_ingest(debug_settings):
+        return {}
+    return {
+        name: LogRedactor(
+            LogBuffer(
+                maxlen=maxlen,
+                budget=shared_log_budget(),
+                history=histories.get(f"{name}-filtered"),
+            )
+        )
+        for name in ("tahoe", "magic-folder")
+    }
+
+
+class NodeConfigTransaction:
+    """
+    Changes to a node's "servers.yaml" and "tahoe.cfg" files, staged in
+    memory so that any number of storage servers (and plugin options) can be
+    added with a single read and a single atomic write of each file.
+
+    See ``Tahoe.config_transaction``.
+    """
+
+    def __init__(self, tahoe: Tahoe) -> None:
+        self.tahoe = tahoe
+        self._servers: dict[str, dict] = {}
+        self._config: defaultdict[str, dict[str, str]] = defaultdict(dict)
+
+    def config_set(self, section: str, option: str, value: str) -> None:
+        self._config[section][option] = value
+
+    def configure_storage_plugins(self, storage_options: list[dict]) -> None:
+        for options in storage_options:
+            if not isinstance(options, dict):
+                log.warning(
+                    "Skipping unknown storage plugin option: %s", options
+                )
+                continue
+            config = storage_options_to_config(options)
+            if config is None:
+                log.warning(
+                    "Skipping unknown storage plugin option: %s", options
+                )
+                continue
+            for section, section_options in config.items():
+                for option, value in section_options.items():
+                    self.config_set(section, option, value)
+
+    def add_storage_server(
+        self,
+        server_id: str,
+        furl: str,
+        nickname: Optional[str] = None,
+        storage_options: Optional[list[dict]] = None,
+    ) -> None:
+        log.debug("Adding storage server: %s...", server_id)
+        ann = {"anonymous-storage-FURL": furl}
+        if nickname:
+            ann["nickname"] = nickname
+        if storage_options:
+            ann["storage-options"] = storage_options  # type: ignore
+            self.configure_storage_plugins(storage_options)
+        self._servers[server_id] = {"ann": ann}
+
+    def commit(self) -> None:
+        if self._config:
+            self.tahoe.config.save(dict(self._config))
+            self._config.clear()
+        if self._servers:
+            yaml_data = read_servers_yaml(self.tahoe.servers_yaml_path)
+            if not isinstance(yaml_data.get("storage"), dict):
+                yaml_data["storage"] = {}
+            yaml_data["storage"].update(self._servers)
+            write_servers_yaml(self.tahoe.servers_yaml_path, yaml_data)
+            log.debug("Added storage servers: %s", ", ".join(self._servers))
+            self._servers.clear()
+
+
 class Tahoe:
 
     """
@@ -94,15 +244,33 @@ class Tahoe:
         self.shares_happy = 0
         self.name = os.path.basename(self.nodedir)
         self.use_tor = False
+        self.http_client = HTTPClient(reactor)
+        # Seconds to wait for the node to answer a status request
+        self.status_timeout: float = 10
         self.monitor = Monitor(self)
+        # The durations of the phases of starting the gateway (spawning
+        # tahoe, seeing its "client running" trigger, reading "node.url",
+        # Magic-Folder becoming ready, and receiving its first status)
+        self.startup_timer = PhaseTimer(self.name)
         logs_maxlen = None
         debug_settings = global_settings.get("debug")
         if debug_settings:
             log_maxlen = debug_settings.get("log_maxlen")
             if log_maxlen is not None:
                 logs_maxlen = int(log_maxlen)
-        self.streamedlogs = StreamedLogs(reactor, logs_maxlen)
+        self.log_histories = get_log_histories(self.nodedir, debug_settings)
+        self.log_redactors = get_log_redactors(
+            debug_settings, logs_maxlen, self.log_histories
+        )
+        self.streamedlogs = StreamedLogs(
+            reactor,
+            logs_maxlen,
+            history=self.log_histories.get("tahoe"),
+            redactor=self.log_redactors.get("tahoe"),
+        )
         self.state = Tahoe.STOPPED
+        # Set once the node has started (and its API can be used)
+        self.node_started = Flag()
         self.newscap = ""
         self.newscap_checker = NewscapChecker(self)
         self.settings: dict = {}
@@ -113,7 +281,23 @@ class Tahoe:
 
         self.storage_furl: str = ""
         self.rootcap_manager = RootcapManager(self)
-        self.magic_folder = MagicFolder(self, logs_maxlen=logs_maxlen)
+        self.magic_folder = MagicFolder(
+            self,
+            logs_maxlen=logs_maxlen,
+            log_history=self.log_histories.get("magic-folder"),
+            log_redactor=self.log_redactors.get("magic-folder"),
+        )
+        # Uploading (or downloading) changes a folder's Tahoe-LAFS objects
+        for signal in (
+            self.magic_folder.monitor.uploads_finished,
+            self.magic_folder.monitor.downloads_finished,
+        ):
+            signal.connect(
+                lambda folder, _: self.zkapauthorizer.invalidate_folder(folder)
+            )
+        self.magic_folder.monitor.overall_status_changed.connect(
+            self.monitor.on_sync_status_changed
+        )
 
         self.supervisor = Supervisor(pidfile=Path(self.pidfile))
 
@@ -128,6 +312,13 @@ class Tahoe:
             return ready
 
         self._ready_poller = Poller(reactor, poll, 0.2)
+        # Seconds for which the node is considered to still be "ready" after
+        # last having been seen to be so (by any call to get_grid_status).
+        # By default, this is longer than the monitor's maximum interval
+        # between grid checks, so that the monitor keeps it fresh for as
+        # long as the node stays connected (and a failed check clears it).
+        self.ready_ttl: Optional[float] = None
+        self._last_ready: Optional[float] = None
 
     def load_newscap(self) -> None:
         news_settings = global_settings.get("news:{}".format(self.name))
@@ -248,15 +439,19 @@ class Tahoe:
             f.write(json.dumps(settings))
         log.debug("Exported settings to '%s'", dest)
 
-    def _read_servers_yaml(self) -> dict:
-        try:
-            with open(self.servers_yaml_path, encoding="utf-8") as f:
-                return yaml.safe_load(f)
-        except OSError:
-            return {}
+    @contextmanager
+    def config_transaction(self) -> Iterator[NodeConfigTransaction]:
+        """
+        Stage changes to the node's storage servers and configuration,
+        writing them out -- once per file -- when the block exits (unless
+        it raises).
+        """
+        transaction = NodeConfigTransaction(self)
+        yield transaction
+        transaction.commit()
 
     def get_storage_servers(self) -> dict:
-        yaml_data = self._read_servers_yaml()
+        yaml_data = read_servers_yaml(self.servers_yaml_path)
         if not yaml_data:
             return {}
         storage = yaml_data.get("storage")
@@ -279,19 +474,8 @@ class Tahoe:
         return results
 
     def _configure_storage_plugins(self, storage_options: list[dict]) -> None:
-        for options in storage_options:
-            if not isinstance(options, dict):
-                log.warning(
-                    "Skipping unknown storage plugin option: %s", options
-                )
-                continue
-            config = storage_options_to_config(options)
-            if config is None:
-                log.warning(
-                    "Skipping unknown storage plugin option: %s", options
-                )
-            else:
-                self.config.save(config)
+        with self.config_transaction() as transaction:
+            transaction.configure_storage_plugins(storage_options)
 
     def add_storage_server(
         self,
@@ -300,37 +484,23 @@ class Tahoe:
         nickname: Optional[str] = None,
         storage_options: Optional[list[dict]] = None,
     ) -> None:
-        log.debug("Adding storage server: %s...", server_id)
-        yaml_data = self._read_servers_yaml()
-        if not yaml_data or not yaml_data.get("storage"):
-            yaml_data["storage"] = {}
-        yaml_data["storage"][server_id] = {
-            "ann": {"anonymous-storage-FURL": furl}
-        }
-        if nickname:
-            yaml_data["storage"][server_id]["ann"]["nickname"] = nickname
-        if storage_options:
-            yaml_data["storage"][server_id]["ann"][
-                "storage-options"
-            ] = storage_options
-            self._configure_storage_plugins(storage_options)
-        with atomic_write(
-            self.servers_yaml_path, mode="w", overwrite=True
-        ) as f:
-            f.write(yaml.safe_dump(yaml_data, default_flow_style=False))
-        log.debug("Added storage server: %s", server_id)
+        with self.config_transaction() as transaction:
+            transaction.add_storage_server(
+                server_id, furl, nickname, storage_options
+            )
 
     def add_storage_servers(self, storage_servers: dict) -> None:
-        for server_id, data in storage_servers.items():
-            nickname = data.get("nickname")
-            storage_options = data.get("storage-options")
-            furl = data.get("anonymous-storage-FURL")
-            if furl:
-                self.add_storage_server(
-                    server_id, furl, nickname, storage_options
-                )
-            else:
-                log.warning("No storage fURL provided for %s!", server_id)
+        with self.config_transaction() as transaction:
+            for server_id, data in storage_servers.items():
+                nickname = data.get("nickname")
+                storage_options = data.get("storage-options")
+                furl = data.get("anonymous-storage-FURL")
+                if furl:
+                    transaction.add_storage_server(
+                        server_id, furl, nickname, storage_options
+                    )
+                else:
+                    log.warning("No storage fURL provided for %s!", server_id)
 
     def line_received(self, line: str) -> None:
         # TODO: Connect to Core via Qt signals/slots?
@@ -344,7 +514,7 @@ class Tahoe:
         env["PYTHONUNBUFFERED"] = "1"
         log.debug("Executing: %s...", " ".join(args))
         protocol = SubprocessProtocol(stdout_line_collector=self.line_received)
-        self._reactor.spawnProcess(  # type: ignore
+        self._reactor.spawnProcess(
             protocol, self.executable, args=args, env=env
         )
         try:
@@ -393,38 +563,96 @@ class Tahoe:
     async def stop(self) -> None:
         log.debug('Stopping "%s" tahoe client...', self.name)
         self.state = Tahoe.STOPPING
+        self.monitor.stop()
+        self.node_started.clear()
+        self._last_ready = None
         self.streamedlogs.stop()
-        if self.rootcap_manager.lock.locked:
+        if self.rootcap_manager.busy:
             log.warning(
                 "Delaying stop operation; "
                 "another operation is trying to modify the rootcap..."
             )
-            await self.rootcap_manager.lock.acquire()
-            self.rootcap_manager.lock.release()
+            await self.rootcap_manager.wait_until_idle()
             log.debug("Lock released; resuming stop operation...")
         if not self.is_storage_node():
             await self.magic_folder.stop()
         await self.supervisor.stop()
+        for redactor in self.log_redactors.values():
+            redactor.stop()
+        for history in self.log_histories.values():
+            history.stop()
+        await self.http_client.close()
         self.state = Tahoe.STOPPED
         log.debug('Finished stopping "%s" tahoe client', self.name)
 
-    def get_streamed_log_messages(self) -> list[str]:
+    def get_streamed_log_messages(
+        self, offset: int = 0, limit: Optional[int] = None
+    ) -> list[str]:
         """
         Return a ``list`` containing all buffered log messages.
 
+        :param offset: The number of (oldest) messages to skip.
+        :param limit: The maximum number of messages to return, so that a
+            long on-disk history can be read a page at a time.
+
         :return: A ``list`` where each element is a UTF-8 & JSON encoded
             ``bytes`` object giving a single log event with older events
             appearing first.
         """
-        return self.streamedlogs.get_streamed_log_messages()
+        return self.streamedlogs.get_streamed_log_messages(offset, limit)
+
+    def iter_streamed_log_messages(self) -> Iterator[str]:
+        """
+        Return an iterator over all buffered log messages (as with
+        ``get_streamed_log_messages``), for reading a large buffer without
+        first copying it into a ``list``.
+        """
+        return self.streamedlogs.iter_streamed_log_messages()
+
+    def tail_streamed_log_messages(self, limit: int) -> tuple[list[str], int]:
+        """
+        Return the ``limit`` most recent buffered log messages, along with
+        the number of earlier messages left out, without reading (or
+        decompressing) the rest of the buffer.
+        """
+        return self.streamedlogs.tail_streamed_log_messages(limit)
+
+    def iter_filtered_streamed_log_messages(
+        self, identifier: str
+    ) -> Optional[Iterator[str]]:
+        """
+        Return an iterator over the buffered log messages as filtered when
+        they were received (or ``None`` if they were not), masking the
+        gateway's name with the given identifier.
+        """
+        redactor = self.streamedlogs.redactor
+        if redactor is None:
+            return None
+        return redactor.iter_messages(identifier)
+
+    def tail_filtered_streamed_log_messages(
+        self, identifier: str, limit: int
+    ) -> Optional[tuple[list[str], int]]:
+        """
+        Return the ``limit`` most recent log messages as filtered when they
+        were received (or ``None`` if they were not), along with the number
+        of earlier messages left out.
+        """
+        redactor = self.streamedlogs.redactor
+        if redactor is None:
+            return None
+        return redactor.tail_messages(identifier, limit)
 
     def _on_started(self) -> None:
+        self.startup_timer.mark("spawn", self.supervisor.time_started)
+        self.startup_timer.mark("trigger")
         self.load_settings()
 
         with open(
             os.path.join(self.nodedir, "node.url"), encoding="utf-8"
         ) as f:
             self.set_nodeurl(f.read().strip())
+        self.startup_timer.mark("node.url")
         token_file = os.path.join(self.nodedir, "private", "api_auth_token")
         with open(token_file, encoding="utf-8") as f:
             self.api_token = f.read().strip()
@@ -443,6 +671,7 @@ class Tahoe:
         self.streamedlogs.start(self.nodeurl, self.api_token)
 
         self.state = Tahoe.STARTED
+        self.node_started.set()
 
         # XXX Should something wait on this?
         Deferred.fromCoroutine(self.scan_storage_plugins())
@@ -471,6 +700,7 @@ class Tahoe:
 
     async def start(self) -> None:
         log.debug('Starting "%s" tahoe client...', self.name)
+        self.startup_timer.start()
         self.state = Tahoe.STARTING
         self.monitor.start()
         tcp = self.config_get("connections", "tcp")
@@ -527,12 +757,14 @@ class Tahoe:
         if not self.nodeurl:
             return None
         try:
-            resp = await treq.get(self.nodeurl + "?t=json")
+            resp = await self.http_client.get(
+                self.nodeurl + "?t=json", timeout=self.status_timeout
+            )
         except ConnectError:
+            self._last_ready = None
             return None
         if resp.code == 200:
-            content = await treq.content(resp)
-            content = json.loads(content.decode("utf-8"))
+            content = json.loads(resp.content.decode("utf-8"))
             servers_connected = 0
             servers_known = 0
             available_space = 0
@@ -544,20 +776,27 @@ class Tahoe:
                         servers_connected += 1
                         if server["available_space"]:
                             available_space += server["available_space"]
+            if self.shares_happy and servers_connected >= self.shares_happy:
+                self._last_ready = monotonic()
+            else:
+                self._last_ready = None
             return servers_connected, servers_known, available_space
+        self._last_ready = None
         return None
 
     async def get_connected_servers(self) -> Optional[int]:
         if not self.nodeurl:
             return None
         try:
-            resp = await treq.get(self.nodeurl)
+            resp = await self.http_client.get(
+                self.nodeurl, timeout=self.status_timeout
+            )
         except ConnectError:
             return None
         if resp.code == 200:
-            html = await treq.content(resp)
             match = re.search(
-                "Connected to <span>(.+?)</span>", html.decode("utf-8")
+                "Connected to <span>(.+?)</span>",
+                resp.content.decode("utf-8"),
             )
             if match:
                 return int(match.group(1))
@@ -566,12 +805,31 @@ class Tahoe:
     async def is_ready(self) -> bool:
         if not self.shares_happy:
             return False
-        connected_servers = await self.get_connected_servers()
-        return bool(
-            connected_servers and connected_servers >= self.shares_happy
-        )
+        status = await self.get_grid_status()
+        return bool(status and status[0] >= self.shares_happy)
 
     def await_ready(self) -> Deferred[bool]:
+        """
+        Wait until enough storage servers are connected to upload (i.e.,
+        at least "shares.happy"). This returns immediately if the node was
+        last seen to be ready less than ``ready_ttl`` seconds ago (or, by
+        default, two of the monitor's maximum polling intervals).
+
+        Polling for connected servers only begins once the node has started;
+        until then, this simply waits to be woken by ``_on_started``.
+        """
+        ready_ttl = self.ready_ttl
+        if ready_ttl is None:
+            ready_ttl = 2 * self.monitor.max_interval
+        if (
+            self._last_ready is not None
+            and monotonic() - self._last_ready < ready_ttl
+        ):
+            return succeed(True)
+        if not self.node_started:
+            return self.node_started.wait().addCallback(
+                lambda _: self._ready_poller.wait_for_completion()
+            )
         return self._ready_poller.wait_for_completion()
 
     async def mkdir(self, parentcap: str = None, childname: str = None) -> str:
@@ -581,10 +839,11 @@ class Tahoe:
         if parentcap and childname:
             url += "/" + parentcap
             params["name"] = childname
-        resp = await treq.post(url, params=params)
-        content = await treq.content(resp)
-        content = content.decode("utf-8").strip()
+        resp = await self.http_client.post(url, params=params)
+        content = resp.content.decode("utf-8").strip()
         if resp.code == 200:
+            if parentcap and childname:
+                self.zkapauthorizer.invalidate_dircap(parentcap)
             return content
         raise TahoeWebError(
             f"Error {resp.code} creating Tahoe-LAFS directory: {content}"
@@ -614,25 +873,23 @@ class Tahoe:
         log.debug("Uploading %s...", local_path)
         await self.await_ready()
         with open(local_path, "rb") as f:
-            resp = await treq.put(url, f)
+            resp = await self.http_client.put(url, data=f)
         if resp.code in (200, 201):
-            content = await treq.content(resp)
             log.debug("Successfully uploaded %s", local_path)
-            return content.decode("utf-8")
-        content = await treq.content(resp)
-        raise TahoeWebError(content.decode("utf-8"))
+            return resp.content.decode("utf-8")
+        raise TahoeWebError(resp.content.decode("utf-8"))
 
     async def download(self, cap: str, local_path: str) -> None:
         log.debug("Downloading %s...", local_path)
         await self.await_ready()
-        resp = await treq.get("{}uri/{}".format(self.nodeurl, cap))
-        if resp.code == 200:
-            with atomic_write(local_path, mode="wb", overwrite=True) as f:
-                await treq.collect(resp, f.write)
-            log.debug("Successfully downloaded %s", local_path)
-        else:
-            content = await treq.content(resp)
-            raise TahoeWebError(content.decode("utf-8"))
+        with atomic_write(local_path, mode="wb", overwrite=True) as f:
+            resp = await self.http_client.get(
+                "{}uri/{}".format(self.nodeurl, cap), collector=f.write
+            )
+            if resp.code != 200:
+                # Raising here also discards the (partially-written) file
+                raise TahoeWebError(resp.content.decode("utf-8"))
+        log.debug("Successfully downloaded %s", local_path)
 
     async def link(self, dircap: str, childname: str, childcap: str) -> None:
         dircap_hash = trunchash(dircap)
@@ -644,14 +901,14 @@ class Tahoe:
             dircap_hash,
         )
         await self.await_ready()
-        resp = await treq.post(
+        resp = await self.http_client.post(
             "{}uri/{}/?t=uri&name={}&uri={}".format(
                 self.nodeurl, dircap, childname, childcap
             )
         )
         if resp.code != 200:
-            content = await treq.content(resp)
-            raise TahoeWebError(content.decode("utf-8"))
+            raise TahoeWebError(resp.content.decode("utf-8"))
+        self.zkapauthorizer.invalidate_dircap(dircap)
         log.debug(
             'Done linking "%s" (%s) into %s',
             childname,
@@ -659,13 +916,47 @@ class Tahoe:
             dircap_hash,
         )
 
+    async def set_children(
+        self, dircap: str, children: dict[str, str]
+    ) -> None:
+        """
+        Link many children into a directory at once, using a single
+        ``t=set_children`` request (rather than one ``t=uri`` request, and
+        one write of the mutable directory, per child). Any existing
+        children with the same names are replaced.
+
+        :param dircap: The capability of the directory to link into.
+        :param children: A mapping of child names to capabilities.
+        """
+        if not children:
+            return
+        dircap_hash = trunchash(dircap)
+        log.debug("Linking %i children into %s...", len(children), dircap_hash)
+        # As with ``t=uri``, Tahoe-LAFS infers the node type (and whether
+        # it is read-only) from the capability given in the "rw_uri" slot
+        body = {
+            name: ["unknown", {"rw_uri": cap}]
+            for name, cap in children.items()
+        }
+        await self.await_ready()
+        resp = await self.http_client.post(
+            f"{self.nodeurl}uri/{dircap}/?t=set_children",
+            data=json.dumps(body).encode("utf-8"),
+        )
+        if resp.code != 200:
+            raise TahoeWebError(resp.content.decode("utf-8"))
+        self.zkapauthorizer.invalidate_dircap(dircap)
+        log.debug(
+            "Done linking %i children into %s", len(children), dircap_hash
+        )
+
     async def unlink(
         self, dircap: str, childname: str, missing_ok: bool = False
     ) -> None:
         dircap_hash = trunchash(dircap)
         log.debug('Unlinking "%s" from %s...', childname, dircap_hash)
         await self.await_ready()
-        resp = await treq.post(
+        resp = await self.http_client.post(
             "{}uri/{}/?t=unlink&name={}".format(
                 self.nodeurl, dircap, childname
             )
@@ -673,8 +964,8 @@ class Tahoe:
         if resp.code == 404 and missing_ok:
             pass
         elif resp.code != 200:
-            content = await treq.content(resp)
-            raise TahoeWebError(content.decode("utf-8"))
+            raise TahoeWebError(resp.content.decode("utf-8"))
+        self.zkapauthorizer.invalidate_dircap(dircap)
         log.debug('Done unlinking "%s" from %s', childname, dircap_hash)
 
     async def get_json(self, cap: str) -> Optional[Union[dict, list]]:
@@ -682,12 +973,11 @@ class Tahoe:
             return None
         uri = "{}uri/{}/?t=json".format(self.nodeurl, cap)
         try:
-            resp = await treq.get(uri)
+            resp = await self.http_client.get(uri)
         except ConnectError:
             return None
         if resp.code == 200:
-            content = await treq.content(resp)
-            return json.loads(content.decode("utf-8"))
+            return json.loads(resp.content.decode("utf-8"))
         return None
 
     async def ls(
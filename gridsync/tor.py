@@ -2,9 +2,8 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import txtorcon
 from qtpy.QtWidgets import QMessageBox, QWidget
 from twisted.internet.defer import inlineCallbacks
 from twisted.internet.interfaces import IReactorCore
@@ -12,6 +11,9 @@ from twisted.internet.interfaces import IReactorCore
 from gridsync import features
 from gridsync.types import TwistedDeferred
 
+if TYPE_CHECKING:
+    import txtorcon
+
 # From https://styleguide.torproject.org/visuals/
 # "The main Tor Project color is Purple. Use Dark Purple as a secondary option"
 TOR_PURPLE = "#7D4698"
@@ -41,6 +43,8 @@ def get_tor(reactor: IReactorCore) -> TwistedDeferred[txtorcon.Tor]:
     if not features.tor:
         return tor
     logging.debug("Looking for a running Tor daemon...")
+    import txtorcon
+
     try:
         tor = yield txtorcon.connect(reactor)
     except RuntimeError as exc:
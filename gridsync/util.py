@@ -1,18 +1,41 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import codecs
+import json
+import logging
 from binascii import hexlify, unhexlify
+from collections import deque
 from html.parser import HTMLParser
 from time import time
-from typing import TYPE_CHECKING, Callable, Coroutine, Optional, TypeVar, Union
+from typing import (
+    TYPE_CHECKING,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 import attr
-from twisted.internet.defer import Deferred, ensureDeferred, inlineCallbacks
-from twisted.internet.interfaces import IReactorTime
+from twisted.internet.defer import (
+    CancelledError,
+    Deferred,
+    DeferredSemaphore,
+    FirstError,
+    ensureDeferred,
+    gatherResults,
+    inlineCallbacks,
+    succeed,
+)
+from twisted.internet.interfaces import IDelayedCall, IReactorTime
 from twisted.internet.task import deferLater
 from twisted.python.failure import Failure
 
 _T = TypeVar("_T")
+_R = TypeVar("_R")
 
 B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
 
@@ -121,6 +144,49 @@ def until(
     )
 
 
+async def map_bounded(
+    function: Callable[[_T], Union[Awaitable[_R], Deferred[_R]]],
+    items: Iterable[_T],
+    limit: int = 8,
+) -> list[_R]:
+    """
+    Call the asynchronous ``function`` with each of ``items``, allowing at
+    most ``limit`` of these calls to be in progress at the same time.
+
+    :return: The results, in the same order as ``items``. If any call fails,
+        its failure is raised as soon as it occurs, and every call that is
+        still queued or in progress is cancelled (since its result would be
+        discarded anyway).
+    """
+    semaphore = DeferredSemaphore(limit)
+    errors: list[BaseException] = []
+
+    async def call(item: _T) -> _R:
+        if errors:  # Don't start any more calls once one has failed
+            raise CancelledError()
+        try:
+            return await function(item)
+        except BaseException as e:
+            errors.append(e)
+            raise
+
+    calls = [
+        semaphore.run(lambda item: Deferred.fromCoroutine(call(item)), i)
+        for i in items
+    ]
+    try:
+        return await gatherResults(calls, consumeErrors=True)
+    except FirstError as e:
+        for d in calls:
+            d.cancel()
+        if errors:
+            # This, rather than e.subFailure, is the original failure; a
+            # call that was queued behind it may have been refused first.
+            raise errors[0] from None
+        e.subFailure.raiseException()
+        raise  # Unreachable; for mypy
+
+
 @attr.s
 class Poller:
     """
@@ -210,3 +276,299 @@ class Poller:
         Schedule the next polling iteration.
         """
         deferLater(self.clock, self.interval, self._iterate_poll)
+
+
+@attr.s
+class Batcher:
+    """
+    Collect items and deliver them to a callback in batches, so that a burst
+    of many small events can be handled at once.
+
+    :ivar clock: The reactor to use to schedule deliveries.
+    :ivar callback: The function to call with each non-empty list of items.
+    :ivar interval: The maximum time, in seconds, that an item may wait
+        before being delivered. At most one batch is delivered per interval
+        unless ``max_size`` is reached first.
+    :ivar max_size: The number of items at which a batch is delivered
+        immediately, without waiting for ``interval`` to elapse.
+
+    :ivar _items: The items collected since the last delivery.
+    :ivar _delayed_call: The scheduled delivery of ``_items``, if any.
+    """
+
+    clock: IReactorTime = attr.ib()
+    callback: Callable[[list], object] = attr.ib()
+    interval: float = attr.ib(default=0.25)
+    max_size: int = attr.ib(default=1000)
+    _items: list = attr.ib(default=attr.Factory(list))
+    _delayed_call: Optional[IDelayedCall] = attr.ib(default=None)
+
+    def add(self, item: object) -> None:
+        """
+        Add an item to the current batch, scheduling its delivery if needed.
+        """
+        self._items.append(item)
+        if len(self._items) >= self.max_size:
+            self.flush()
+        elif self._delayed_call is None:
+            self._delayed_call = self.clock.callLater(
+                self.interval, self.flush  # type: ignore
+            )
+
+    def flush(self) -> None:
+        """
+        Deliver the current batch (if any) immediately.
+        """
+        delayed_call = self._delayed_call
+        if delayed_call is not None and delayed_call.active():  # type: ignore
+            delayed_call.cancel()  # type: ignore
+        self._delayed_call = None
+        items = self._items
+        self._items = []
+        if items:
+            self.callback(items)
+
+
+@attr.s
+class PhaseTimer:
+    """
+    Record how long after some starting point each of a series of phases
+    (e.g., of starting a gateway) was first reached.
+
+    :ivar name: The name of what is being timed, for log messages.
+    :ivar started: The time (per ``time.time``) at which timing started, or
+        ``None`` if it has not.
+    :ivar phases: The number of seconds after ``started`` at which each
+        phase was reached, in the order in which they were reached.
+    """
+
+    name: str = attr.ib()
+    started: Optional[float] = attr.ib(default=None)
+    phases: dict[str, float] = attr.ib(default=attr.Factory(dict))
+
+    def start(self, when: Optional[float] = None) -> None:
+        self.started = time() if when is None else when
+        self.phases = {}
+
+    def mark(self, phase: str, when: Optional[float] = None) -> None:
+        """
+        Record that the given phase was reached -- now, or at ``when`` --
+        unless it already was (so that restarting, e.g., a supervised
+        process doesn't overwrite the timings of its initial start).
+        """
+        if self.started is None or phase in self.phases:
+            return
+        elapsed = (time() if when is None else when) - self.started
+        self.phases[phase] = elapsed
+        logging.debug("%s: %s after %.3f seconds", self.name, phase, elapsed)
+
+    def report(self) -> str:
+        return ", ".join(
+            f"{phase} {seconds:.3f}s" for phase, seconds in self.phases.items()
+        )
+
+
+class ReadWriteLock:
+    """
+    A lock which may be held by any number of readers at once, or by a
+    single writer.
+
+    Writers are preferred: once a writer is waiting, any readers that
+    arrive after it are queued behind it (so that they observe the result
+    of its write) rather than being admitted alongside current readers.
+
+    :ivar readers: The number of readers currently holding the lock.
+    :ivar writing: Whether a writer currently holds the lock.
+    """
+
+    def __init__(self) -> None:
+        self.readers: int = 0
+        self.writing: bool = False
+        self._waiting: deque[tuple[bool, Deferred[None]]] = deque()
+
+    @property
+    def locked(self) -> bool:
+        return self.writing or self.readers > 0
+
+    def acquire_read(self) -> Deferred[None]:
+        if not self.writing and not self._waiting:
+            self.readers += 1
+            return succeed(None)
+        d: Deferred[None] = Deferred()
+        self._waiting.append((False, d))
+        return d
+
+    def acquire_write(self) -> Deferred[None]:
+        if not self.locked and not self._waiting:
+            self.writing = True
+            return succeed(None)
+        d: Deferred[None] = Deferred()
+        self._waiting.append((True, d))
+        return d
+
+    def release_read(self) -> None:
+        self.readers -= 1
+        self._wake()
+
+    def release_write(self) -> None:
+        self.writing = False
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiting and not self.writing:
+            is_writer, d = self._waiting[0]
+            if is_writer:
+                if self.readers:
+                    return
+                self._waiting.popleft()
+                self.writing = True
+                d.callback(None)
+                return
+            self._waiting.popleft()
+            self.readers += 1
+            d.callback(None)
+
+
+class Flag:
+    """
+    A boolean whose changes can be waited for.
+
+    Unlike ``until``, which wakes up periodically to re-check a predicate,
+    waiters are resumed directly by whatever code changes the flag -- and
+    only then.
+
+    :ivar value: The current state of the flag.
+    """
+
+    def __init__(self, value: bool = False) -> None:
+        self.value: bool = value
+        self._waiting: dict[bool, list[Deferred[None]]] = {
+            True: [],
+            False: [],
+        }
+
+    def __bool__(self) -> bool:
+        return self.value
+
+    def set(self) -> None:
+        self._change(True)
+
+    def clear(self) -> None:
+        self._change(False)
+
+    def _change(self, value: bool) -> None:
+        self.value = value
+        waiting = self._waiting[value]
+        self._waiting[value] = []
+        for d in waiting:
+            # A waiter's callbacks may change the flag back; only wake the
+            # others if it still has the value they were waiting for
+            if self.value != value:
+                self._waiting[value].append(d)
+                continue
+            d.callback(None)
+
+    def wait(self, value: bool = True) -> Deferred[None]:
+        """
+        Wait for the flag to have the given value.
+
+        :return: A ``Deferred`` that fires (with ``None``) as soon as the
+            flag has ``value`` -- immediately, if it already does.
+        """
+        if self.value == value:
+            return succeed(None)
+
+        def cancel(d: Deferred[None]) -> None:
+            if d in self._waiting[value]:
+                self._waiting[value].remove(d)
+
+        d: Deferred[None] = Deferred(cancel)
+        self._waiting[value].append(d)
+        return d
+
+
+class JSONArrayParser:
+    """
+    Incrementally parse the elements of a (UTF-8 encoded) top-level JSON
+    array, yielding each element as soon as it has been received in full.
+
+    This allows large list responses to be processed as they arrive, without
+    first buffering the entire body and decoding it with ``json.loads``.
+    """
+
+    _whitespace = " \t\n\r"
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+        self._has_elements = False
+
+    def _skip_whitespace(self, pos: int) -> int:
+        while (
+            pos < len(self._buffer) and self._buffer[pos] in self._whitespace
+        ):
+            pos += 1
+        return pos
+
+    def _parse(self, final: bool = False) -> list:
+        elements = []
+        buf = self._buffer
+        pos = self._skip_whitespace(0)
+        while pos < len(buf) and not self._finished:
+            if not self._started:
+                if buf[pos] != "[":
+                    raise ValueError(f"Expected a JSON array at: {buf[:20]}")
+                self._started = True
+                pos = self._skip_whitespace(pos + 1)
+                continue
+            if buf[pos] == "]":
+                self._finished = True
+                pos += 1
+                break
+            start = pos
+            if self._has_elements:
+                if buf[pos] != ",":
+                    raise ValueError(f"Expected ',' at: {buf[pos:pos + 20]}")
+                pos = self._skip_whitespace(pos + 1)
+            try:
+                element, end = self._decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                pos = start  # Incomplete; wait for more data
+                break
+            # A scalar at the very end of the buffer may have been truncated
+            # (e.g., "12" of "123") so only accept it once it is terminated.
+            end_ws = self._skip_whitespace(end)
+            if end_ws == len(buf) and not final:
+                pos = start
+                break
+            elements.append(element)
+            self._has_elements = True
+            pos = end_ws
+        self._buffer = buf[pos:]
+        return elements
+
+    def feed(self, data: bytes) -> list:
+        """
+        Feed the next chunk of the encoded array to the parser.
+
+        :return: A list of the elements completed by this chunk.
+        """
+        self._buffer += self._utf8_decoder.decode(data)
+        return self._parse()
+
+    def close(self) -> list:
+        """
+        Signal that no more data will be fed to the parser.
+
+        :return: A list of any remaining elements.
+
+        :raises ValueError: if the data did not contain a complete array.
+        """
+        self._buffer += self._utf8_decoder.decode(b"", final=True)
+        elements = self._parse(final=True)
+        if not self._finished or self._buffer.strip():
+            raise ValueError("Incomplete or malformed JSON array")
+        return elements
@@ -4,14 +4,20 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+from time import monotonic
 from typing import TYPE_CHECKING, Callable, Optional
 
-import treq
 from autobahn.twisted.websocket import create_client_agent
-from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.internet.defer import (
+    Deferred,
+    FirstError,
+    gatherResults,
+    inlineCallbacks,
+)
 
 from gridsync.errors import TahoeWebError
 from gridsync.types import TwistedDeferred
+from gridsync.util import map_bounded
 from gridsync.voucher import generate_voucher
 
 if TYPE_CHECKING:
@@ -31,6 +37,17 @@ class ZKAPAuthorizer:
         # Default batch-size from zkapauthorizer.resource.NUM_TOKENS
         self.zkap_batch_size: int = 2**15
 
+        # Cached inputs to (and the result of) the price calculation; see
+        # invalidate_dircap and invalidate_folder. Directory listings also
+        # expire after listing_ttl seconds, since other devices sharing the
+        # rootcap may change them without this process knowing.
+        self.listing_ttl: float = 60
+        # dircap -> (time fetched, "?t=json" output)
+        self._listings: dict[str, tuple[float, bytes]] = {}
+        self._folder_sizes: dict[str, list[int]] = {}
+        self._cache_generation: int = 0
+        self._price_cache: Optional[tuple[tuple[int, ...], dict]] = None
+
         # XXX/TODO: Move this later?
         gateway.monitor.zkaps_redeemed.connect(lambda _: self.backup_zkaps())
 
@@ -54,17 +71,18 @@ class ZKAPAuthorizer:
     def _request(
         self, method: str, path: str, data: Optional[bytes] = None
     ) -> TwistedDeferred[tuple[int, str]]:
-        resp = yield treq.request(
-            method,
-            f"{self.gateway.nodeurl}storage-plugins/{PLUGIN_NAME}{path}",
-            headers={
-                "Authorization": f"tahoe-lafs {self.gateway.api_token}",
-                "Content-Type": "application/json",
-            },
-            data=data,
+        resp = yield Deferred.fromCoroutine(
+            self.gateway.http_client.request(
+                method,
+                f"{self.gateway.nodeurl}storage-plugins/{PLUGIN_NAME}{path}",
+                headers={
+                    "Authorization": f"tahoe-lafs {self.gateway.api_token}",
+                    "Content-Type": "application/json",
+                },
+                data=data,
+            )
         )
-        content = yield treq.content(resp)
-        return (resp.code, content.decode("utf-8").strip())
+        return (resp.code, resp.content.decode("utf-8").strip())
 
     @inlineCallbacks
     def get_version(self) -> TwistedDeferred[str]:
@@ -77,41 +95,121 @@ class ZKAPAuthorizer:
 
     @inlineCallbacks
     def _get_content(self, cap: str) -> TwistedDeferred[bytes]:
-        resp = yield treq.get(f"{self.gateway.nodeurl}uri/{cap}")
+        resp = yield Deferred.fromCoroutine(
+            self.gateway.http_client.get(f"{self.gateway.nodeurl}uri/{cap}")
+        )
         if resp.code == 200:
-            content = yield treq.content(resp)
-            return content
+            return resp.content
         raise TahoeWebError(f"Error getting cap content: {resp.code}")
 
+    def invalidate_dircap(self, dircap: str) -> None:
+        """
+        Forget the cached contents of the given directory (which is needed
+        whenever a child is added to, or removed from, that directory).
+        """
+        self._cache_generation += 1
+        self._listings.pop(dircap, None)
+
+    def invalidate_folder(self, folder_name: str) -> None:
+        """
+        Forget the cached sizes of the given Magic-Folder's objects (which
+        change whenever that folder uploads or downloads a file).
+        """
+        self._cache_generation += 1
+        self._folder_sizes.pop(folder_name, None)
+
     @inlineCallbacks
-    def get_sizes(self) -> TwistedDeferred[list[Optional[int]]]:
-        sizes: list = []
-        rootcap = self.gateway.get_rootcap()
-        rootcap_bytes = yield self._get_content(f"{rootcap}/?t=json")
-        if not rootcap_bytes:
-            return sizes
-        sizes.append(len(rootcap_bytes))
+    def _get_listing(self, dircap: str) -> TwistedDeferred[bytes]:
+        cached = self._listings.get(dircap)
+        if cached and monotonic() - cached[0] < self.listing_ttl:
+            return cached[1]
+        generation = self._cache_generation
+        listing = yield self._get_content(f"{dircap}/?t=json")
+        if generation == self._cache_generation:
+            self._listings[dircap] = (monotonic(), listing)
+        return listing
+
+    @inlineCallbacks
+    def _get_dircap_sizes(self, dircap: str) -> TwistedDeferred[list[int]]:
+        dircap_bytes = yield self._get_listing(dircap)
+        sizes = [len(dircap_bytes)]
+        dircap_data = json.loads(dircap_bytes.decode("utf-8"))
+        for data in dircap_data[1]["children"].values():
+            size = data[1].get("size", 0)
+            if size:
+                sizes.append(size)
+        return sizes
+
+    async def _get_folder_sizes(self, fan_out: int) -> list[int]:
+        magic_folder = self.gateway.magic_folder
+        folders = list(await magic_folder.get_folders())
+        for folder in set(self._folder_sizes) - set(folders):
+            del self._folder_sizes[folder]
+        missing = [f for f in folders if f not in self._folder_sizes]
+        generation = self._cache_generation
+        results = await map_bounded(
+            magic_folder.get_object_sizes, missing, fan_out
+        )
+        folder_sizes = dict(self._folder_sizes)
+        folder_sizes.update(zip(missing, results))
+        if generation == self._cache_generation:
+            self._folder_sizes = folder_sizes
+        return [size for f in folders for size in folder_sizes[f]]
+
+    async def _get_rootcap_sizes(
+        self, rootcap_bytes: bytes, fan_out: int
+    ) -> list[int]:
+        sizes = [len(rootcap_bytes)]
         rootcap_data = json.loads(rootcap_bytes.decode("utf-8"))
-        if rootcap_data:
-            dircaps = []
-            for data in rootcap_data[1]["children"].values():
-                rw_uri = data[1].get("rw_uri", "")
-                if rw_uri:  # Only care about dirs the user can write to
-                    dircaps.append(rw_uri)
-            for dircap in dircaps:
-                dircap_bytes = yield self._get_content(f"{dircap}/?t=json")
-                sizes.append(len(dircap_bytes))
-                dircap_data = json.loads(dircap_bytes.decode("utf-8"))
-                for data in dircap_data[1]["children"].values():
-                    size = data[1].get("size", 0)
-                    if size:
-                        sizes.append(size)
-        mf_sizes = yield Deferred.fromCoroutine(
-            self.gateway.magic_folder.get_all_object_sizes()
+        if not rootcap_data:
+            return sizes
+        dircaps = []
+        for data in rootcap_data[1]["children"].values():
+            rw_uri = data[1].get("rw_uri", "")
+            if rw_uri:  # Only care about dirs the user can write to
+                dircaps.append(rw_uri)
+        dircap_sizes = await map_bounded(
+            self._get_dircap_sizes, dircaps, fan_out
         )
-        sizes.extend(mf_sizes)
+        for s in dircap_sizes:
+            sizes.extend(s)
         return sizes
 
+    @inlineCallbacks
+    def get_sizes(
+        self, fan_out: int = 8
+    ) -> TwistedDeferred[list[Optional[int]]]:
+        """
+        Get the sizes of all of the objects stored by the user (i.e., of
+        the rootcap, its writable child directories and their contents,
+        and every Magic-Folder's Tahoe-LAFS objects).
+
+        Directory listings and Magic-Folder object sizes are cached until
+        invalidated, so only the parts that have changed are requested.
+
+        :param fan_out: The maximum number of directories (or folders) to
+            request the contents of at the same time.
+        """
+        rootcap = self.gateway.get_rootcap()
+        rootcap_bytes = yield self._get_listing(rootcap)
+        if not rootcap_bytes:
+            return []
+        # Magic-Folder's objects don't depend on the rootcap traversal
+        try:
+            rootcap_sizes, mf_sizes = yield gatherResults(
+                [
+                    Deferred.fromCoroutine(
+                        self._get_rootcap_sizes(rootcap_bytes, fan_out)
+                    ),
+                    Deferred.fromCoroutine(self._get_folder_sizes(fan_out)),
+                ],
+                consumeErrors=True,
+            )
+        except FirstError as e:
+            e.subFailure.raiseException()
+            raise  # Unreachable; for mypy
+        return rootcap_sizes + mf_sizes
+
     @inlineCallbacks
     def calculate_price(self, sizes: list[int]) -> TwistedDeferred[dict]:
         if not self.gateway.nodeurl:
@@ -128,7 +226,11 @@ class ZKAPAuthorizer:
     @inlineCallbacks
     def get_price(self) -> TwistedDeferred[dict]:
         sizes = yield self.get_sizes()
+        key = tuple(sizes)
+        if self._price_cache is not None and self._price_cache[0] == key:
+            return dict(self._price_cache[1])
         price = yield self.calculate_price(sizes)
+        self._price_cache = (key, dict(price))
         return price
 
     @inlineCallbacks
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Time the filtering of synthetic Eliot log messages (as done when exporting
+debug logs).
+
+Usage: python scripts/benchmark_log_filtering.py [NUMBER_OF_MESSAGES]
+"""
+
+import json
+import random
+import sys
+import time
+
+from gridsync.filter import (
+    _ACTION_TYPE_RULES,
+    _MESSAGE_TYPE_RULES,
+    filter_eliot_logs,
+    join_eliot_logs,
+)
+
+
+def make_messages(n, seed=0):
+    rng = random.Random(seed)
+    action_types = list(_ACTION_TYPE_RULES) + ["unfiltered:action"] * 10
+    message_types = list(_MESSAGE_TYPE_RULES) + ["unfiltered:message"] * 5
+    messages = []
+    for i in range(n):
+        msg = {
+            "timestamp": 1690000000 + i / 1000,
+            "task_uuid": "%032x" % rng.getrandbits(128),
+            "task_level": [1, 2],
+            "relpath": "Documents/file-%d.txt" % i,
+            "nickname": "Example Grid",
+            "path": "/home/user/Documents",
+            "item": {"relpath": "Documents/file-%d.txt" % i},
+            "pending": ["a.txt", "b.txt"],
+            "remote_uri": "URI:CHK:%032x" % rng.getrandbits(128),
+        }
+        if rng.random() < 0.5:
+            msg["action_type"] = rng.choice(action_types)
+            msg["action_status"] = "started"
+        else:
+            msg["message_type"] = rng.choice(message_types)
+        messages.append(json.dumps(msg))
+    return messages
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print("{:<40} {:.2f}s".format(label, time.perf_counter() - start))
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    messages = make_messages(n)
+    print("Filtering {} messages".format(n))
+
+    serial = timed(
+        "filter_eliot_logs",
+        lambda: filter_eliot_logs(messages, "1"),
+    )
+    timed("join_eliot_logs (re-normalizing)", lambda: join_eliot_logs(serial))
+    timed("str.join (already normalized)", lambda: "\n".join(serial))
+
+
+if __name__ == "__main__":
+    main()
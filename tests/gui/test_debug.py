@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from collections import deque
+import gzip
 from unittest.mock import Mock
 
 import pytest
@@ -8,11 +8,15 @@ from qtpy.QtCore import Qt
 
 from gridsync.gui.debug import (
     DebugExporter,
+    LogExporter,
     LogLoader,
     header,
+    iter_debug_log,
     system,
     warning_text,
+    write_debug_log,
 )
+from gridsync.log_buffer import LogBuffer
 
 
 def test_system_module_variable_is_not_none():
@@ -27,11 +31,20 @@ def test_warning_text_module_variable_is_not_none():
     assert warning_text is not None
 
 
+def fake_tail(messages):
+    return lambda limit: (messages[-limit:], max(len(messages) - limit, 0))
+
+
 @pytest.fixture
 def core():
     fake_core = Mock()
     fake_core.tahoe_version = "9.999"
-    fake_core.log_deque = deque(["debug msg 1", "/test/tahoe", "debug msg 3"])
+    fake_core.get_startup_report = Mock(
+        return_value="Gridsync: versions 0.100s"
+    )
+    fake_core.log_buffer = LogBuffer()
+    for msg in ["debug msg 1", "/test/tahoe", "debug msg 3"]:
+        fake_core.log_buffer.append(msg.encode("utf-8"))
     fake_gateway = Mock()
     fake_gateway.executable = "/test/tahoe"
     fake_gateway.name = "TestGridOne"
@@ -44,6 +57,23 @@ def core():
     fake_gateway.get_streamed_log_messages = Mock(
         return_value=['{"test": 123}']
     )
+    fake_gateway.magic_folder.iter_log_messages = Mock(
+        return_value=['{"test": 123}']
+    )
+    fake_gateway.iter_streamed_log_messages = Mock(
+        return_value=['{"test": 123}']
+    )
+    fake_gateway.magic_folder.tail_log_messages = fake_tail(['{"test": 123}'])
+    fake_gateway.tail_streamed_log_messages = fake_tail(['{"test": 123}'])
+    # Not filtered at ingest
+    fake_gateway.iter_filtered_streamed_log_messages = Mock(return_value=None)
+    fake_gateway.magic_folder.iter_filtered_log_messages = Mock(
+        return_value=None
+    )
+    fake_gateway.tail_filtered_streamed_log_messages = Mock(return_value=None)
+    fake_gateway.magic_folder.tail_filtered_log_messages = Mock(
+        return_value=None
+    )
     fake_gateway.get_settings = Mock(return_value={})
     fake_core.gateways = [fake_gateway]
     fake_core.gui.main_window.gateways = fake_core.gateways
@@ -62,6 +92,12 @@ def test_log_loader_load_filtered_content(core):
     assert core.gateways[0].executable not in log_loader.filtered_content
 
 
+def test_log_loader_load_startup_timings_in_content(core):
+    log_loader = LogLoader(core)
+    log_loader.load()
+    assert "Startup timings:\nGridsync: versions 0.100s" in log_loader.content
+
+
 def test_log_loader_load_warning_text_in_content(core):
     log_loader = LogLoader(core)
     log_loader.load()
@@ -152,16 +188,25 @@ def test_debug_exporter_load_return_early_thread_running(core, qtbot):
     assert de.log_loader_thread.start.call_count == 0
 
 
-def test_debug_exporter_copy_to_clipboard(monkeypatch):
-    de = DebugExporter(None)
-    de.plaintextedit.setPlainText("TESTING123")
+def test_debug_exporter_copy_to_clipboard_copies_complete_log(
+    core, monkeypatch
+):
+    messages = [f'{{"n": {i}}}' for i in range(10)]
+    core.gateways[0].iter_streamed_log_messages = Mock(return_value=messages)
+    core.gateways[0].tail_streamed_log_messages = fake_tail(messages)
+    monkeypatch.setattr("gridsync.gui.debug.PREVIEW_MAX_MESSAGES", 3)
+    de = DebugExporter(core)
+    de.checkbox.setCheckState(Qt.Unchecked)  # Filter off
+    de.log_loader.load()
     fake_set_clipboard_text = Mock()
     monkeypatch.setattr(
         "gridsync.gui.debug.set_clipboard_text", fake_set_clipboard_text
     )
     monkeypatch.setattr("gridsync.gui.debug.get_clipboard_modes", lambda: [1])
     de.copy_to_clipboard()
-    assert fake_set_clipboard_text.call_args[0] == ("TESTING123", 1)
+    text, mode = fake_set_clipboard_text.call_args[0]
+    assert '{"n": 0}' in text and '{"n": 0}' not in de.log_loader.content
+    assert mode == 1
 
 
 def test_debug_exporter_export_to_file_no_dest_return(monkeypatch, tmpdir):
@@ -176,35 +221,106 @@ def test_debug_exporter_export_to_file_no_dest_return(monkeypatch, tmpdir):
     assert de.close.call_count == 0
 
 
-def test_debug_exporter_export_to_file_success(monkeypatch, tmpdir):
-    de = DebugExporter(None)
-    expected_content = "EXPECTED_CONTENT"
-    de.plaintextedit.setPlainText(expected_content)
+def test_debug_exporter_export_to_file_success(
+    core, qtbot, monkeypatch, tmpdir
+):
+    de = DebugExporter(core)
+    de.close = Mock()
+    de.checkbox.setCheckState(Qt.Unchecked)  # Filter off
     dest = str(tmpdir.join("log.txt"))
-    fake_get_save_file_name = Mock(return_value=(dest, None))
     monkeypatch.setattr(
         "gridsync.gui.debug.QFileDialog.getSaveFileName",
-        fake_get_save_file_name,
+        Mock(return_value=(dest, None)),
     )
-    de.export_to_file()
-    with open(dest) as f:
-        assert f.read() == expected_content
+    with qtbot.wait_signal(de.log_exporter.done):
+        de.export_to_file()
+    with open(dest, encoding="utf-8") as f:
+        assert core.gateways[0].executable in f.read()
+    assert de.close.call_count == 1
 
 
-def test_debug_exporter_export_to_file_failure(monkeypatch, tmpdir):
-    de = DebugExporter(None)
-    de.plaintextedit.setPlainText("TEST_CONTENT")
+def test_debug_exporter_export_to_file_failure(
+    core, qtbot, monkeypatch, tmpdir
+):
+    de = DebugExporter(core)
     dest = str(tmpdir.join("log.txt"))
-    fake_getSaveFileName = Mock(return_value=(dest, None))
     monkeypatch.setattr(
-        "gridsync.gui.debug.QFileDialog.getSaveFileName", fake_getSaveFileName
+        "gridsync.gui.debug.QFileDialog.getSaveFileName",
+        Mock(return_value=(dest, None)),
     )
     error_message = "Something Bad Happened"
-    fake_to_plain_text = Mock(side_effect=OSError(error_message))
     monkeypatch.setattr(
-        "gridsync.gui.debug.QPlainTextEdit.toPlainText", fake_to_plain_text
+        "gridsync.gui.debug.write_debug_log",
+        Mock(side_effect=OSError(error_message)),
     )
     fake_error = Mock()
     monkeypatch.setattr("gridsync.gui.debug.error", fake_error)
-    de.export_to_file()
+    with qtbot.wait_signal(de.log_exporter.failed):
+        de.export_to_file()
+    qtbot.wait_until(lambda: fake_error.called)
     assert fake_error.call_args[0][2] == error_message
+
+
+def test_iter_debug_log_gateway_sections(core):
+    content = "".join(iter_debug_log(core))
+    assert (
+        "\n------ Beginning of Tahoe-LAFS log for TestGridOne ------\n"
+        '{"test": 123}'
+        "\n------ End of Tahoe-LAFS log for TestGridOne ------\n"
+    ) in content
+
+
+def test_iter_debug_log_filtered_masks_gateway_name(core):
+    content = "".join(iter_debug_log(core, filtered=True))
+    assert "TestGridOne" not in content
+    assert "Magic-Folder log for <Filtered:GatewayName:1>" in content
+
+
+def test_iter_debug_log_preview_limit_keeps_most_recent_messages(core):
+    core.gateways[0].iter_streamed_log_messages = Mock(
+        side_effect=AssertionError("Complete log read")
+    )
+    core.gateways[0].tail_streamed_log_messages = fake_tail(
+        [f'{{"n": {i}}}' for i in range(10)]
+    )
+    content = "".join(iter_debug_log(core, preview_limit=3))
+    assert '{"n": 6}' not in content
+    assert '{"n": 7}\n{"n": 8}\n{"n": 9}' in content
+    assert "[7 earlier messages are not shown here" in content
+
+
+def test_iter_debug_log_joins_messages_across_batches(core, monkeypatch):
+    monkeypatch.setattr("gridsync.gui.debug.EXPORT_BATCH_SIZE", 2)
+    core.gateways[0].iter_streamed_log_messages = Mock(
+        return_value=[f'{{"n": {i}}}' for i in range(5)]
+    )
+    content = "".join(iter_debug_log(core, filtered=True))
+    assert "\n".join(f'{{"n": {i}}}' for i in range(5)) in content
+
+
+def test_iter_debug_log_filtered_copies_logs_filtered_at_ingest(core):
+    core.gateways[0].iter_streamed_log_messages = Mock(
+        side_effect=AssertionError("Unfiltered log read")
+    )
+    core.gateways[0].iter_filtered_streamed_log_messages = Mock(
+        return_value=['{"prefiltered": 1}']
+    )
+    content = "".join(iter_debug_log(core, filtered=True))
+    assert '{"prefiltered": 1}' in content
+    assert core.gateways[0].iter_filtered_streamed_log_messages.call_args[
+        0
+    ] == ("1",)
+
+
+def test_write_debug_log_compresses_gz_paths(tmpdir):
+    dest = str(tmpdir.join("log.txt.gz"))
+    write_debug_log(dest, ["a\n", "b"])
+    with gzip.open(dest, "rt", encoding="utf-8") as f:
+        assert f.read().splitlines() == ["a", "b"]
+
+
+def test_log_exporter_export_emits_failed_on_error(core, qtbot, tmpdir):
+    log_exporter = LogExporter(core)
+    log_exporter.path = str(tmpdir.join("missing", "log.txt"))
+    with qtbot.wait_signal(log_exporter.failed):
+        log_exporter.export()
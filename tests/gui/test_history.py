@@ -222,3 +222,15 @@ def test_history_view_init():
     mock_gateway.shares_happy = 1
     hv = HistoryView(mock_gateway, MagicMock())
     assert hv
+
+
+def test_history_list_widget_load_state_adds_recent_files(hlw):
+    hlw.gateway.magic_folder.monitor.get_recent_file_statuses.return_value = [
+        {"path": "/b.txt", "size": 1, "last-updated": 2},
+        {"path": "/a.txt", "size": 1, "last-updated": 1},
+    ]
+    hlw.load_state()
+    assert [hlw.itemWidget(hlw.item(i)).path for i in range(2)] == [
+        "/b.txt",
+        "/a.txt",
+    ]
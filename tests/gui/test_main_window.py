@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import MagicMock
+
+import pytest
+from twisted.internet.task import Clock
+
+from gridsync.gui.main_window import CentralWidget
+from gridsync.scheduler import Scheduler
+
+
+@pytest.fixture
+def gateway():
+    gateway = MagicMock()
+    gateway.name = "TestGrid"
+    gateway.shares_happy = 3
+    gateway.monitor.grid_checker.num_connected = 0
+    gateway.monitor.grid_checker.num_known = 0
+    gateway.monitor.grid_checker.available_space = 0
+    gateway.monitor.zkap_checker.days_remaining = 0
+    gateway.magic_folder.monitor.total_folders_size = 0
+    gateway.magic_folder.monitor.get_recent_file_statuses.return_value = []
+    return gateway
+
+
+def test_central_widget_add_gateway_defers_history_view(gui, gateway):
+    central_widget = CentralWidget(gui)
+    central_widget.add_gateway(gateway)
+    assert (
+        list(central_widget.folders_views),
+        central_widget.history_views,
+    ) == ([gateway], {})
+
+
+def test_central_widget_get_history_view_creates_view_once(gui, gateway):
+    central_widget = CentralWidget(gui)
+    central_widget.add_gateway(gateway)
+    view = central_widget.get_history_view(gateway)
+    assert central_widget.get_history_view(gateway) is view
+
+
+def test_central_widget_get_history_view_raises_for_unknown_gateway(gui):
+    central_widget = CentralWidget(gui)
+    with pytest.raises(KeyError):
+        central_widget.get_history_view(MagicMock())
+
+
+def test_gui_creates_secondary_windows_on_first_use(gui):
+    assert gui._preferences_window is None
+    assert gui.preferences_window is gui.preferences_window
+
+
+def test_main_window_first_show_resumes_paused_scheduler(gui, monkeypatch):
+    scheduler = Scheduler(Clock(), paused=True)
+    monkeypatch.setattr(
+        "gridsync.gui.main_window.shared_scheduler", lambda: scheduler
+    )
+    gui.main_window.showEvent(None)
+    assert not scheduler.paused
+
+
+def test_main_window_hide_pauses_scheduler(gui, monkeypatch):
+    scheduler = Scheduler(Clock())
+    monkeypatch.setattr(
+        "gridsync.gui.main_window.shared_scheduler", lambda: scheduler
+    )
+    gui.main_window.hideEvent(None)
+    assert scheduler.paused
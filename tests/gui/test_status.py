@@ -115,3 +115,22 @@ def test_on_nodes_updated_node_count_in_status_label_when_connecting(
     sp = StatusPanel(fake_tahoe, MagicMock())
     sp.on_nodes_updated(4, 5)
     assert sp.status_label.text() == "Connecting to TestGrid (4/5)..."
+
+
+def test_status_panel_load_state(fake_tahoe):
+    fake_tahoe.use_tor = False
+    fake_tahoe.monitor.grid_checker.num_connected = 3
+    fake_tahoe.monitor.grid_checker.num_known = 5
+    fake_tahoe.monitor.grid_checker.available_space = 0
+    fake_tahoe.monitor.zkap_checker.days_remaining = 0
+    fake_tahoe.magic_folder.monitor.total_folders_size = 1024
+    fake_tahoe.magic_folder.monitor.overall_status = (
+        MagicFolderStatus.UP_TO_DATE
+    )
+    sp = StatusPanel(fake_tahoe, MagicMock())
+    sp.load_state()
+    assert (
+        sp.status_label.text(),
+        sp.status_label.toolTip(),
+        sp.stored_label.text(),
+    ) == ("Up to date", "Connected to 3 of 5 storage nodes", "Stored: 1.0 kB")
@@ -66,3 +66,24 @@ def test_on_redeeming_vouchers_updated_redeeming_label_visibility(
     view.groupbox.parent().show()
     view.on_redeeming_vouchers_updated(vouchers)
     assert view.redeeming_label.isVisible() == expected_visibility
+
+
+def test_load_state_replays_zkaps_update(fake_tahoe, gui):
+    """
+    When ``UsageView.load_state`` is called after ZKAPs have already been
+    updated, the storage-time indicators are shown just as if the view had
+    received the update itself.
+    """
+    zkap_checker = fake_tahoe.monitor.zkap_checker
+    zkap_checker.redeeming_vouchers = []
+    zkap_checker.zkaps_last_redeemed = "0"
+    zkap_checker.last_zkaps_update = (0, 100)
+    zkap_checker.last_price_update = None
+    zkap_checker.days_remaining = 0
+    fake_tahoe.magic_folder.monitor.total_folders_size = 0
+    view = UsageView(fake_tahoe, gui)
+    view.groupbox.parent().show()
+    view.load_state()
+    assert not view.loading_storage_time.isVisible()
+    assert view.title.isVisible()
+    assert view.chart_view.isVisible()
@@ -558,7 +558,7 @@ async def test_monitor_emits_sync_progress_updated_signal(
 
 
 @ensureDeferred
-async def test_monitor_emits_upload_started_signal(
+async def test_monitor_emits_uploads_started_signal(
     magic_folder, tmp_path, qtbot
 ):
     folder_name = randstr()
@@ -566,17 +566,17 @@ async def test_monitor_emits_upload_started_signal(
     author = randstr()
     await magic_folder.add_folder(path, author, poll_interval=1)
 
-    with qtbot.wait_signal(magic_folder.monitor.upload_started) as blocker:
+    with qtbot.wait_signal(magic_folder.monitor.uploads_started) as blocker:
         filename = randstr()
         filepath = path / filename
         filepath.write_text(randstr() * 10)
         await magic_folder.scan(folder_name)
         await deferLater(reactor, 1, lambda: None)
-    assert (blocker.args[0], blocker.args[1]) == (folder_name, filename)
+    assert (blocker.args[0], blocker.args[1][0][0]) == (folder_name, filename)
 
 
 @ensureDeferred
-async def test_monitor_emits_upload_finished_signal(
+async def test_monitor_emits_uploads_finished_signal(
     magic_folder, tmp_path, qtbot
 ):
     folder_name = randstr()
@@ -584,13 +584,13 @@ async def test_monitor_emits_upload_finished_signal(
     author = randstr()
     await magic_folder.add_folder(path, author, poll_interval=1)
 
-    with qtbot.wait_signal(magic_folder.monitor.upload_finished) as blocker:
+    with qtbot.wait_signal(magic_folder.monitor.uploads_finished) as blocker:
         filename = randstr()
         filepath = path / filename
         filepath.write_text(randstr() * 10)
         await magic_folder.scan(folder_name)
         await deferLater(reactor, 1, lambda: None)
-    assert (blocker.args[0], blocker.args[1]) == (folder_name, filename)
+    assert (blocker.args[0], blocker.args[1][0][0]) == (folder_name, filename)
 
 
 @ensureDeferred
@@ -729,18 +729,18 @@ async def test_monitor_emits_folder_removed_signal(
 
 
 @ensureDeferred
-async def test_monitor_emits_file_added_signal(magic_folder, tmp_path, qtbot):
+async def test_monitor_emits_files_added_signal(magic_folder, tmp_path, qtbot):
     folder_name = randstr()
     path = tmp_path / folder_name
     author = randstr()
-    with qtbot.wait_signal(magic_folder.monitor.file_added) as blocker:
+    with qtbot.wait_signal(magic_folder.monitor.files_added) as blocker:
         await magic_folder.add_folder(path, author)
         filename = randstr()
         filepath = path / filename
         filepath.write_text(randstr() * 10)
         await magic_folder.scan(folder_name)
         await magic_folder.monitor.do_check()
-    assert (blocker.args[0], blocker.args[1].get("relpath")) == (
+    assert (blocker.args[0], blocker.args[1][0][1].get("relpath")) == (
         folder_name,
         filename,
     )
@@ -751,13 +751,13 @@ async def test_monitor_emits_file_added_signal(magic_folder, tmp_path, qtbot):
     reason="Fails intermittently on GitHub Actions' Windows runners",
 )
 @ensureDeferred
-async def test_monitor_emits_file_size_updated_signal(
+async def test_monitor_emits_file_sizes_updated_signal(
     magic_folder, tmp_path, qtbot
 ):
     folder_name = randstr()
     path = tmp_path / folder_name
     author = randstr()
-    with qtbot.wait_signal(magic_folder.monitor.file_size_updated) as blocker:
+    with qtbot.wait_signal(magic_folder.monitor.file_sizes_updated) as blocker:
         await magic_folder.add_folder(path, author)
         filename = randstr()
         filepath = path / filename
@@ -767,14 +767,14 @@ async def test_monitor_emits_file_size_updated_signal(
         filepath.write_text(randstr() * 16)
         await magic_folder.scan(folder_name)
         await magic_folder.monitor.do_check()
-    assert (blocker.args[0], blocker.args[1].get("relpath")) == (
+    assert (blocker.args[0], blocker.args[1][0][1].get("relpath")) == (
         folder_name,
         filename,
     )
 
 
 @ensureDeferred
-async def test_monitor_emits_file_mtime_updated_signal(
+async def test_monitor_emits_file_mtimes_updated_signal(
     magic_folder, tmp_path, qtbot
 ):
     await leave_all_folders(magic_folder)
@@ -782,7 +782,9 @@ async def test_monitor_emits_file_mtime_updated_signal(
     folder_name = randstr()
     path = tmp_path / folder_name
     author = randstr()
-    with qtbot.wait_signal(magic_folder.monitor.file_mtime_updated) as blocker:
+    with qtbot.wait_signal(
+        magic_folder.monitor.file_mtimes_updated
+    ) as blocker:
         await magic_folder.add_folder(path, author)
         filename = randstr()
         filepath = path / filename
@@ -797,7 +799,7 @@ async def test_monitor_emits_file_mtime_updated_signal(
         filepath.write_text(randstr() * 16)
         await magic_folder.scan(folder_name)
         await magic_folder.monitor.do_check()
-    assert (blocker.args[0], blocker.args[1].get("relpath")) == (
+    assert (blocker.args[0], blocker.args[1][0][1].get("relpath")) == (
         folder_name,
         filename,
     )
@@ -808,7 +810,7 @@ async def test_monitor_emits_file_mtime_updated_signal(
     reason="Fails intermittently on GitHub Actions' Windows runners",
 )
 @ensureDeferred
-async def test_monitor_emits_file_modified_signal(
+async def test_monitor_emits_files_modified_signal(
     magic_folder, tmp_path, qtbot
 ):
     await leave_all_folders(magic_folder)
@@ -816,7 +818,7 @@ async def test_monitor_emits_file_modified_signal(
     folder_name = randstr()
     path = tmp_path / folder_name
     author = randstr()
-    with qtbot.wait_signal(magic_folder.monitor.file_modified) as blocker:
+    with qtbot.wait_signal(magic_folder.monitor.files_modified) as blocker:
         await magic_folder.add_folder(path, author)
         filename = randstr()
         filepath = path / filename
@@ -826,7 +828,7 @@ async def test_monitor_emits_file_modified_signal(
         filepath.write_text(randstr() * 16)
         await magic_folder.scan(folder_name)
         await magic_folder.monitor.do_check()
-    assert (blocker.args[0], blocker.args[1].get("relpath")) == (
+    assert (blocker.args[0], blocker.args[1][0][1].get("relpath")) == (
         folder_name,
         filename,
     )
@@ -45,3 +45,48 @@ def test_config_load(tmpdir):
     with open(config.filename, "w") as f:
         f.write("[test_section]\ntest_option = test_value\n\n")
     assert config.load() == {"test_section": {"test_option": "test_value"}}
+
+
+def test_config_get_cached_until_file_changes(tmpdir, monkeypatch):
+    config = Config(os.path.join(str(tmpdir), "test_cached.ini"))
+    config.set("test_section", "test_option", "a")
+    assert config.get("test_section", "test_option") == "a"
+    parses = []
+    monkeypatch.setattr(
+        "gridsync.config._parse", lambda path: parses.append(path) or {}
+    )
+    assert Config(config.filename).get("test_section", "test_option") == "a"
+    assert parses == []
+
+
+def test_config_get_rereads_file_replaced_by_another_writer(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_replaced.ini"))
+    config.set("test_section", "test_option", "a")
+    assert config.get("test_section", "test_option") == "a"
+    # Same size (and possibly the same mtime), but a new inode
+    tmp = config.filename + ".tmp"
+    with open(tmp, "w") as f:
+        f.write("[test_section]\ntest_option = b\n\n")
+    os.replace(tmp, config.filename)
+    assert config.get("test_section", "test_option") == "b"
+
+
+def test_config_get_sees_changes_made_by_set(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_set_then_get.ini"))
+    config.set("test_section", "test_option", "a")
+    assert config.get("test_section", "test_option") == "a"
+    Config(config.filename).set("test_section", "test_option", "b")
+    assert config.get("test_section", "test_option") == "b"
+
+
+def test_config_get_option_is_case_insensitive(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_case.ini"))
+    config.set("test_section", "Test_Option", "test_value")
+    assert config.get("test_section", "TEST_OPTION") == "test_value"
+
+
+def test_config_load_returns_copy(tmpdir):
+    config = Config(os.path.join(str(tmpdir), "test_load_copy.ini"))
+    config.set("test_section", "test_option", "test_value")
+    config.load()["test_section"]["test_option"] = "changed"
+    assert config.get("test_section", "test_option") == "test_value"
@@ -0,0 +1,231 @@
+import os
+import threading
+from pathlib import Path
+
+from pytest_twisted import ensureDeferred
+
+from gridsync.file_index import FileIndex, FileIndexStore
+
+
+def _entry(relpath, size=1, mtime=1, last_updated=1):
+    return {
+        "relpath": relpath,
+        "size": size,
+        "mtime": mtime,
+        "last-updated": last_updated,
+    }
+
+
+def test_file_index_update_adds_resolved_path(tmp_path):
+    index = FileIndex(str(tmp_path))
+    changes = index.update([_entry("a")])
+    assert changes.added[0]["path"] == str(Path(tmp_path, "a").resolve())
+
+
+def test_file_index_update_reports_added_entries(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a")])
+    changes = index.update([_entry("a"), _entry("b")])
+    assert [e["relpath"] for e in changes.added] == ["b"]
+
+
+def test_file_index_update_ignores_unchanged_entries(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a")])
+    changes = index.update([_entry("a")])
+    assert (changes.added, changes.modified) == ([], [])
+
+
+def test_file_index_update_reuses_resolved_path(tmp_path, monkeypatch):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a")])
+    monkeypatch.setattr("gridsync.file_index.Path", None)  # Would fail
+    changes = index.update([_entry("a", size=2)])
+    assert changes.modified[0]["path"] == str(Path(tmp_path, "a").resolve())
+
+
+def test_file_index_update_reports_size_updated(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a")])
+    changes = index.update([_entry("a", size=2)])
+    assert (len(changes.size_updated), len(changes.mtime_updated)) == (1, 0)
+
+
+def test_file_index_update_reports_mtime_updated(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a")])
+    changes = index.update([_entry("a", mtime=2)])
+    assert (len(changes.size_updated), len(changes.mtime_updated)) == (0, 1)
+
+
+def test_file_index_update_reports_removed_entries(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a"), _entry("b")])
+    changes = index.update([_entry("b")])
+    assert [e["relpath"] for e in changes.removed] == ["a"]
+
+
+def test_file_index_interrupted_update_does_not_remove_entries(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a"), _entry("b")])
+    index.start_update()
+    index.add(_entry("b"))
+    changes = index.finish_update(remove_missing=False)
+    assert (changes.removed, sorted(index.files)) == ([], ["a", "b"])
+
+
+def test_file_index_tracks_total_size(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a", size=1), _entry("b", size=2)])
+    index.update([_entry("a", size=5), _entry("c", size=None)])
+    assert index.total_size == 5
+
+
+def test_file_index_tracks_latest_mtime(tmp_path):
+    index = FileIndex(str(tmp_path))
+    index.update([_entry("a", last_updated=1), _entry("b", last_updated=2)])
+    index.update([_entry("a", last_updated=1)])
+    assert index.latest_mtime == 1
+
+
+@ensureDeferred
+async def test_file_index_store_load_returns_empty_dict_if_missing(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    assert await store.load() == {}
+
+
+@ensureDeferred
+async def test_file_index_store_load_restores_saved_index(tmp_path):
+    index = FileIndex(str(tmp_path))
+    changes = index.update([_entry("a", size=1), _entry("b", size=2)])
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    store.save("Test", index, changes)
+    store.wait()
+    indexes = await FileIndexStore(tmp_path / "index.sqlite").load()
+    loaded = indexes["Test"]
+    assert (sorted(loaded.files), loaded.total_size) == (["a", "b"], 3)
+
+
+@ensureDeferred
+async def test_file_index_store_load_restores_paths(tmp_path):
+    index = FileIndex(str(tmp_path))
+    changes = index.update([_entry("a")])
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    store.save("Test", index, changes)
+    store.wait()
+    indexes = await FileIndexStore(tmp_path / "index.sqlite").load()
+    loaded = indexes["Test"]
+    assert loaded.files["a"]["path"] == os.path.join(str(tmp_path), "a")
+
+
+@ensureDeferred
+async def test_file_index_store_save_applies_changes(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(tmp_path))
+    store.save("Test", index, index.update([_entry("a"), _entry("b")]))
+    store.save("Test", index, index.update([_entry("b", size=5)]))
+    store.wait()
+    indexes = await FileIndexStore(tmp_path / "index.sqlite").load()
+    loaded = indexes["Test"]
+    assert (sorted(loaded.files), loaded.total_size) == (["b"], 5)
+
+
+@ensureDeferred
+async def test_file_index_store_remove(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(tmp_path))
+    store.save("Test", index, index.update([_entry("a")]))
+    store.remove("Test")
+    store.wait()
+    assert await FileIndexStore(tmp_path / "index.sqlite").load() == {}
+
+
+def test_file_index_store_save_does_not_block_caller(tmp_path, monkeypatch):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(tmp_path))
+    changes = index.update([_entry("a")])
+    threads = []
+    monkeypatch.setattr(
+        FileIndexStore,
+        "_save",
+        lambda *_: threads.append(threading.current_thread()),
+    )
+    store.save("Test", index, changes)
+    store.wait()
+    assert threads and threads[0] is not threading.main_thread()
+
+
+@ensureDeferred
+async def test_file_index_store_load_does_not_block_caller(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    threads = []
+    store._load = lambda: threads.append(threading.current_thread()) or {}
+    await store.load()
+    assert threads and threads[0] is not threading.main_thread()
+
+
+@ensureDeferred
+async def test_file_index_store_load_waits_for_pending_writes(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(tmp_path))
+    store.save("Test", index, index.update([_entry("a")]))
+    assert list(await store.load()) == ["Test"]
+
+
+@ensureDeferred
+async def test_file_index_store_load_resolves_paths(tmp_path):
+    (tmp_path / "real").mkdir()
+    link = tmp_path / "link"
+    link.symlink_to(tmp_path / "real", target_is_directory=True)
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(link))
+    store.save("Test", index, index.update([_entry("a")]))
+    indexes = await store.load()
+    loaded = indexes["Test"]
+    assert (loaded.magic_path, loaded.files["a"]["path"]) == (
+        str(link),
+        str(tmp_path.resolve() / "real" / "a"),
+    )
+
+
+@ensureDeferred
+async def test_file_index_store_can_be_used_after_close(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(tmp_path))
+    store.save("Test", index, index.update([_entry("a")]))
+    store.close()
+    store.save("Test", index, index.update([_entry("a"), _entry("b")]))
+    indexes = await store.load()
+    assert sorted(indexes["Test"].files) == ["a", "b"]
+
+
+@ensureDeferred
+async def test_file_index_store_save_copies_rows_before_writing(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(tmp_path))
+    changes = index.update([_entry("a", size=1)])
+    store.save("Test", index, changes)
+    changes.updated[0] = _entry("a", size=99)
+    store.wait()
+    indexes = await FileIndexStore(tmp_path / "index.sqlite").load()
+    loaded = indexes["Test"]
+    assert loaded.total_size == 1
+
+
+@ensureDeferred
+async def test_file_index_store_close_waits_for_pending_writes(tmp_path):
+    store = FileIndexStore(tmp_path / "index.sqlite")
+    index = FileIndex(str(tmp_path))
+    store.save("Test", index, index.update([_entry("a")]))
+    executor = store._executor
+    store.close()
+    executor.shutdown(wait=True)
+    indexes = await FileIndexStore(tmp_path / "index.sqlite").load()
+    assert list(indexes) == ["Test"]
+
+
+@ensureDeferred
+async def test_file_index_store_load_returns_empty_dict_if_corrupt(tmp_path):
+    path = tmp_path / "index.sqlite"
+    path.write_bytes(b"Not a database" * 100)
+    assert await FileIndexStore(path).load() == {}
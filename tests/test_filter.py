@@ -2,6 +2,7 @@
 
 import json
 import os
+import random
 from collections import OrderedDict
 from unittest.mock import Mock
 
@@ -9,12 +10,14 @@ import pytest
 
 from gridsync import autostart_file_path, config_dir, pkgdir
 from gridsync.filter import (
+    LogRedactor,
     apply_filters,
     filter_eliot_logs,
     filter_tahoe_log_message,
     get_filters,
     join_eliot_logs,
 )
+from gridsync.log_buffer import LogBuffer
 
 
 @pytest.fixture
@@ -154,6 +157,46 @@ def test_apply_filters_filtered_string_in_result(core, string, filtered):
     assert "<Filtered:{}>".format(filtered) in result
 
 
+def apply_filters_sequentially(in_str, filters):
+    filtered = in_str
+    for s, mask in filters:
+        if s and mask:
+            filtered = filtered.replace(s, "<Filtered:{}>".format(mask))
+    return filtered
+
+
+@pytest.mark.parametrize("alphabet", ["abFi", "abcdFi"])
+@pytest.mark.parametrize("seed", range(10))
+def test_apply_filters_matches_sequential_replacement(alphabet, seed):
+    rng = random.Random(seed)
+    # A small alphabet (which includes characters from the masks) makes
+    # overlapping and nested secrets -- the tricky cases -- common
+    for _ in range(200):
+        filters = [
+            (
+                "".join(rng.choices(alphabet, k=rng.randint(1, 4))),
+                rng.choice(["a", "b", "Tag", "Fi"]) + str(n),
+            )
+            for n in range(rng.randint(1, 6))
+        ]
+        text = "".join(rng.choices(alphabet + "<>", k=60))
+        assert apply_filters(text, filters) == apply_filters_sequentially(
+            text, filters
+        )
+
+
+def test_apply_filters_matches_sequential_replacement_for_core(core):
+    filters = get_filters(core)
+    text = " ".join(str(s) for s, _ in filters) * 3
+    assert apply_filters(text, filters) == apply_filters_sequentially(
+        text, filters
+    )
+
+
+def test_apply_filters_skips_empty_filters():
+    assert apply_filters("abc", [(None, "A"), ("", "B"), ("b", "")]) == "abc"
+
+
 @pytest.mark.parametrize(
     "msg,keys",
     [
@@ -654,6 +697,109 @@ def test_filter_eliot_logs_apply_filter_use_identifier():
     ]
 
 
+def test_filter_eliot_logs_masks_each_item_of_list():
+    messages = ['{"message_type": "magic-folder:all-files", "files": ["a"]}']
+    assert json.loads(filter_eliot_logs(messages)[0])["files"] == [
+        "<Filtered:Path:ca97811>"
+    ]
+
+
+def test_filter_eliot_logs_ignores_non_string_types():
+    messages = ['{"action_type": ["dirnode:add-file"], "name": "a"}']
+    assert json.loads(filter_eliot_logs(messages)[0])["name"] == "a"
+
+
+def test_filter_eliot_logs_leaves_out_invalid_messages():
+    messages = ['{"timestamp": 1, "task_uuid": "a", }', '{"a": 1}']
+    assert filter_eliot_logs(messages) == ['{"a": 1}']
+
+
+def test_log_redactor_filters_messages_in_order():
+    redactor = LogRedactor(LogBuffer())
+    messages = [
+        json.dumps({"action_type": "dirnode:add-file", "name": str(i)})
+        for i in range(100)
+    ]
+    for message in messages:
+        redactor.add_message(message.encode("utf-8"))
+    assert list(redactor.iter_messages("1")) == filter_eliot_logs(messages)
+
+
+def test_log_redactor_tail_messages_masks_gateway_name():
+    redactor = LogRedactor(LogBuffer())
+    for i in range(5):
+        redactor.add_message(
+            json.dumps(
+                {"action_type": "magic-folder:full-scan", "nickname": str(i)}
+            ).encode("utf-8")
+        )
+    messages, omitted = redactor.tail_messages("2", 2)
+    assert omitted == 3
+    assert all("<Filtered:GatewayName:2>" in m for m in messages)
+
+
+def test_log_redactor_drops_messages_that_cannot_be_filtered():
+    redactor = LogRedactor(LogBuffer())
+    for message in [b"not json", b"[1, 2]", b'{"a": 1}']:
+        redactor.add_message(message)
+    assert list(redactor.iter_messages("1")) == ['{"a": 1}']
+
+
+def test_log_redactor_drops_messages_when_too_many_bytes_are_pending():
+    redactor = LogRedactor(LogBuffer(), max_pending_bytes=10)
+    redactor._pending_bytes = 5  # As if another message were still waiting
+    redactor.add_message(b'{"a": 12345}')
+    redactor._pending_bytes = 0
+    redactor.add_message(b'{"b": 2}')
+    assert redactor.dropped == 1
+    assert list(redactor.iter_messages("1")) == ['{"b": 2}']
+
+
+def test_log_redactor_releases_pending_bytes_once_filtered():
+    redactor = LogRedactor(LogBuffer())
+    redactor.add_message(b'{"a": 1}')
+    redactor.add_message(b"not json")
+    redactor.wait()
+    assert redactor._pending_bytes == 0
+
+
+def test_log_redactor_logs_unexpected_errors(monkeypatch, caplog):
+    def fake_filter(*_):
+        raise TypeError("Unexpected")
+
+    monkeypatch.setattr(
+        "gridsync.filter.filter_tahoe_log_message", fake_filter
+    )
+    redactor = LogRedactor(LogBuffer())
+    redactor.add_message(b'{"a": 1}')
+    redactor.wait()
+    assert "Error redacting log message" in caplog.text
+    assert redactor._pending_bytes == 0
+
+
+def test_log_redactor_stop_shuts_down_worker():
+    redactor = LogRedactor(LogBuffer())
+    redactor.add_message(b'{"a": 1}')
+    executor = redactor._executor
+    redactor.stop()
+    assert redactor._executor is None
+    assert executor._shutdown
+
+
+def test_log_redactor_restarts_worker_after_stop():
+    redactor = LogRedactor(LogBuffer())
+    redactor.stop()
+    redactor.add_message(b'{"a": 1}')
+    assert list(redactor.iter_messages("1")) == ['{"a": 1}']
+
+
 def test_join_eliot_logs_sort_output():
     messages = ['{"C": 3, "A": 1, "B": 2}']
     assert join_eliot_logs(messages) == '{"A": 1, "B": 2, "C": 3}'
+
+
+def test_join_eliot_logs_includes_invalid_messages_as_is():
+    messages = ['{"timestamp": 1, "task_uuid": "a", }', '{"B": 2, "A": 1}']
+    assert join_eliot_logs(messages) == (
+        '{"timestamp": 1, "task_uuid": "a", }\n{"A": 1, "B": 2}'
+    )
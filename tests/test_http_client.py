@@ -0,0 +1,154 @@
+from unittest.mock import Mock
+
+import pytest
+from pytest_twisted import ensureDeferred
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.error import ConnectError
+from twisted.internet.error import TimeoutError as ConnectTimeoutError
+from twisted.internet.task import Clock
+
+from gridsync.http_client import HTTPClient, HTTPResponse, RequestStats
+
+
+def fake_get(*args, **kwargs):
+    response = Mock()
+    response.code = 200
+    return succeed(response)
+
+
+@pytest.fixture(autouse=True)
+def fake_content(monkeypatch):
+    monkeypatch.setattr("treq.content", lambda _: succeed(b"test content"))
+
+
+def test_request_stats_mean_time():
+    stats = RequestStats()
+    stats.record(1.0)
+    stats.record(3.0)
+    assert stats.mean_time == 2.0
+
+
+def test_request_stats_mean_time_no_requests():
+    assert RequestStats().mean_time == 0.0
+
+
+@ensureDeferred
+async def test_http_client_uses_persistent_pool(monkeypatch):
+    fake = Mock(side_effect=fake_get)
+    monkeypatch.setattr("treq.get", fake)
+    client = HTTPClient(Clock())
+    await client.get("http://127.0.0.1:1234/")
+    assert fake.call_args[1]["pool"].persistent is True
+
+
+@ensureDeferred
+async def test_http_client_records_stats_per_endpoint(monkeypatch):
+    monkeypatch.setattr("treq.get", fake_get)
+    client = HTTPClient(Clock())
+    await client.get("http://127.0.0.1:1234/uri/URI:DIR2:abc")
+    await client.get("http://127.0.0.1:1234/")
+    assert client.stats["127.0.0.1:1234"].count == 2
+
+
+@ensureDeferred
+async def test_http_client_records_errors(monkeypatch):
+    monkeypatch.setattr("treq.get", Mock(side_effect=ConnectError()))
+    client = HTTPClient(Clock())
+    with pytest.raises(ConnectError):
+        await client.get("http://127.0.0.1:1234/")
+    assert client.stats["127.0.0.1:1234"].errors == 1
+
+
+def test_http_client_limits_concurrent_requests_per_endpoint(monkeypatch):
+    pending = []
+
+    def fake_pending_get(*args, **kwargs):
+        d = Deferred()
+        pending.append(d)
+        return d
+
+    monkeypatch.setattr("treq.get", fake_pending_get)
+    client = HTTPClient(Clock(), max_requests_per_endpoint=1)
+    Deferred.fromCoroutine(client.get("http://127.0.0.1:1234/a"))
+    Deferred.fromCoroutine(client.get("http://127.0.0.1:1234/b"))
+    Deferred.fromCoroutine(client.get("http://127.0.0.1:5678/c"))
+    assert len(pending) == 2  # The second request to 1234 is queued
+    pending[0].callback(Mock())
+    assert len(pending) == 3
+
+
+def test_http_client_holds_limit_until_body_is_read(monkeypatch):
+    pending = []
+
+    def fake_pending_post(*args, **kwargs):
+        d = Deferred()
+        pending.append(d)
+        return d
+
+    body = Deferred()
+    monkeypatch.setattr("treq.get", fake_get)
+    monkeypatch.setattr("treq.post", fake_pending_post)
+    monkeypatch.setattr("treq.content", lambda _: body)
+    client = HTTPClient(Clock(), max_requests_per_endpoint=1)
+    Deferred.fromCoroutine(client.get("http://127.0.0.1:1234/a"))
+    Deferred.fromCoroutine(client.post("http://127.0.0.1:1234/b"))
+    assert not pending  # Still reading the body of the first response
+    body.callback(b"")
+    assert len(pending) == 1
+
+
+def test_http_client_returns_response_with_content(monkeypatch):
+    monkeypatch.setattr("treq.get", fake_get)
+    client = HTTPClient(Clock())
+    d = Deferred.fromCoroutine(client.get("http://127.0.0.1:1234/"))
+    assert d.result == HTTPResponse(200, b"test content")
+
+
+def test_http_client_passes_body_to_collector(monkeypatch):
+    collected = []
+
+    def fake_collect(response, collector):
+        collector(b"test content")
+        return succeed(None)
+
+    monkeypatch.setattr("treq.get", fake_get)
+    monkeypatch.setattr("treq.collect", fake_collect)
+    client = HTTPClient(Clock())
+    d = Deferred.fromCoroutine(
+        client.get("http://127.0.0.1:1234/", collector=collected.append)
+    )
+    assert (d.result, collected) == (HTTPResponse(200, b""), [b"test content"])
+
+
+def test_http_client_raises_timeout_error(monkeypatch):
+    monkeypatch.setattr("treq.get", lambda *args, **kwargs: Deferred())
+    clock = Clock()
+    client = HTTPClient(clock)
+    d = Deferred.fromCoroutine(client.get("http://127.0.0.1:1/", timeout=5))
+    clock.advance(5)
+    failure = []
+    d.addErrback(failure.append)
+    assert failure[0].check(ConnectTimeoutError)
+
+
+def test_http_client_timeout_error_is_connect_error(monkeypatch):
+    monkeypatch.setattr("treq.get", lambda *args, **kwargs: Deferred())
+    clock = Clock()
+    client = HTTPClient(clock, timeout=5)
+    d = Deferred.fromCoroutine(client.get("http://127.0.0.1:1/"))
+    clock.advance(5)
+    failure = []
+    d.addErrback(failure.append)
+    assert failure[0].check(ConnectError)
+
+
+def test_http_client_timeout_includes_reading_body(monkeypatch):
+    monkeypatch.setattr("treq.get", fake_get)
+    monkeypatch.setattr("treq.content", lambda _: Deferred())
+    clock = Clock()
+    client = HTTPClient(clock)
+    d = Deferred.fromCoroutine(client.get("http://127.0.0.1:1/", timeout=5))
+    clock.advance(5)
+    failure = []
+    d.addErrback(failure.append)
+    assert failure[0].check(ConnectTimeoutError)
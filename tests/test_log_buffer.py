@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from unittest.mock import Mock
+
+from gridsync.log_buffer import (
+    LogBudget,
+    LogBuffer,
+    LogSegmentStore,
+    _Chunk,
+)
+
+
+def compressed(*messages):
+    return zlib.compress(
+        b"".join(struct.pack("!I", len(m)) + m for m in messages)
+    )
+
+
+def fill(buffer, n, prefix="message"):
+    for i in range(n):
+        buffer.append(f"{prefix}-{i}".encode())
+
+
+def test_log_buffer_returns_messages_in_order():
+    buffer = LogBuffer(chunk_size=64)
+    fill(buffer, 100)
+    assert buffer.get_messages() == [f"message-{i}" for i in range(100)]
+
+
+def test_log_buffer_compresses_sealed_chunks():
+    buffer = LogBuffer(chunk_size=4096)
+    fill(buffer, 10000)
+    raw_size = sum(len(f"message-{i}") for i in range(10000))
+    assert buffer.nbytes < raw_size / 2
+
+
+def test_log_buffer_maxlen_keeps_most_recent_messages():
+    buffer = LogBuffer(maxlen=5, chunk_size=32)
+    fill(buffer, 100)
+    assert buffer.get_messages() == [f"message-{i}" for i in range(95, 100)]
+    assert len(buffer) == 5
+
+
+def test_log_buffer_maxlen_zero_keeps_nothing():
+    buffer = LogBuffer(maxlen=0)
+    fill(buffer, 10)
+    assert buffer.get_messages() == []
+
+
+def test_log_buffer_preserves_newlines_in_messages():
+    buffer = LogBuffer(chunk_size=16)
+    buffer.append(b"Traceback:\n  line 1\n  line 2")
+    buffer.append(b"next")
+    assert buffer.get_messages() == ["Traceback:\n  line 1\n  line 2", "next"]
+
+
+def test_log_budget_is_shared_across_buffers():
+    budget = LogBudget(max_bytes=8 * 1024)
+    buffers = [LogBuffer(budget=budget, chunk_size=1024) for _ in range(4)]
+    for i, buffer in enumerate(buffers):
+        fill(buffer, 5000, prefix=str(i))
+    assert budget.used <= budget.max_bytes
+    assert sum(b.nbytes for b in buffers) == budget.used
+
+
+def test_log_budget_evicts_oldest_chunk_first():
+    budget = LogBudget(max_bytes=4 * 1024)
+    old = LogBuffer(budget=budget, chunk_size=512)
+    new = LogBuffer(budget=budget, chunk_size=512)
+    fill(old, 500, prefix="old")
+    fill(new, 5000, prefix="new")
+    # Only the (small, uncompressed) tail of the older buffer remains
+    assert old.oldest_seq is None
+    assert old.nbytes < old.chunk_size
+    assert new.get_messages()[-1] == "new-4999"
+
+
+def test_log_buffer_clear_releases_budget():
+    budget = LogBudget()
+    buffer = LogBuffer(budget=budget)
+    fill(buffer, 100)
+    buffer.clear()
+    assert (len(buffer), buffer.nbytes, budget.used) == (0, 0, 0)
+
+
+def test_log_buffer_spills_discarded_chunks_to_history(tmp_path):
+    history = LogSegmentStore(tmp_path)
+    buffer = LogBuffer(maxlen=10, chunk_size=64, history=history)
+    fill(buffer, 1000)
+    assert len(buffer) == 10
+    assert buffer.get_messages() == [f"message-{i}" for i in range(1000)]
+
+
+def test_log_buffer_get_messages_pages_through_history(tmp_path):
+    history = LogSegmentStore(tmp_path)
+    buffer = LogBuffer(maxlen=10, chunk_size=64, history=history)
+    fill(buffer, 1000)
+    page = buffer.get_messages(offset=500, limit=3)
+    assert page == ["message-500", "message-501", "message-502"]
+
+
+def test_log_buffer_iter_messages_matches_get_messages(tmp_path):
+    buffer = LogBuffer(
+        maxlen=10, chunk_size=64, history=LogSegmentStore(tmp_path)
+    )
+    fill(buffer, 100)
+    assert list(buffer.iter_messages()) == buffer.get_messages()
+
+
+def test_log_buffer_tail_returns_most_recent_messages():
+    buffer = LogBuffer(maxlen=50, chunk_size=64)
+    fill(buffer, 100)
+    assert buffer.tail(3) == (["message-97", "message-98", "message-99"], 47)
+
+
+def test_log_buffer_tail_matches_get_messages(tmp_path):
+    buffer = LogBuffer(
+        maxlen=10, chunk_size=64, history=LogSegmentStore(tmp_path)
+    )
+    fill(buffer, 1000)
+    for limit in (0, 5, 10, 100, 2000):
+        messages, omitted = buffer.tail(limit)
+        expected = buffer.get_messages()
+        assert messages == expected[len(expected) - len(messages) :]
+        assert (len(messages), omitted) == (
+            min(limit, 1000),
+            1000 - min(limit, 1000),
+        )
+
+
+def test_log_buffer_tail_decompresses_only_the_chunks_needed(monkeypatch):
+    buffer = LogBuffer(chunk_size=64)
+    fill(buffer, 1000)
+    decode = _Chunk.decode
+    decoded = []
+
+    def fake_decode(chunk):
+        decoded.append(chunk)
+        return decode(chunk)
+
+    monkeypatch.setattr(_Chunk, "decode", fake_decode)
+    messages, _ = buffer.tail(len(buffer._open) + 1)
+    assert messages[-1] == "message-999"
+    assert len(decoded) == 1
+
+
+def test_log_segment_store_tail_reads_newest_chunks_first(tmp_path):
+    history = LogSegmentStore(tmp_path, segment_size=256)
+    buffer = LogBuffer(maxlen=1, chunk_size=64, history=history)
+    fill(buffer, 200)
+    messages, total = history.tail(2)
+    assert messages == list(history.iter_messages())[-2:]
+    assert total == len(list(history.iter_messages()))
+
+
+def test_log_segment_store_rotates_segments(tmp_path):
+    history = LogSegmentStore(tmp_path, segment_size=256)
+    buffer = LogBuffer(maxlen=1, chunk_size=64, history=history)
+    fill(buffer, 1000)
+    history.wait()
+    assert len(list(tmp_path.glob("*.segment"))) > 1
+
+
+def test_log_segment_store_prunes_oldest_segments_by_size(tmp_path):
+    history = LogSegmentStore(tmp_path, max_bytes=2048, segment_size=256)
+    buffer = LogBuffer(maxlen=1, chunk_size=64, history=history)
+    fill(buffer, 5000)
+    history.wait()
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.segment")) < 4096
+    # The most recent messages remain, without gaps
+    numbers = [int(m.split("-")[1]) for m in buffer.get_messages()]
+    assert numbers == list(range(numbers[0], 5000))
+    assert numbers[0] > 0
+
+
+def test_log_segment_store_prunes_expired_segments(tmp_path):
+    history = LogSegmentStore(tmp_path, max_age=60, segment_size=1)
+    history.write_chunk(compressed(b"old"), 1)
+    history.wait()
+    old = next(tmp_path.glob("*.segment"))
+    os.utime(old, (time.time() - 120, time.time() - 120))
+    history.write_chunk(compressed(b"new"), 1)
+    assert list(history.iter_messages()) == [b"new"]
+
+
+def test_log_segment_store_writes_chunks_in_a_worker_thread(tmp_path):
+    history = LogSegmentStore(tmp_path)
+    threads = []
+    write_chunk = history._write_chunk
+
+    def fake_write_chunk(data, count_):
+        threads.append(threading.current_thread())
+        write_chunk(data, count_)
+
+    history._write_chunk = fake_write_chunk
+    history.write_chunk(compressed(b"message"), 1)
+    assert list(history.iter_messages()) == [b"message"]
+    assert threads and threads[0] is not threading.current_thread()
+
+
+def test_log_segment_store_lists_segments_only_once(tmp_path, monkeypatch):
+    history = LogSegmentStore(tmp_path, segment_size=256)
+    buffer = LogBuffer(maxlen=1, chunk_size=64, history=history)
+    fill(buffer, 10)
+    history.wait()
+    monkeypatch.setattr(
+        Path, "glob", Mock(side_effect=AssertionError("Listed again"))
+    )
+    fill(buffer, 1000)
+    assert len(history.mark()) > 1
+
+
+def test_log_segment_store_clear_removes_segments(tmp_path):
+    history = LogSegmentStore(tmp_path)
+    history.write_chunk(compressed(b"message"), 1)
+    history.clear()
+    assert (list(tmp_path.glob("*.segment")), history.mark()) == ([], [])
+
+
+def test_log_segment_store_ignores_truncated_chunk(tmp_path):
+    history = LogSegmentStore(tmp_path)
+    buffer = LogBuffer(maxlen=1, chunk_size=16, history=history)
+    fill(buffer, 20)
+    history.wait()
+    segment = next(tmp_path.glob("*.segment"))
+    segment.write_bytes(segment.read_bytes()[:-3])
+    messages = list(history.iter_messages())
+    assert messages == [f"message-{i}".encode() for i in range(len(messages))]
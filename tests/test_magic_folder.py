@@ -1,13 +1,19 @@
 from pathlib import Path
 
 import pytest
+from pytest_twisted import ensureDeferred
+from twisted.internet.defer import Deferred
+from twisted.internet.task import Clock
 
 from gridsync.crypto import randstr
+from gridsync.file_index import FileIndex, FileIndexStore
 from gridsync.magic_folder import (
     MagicFolder,
     MagicFolderConfigError,
     MagicFolderError,
+    MagicFolderMonitor,
     MagicFolderStatus,
+    OperationsIndex,
 )
 from gridsync.tahoe import Tahoe
 
@@ -58,6 +64,14 @@ def test__read_api_port_raises_magic_folder_config_error_if_not_int(tmp_path):
         magic_folder._read_api_port()
 
 
+def test_await_running_resumes_when_monitor_is_running(tmp_path):
+    magic_folder = MagicFolder(Tahoe(tmp_path / "nodedir"))
+    d = Deferred.fromCoroutine(magic_folder.await_running())
+    assert not d.called
+    magic_folder.monitor.running.set()
+    assert d.called
+
+
 @pytest.mark.parametrize(
     "state, status",
     [
@@ -143,3 +157,279 @@ def test_magic_folder_monitor__parse_folder_statuses(tmp_path, state, status):
     monitor = magic_folder.monitor
     statuses = monitor._parse_folder_statuses(state)
     assert statuses.get("TestFolder") == status
+
+
+def test_operations_index_update_returns_started_and_finished():
+    index = OperationsIndex()
+    index.update({("TestFolder", "a"): {"relpath": "a"}})
+    started, finished = index.update(
+        {
+            ("TestFolder", "a"): {"relpath": "a"},
+            ("TestFolder", "b"): {"relpath": "b"},
+        }
+    )
+    assert (started, finished) == ([("TestFolder", "b", {"relpath": "b"})], [])
+    started, finished = index.update({("TestFolder", "b"): {"relpath": "b"}})
+    assert (started, finished) == ([], [("TestFolder", "a", {"relpath": "a"})])
+
+
+def test_operations_index_counts_operations_per_folder():
+    index = OperationsIndex()
+    index.update(
+        {
+            ("FolderA", "a"): {},
+            ("FolderA", "b"): {},
+            ("FolderB", "c"): {},
+        }
+    )
+    index.update({("FolderA", "b"): {}, ("FolderB", "c"): {}})
+    assert (index.count("FolderA"), index.count("FolderB")) == (1, 1)
+
+
+def test_operations_index_forgets_folders_without_operations():
+    index = OperationsIndex()
+    index.update({("FolderA", "a"): {}, ("FolderB", "b"): {}})
+    index.update({("FolderB", "b"): {}})
+    assert index.folders() == ["FolderB"]
+
+
+def _status_with_uploads(*relpaths):
+    return {
+        "folders": {
+            "TestFolder": {
+                "uploads": [{"relpath": relpath} for relpath in relpaths],
+                "downloads": [],
+                "errors": [],
+                "poller": {"last-poll": None},
+                "scanner": {"last-scan": None},
+            }
+        }
+    }
+
+
+@pytest.fixture()
+def clock():
+    return Clock()
+
+
+@pytest.fixture()
+def file_status():
+    return []
+
+
+@pytest.fixture()
+def monitor(tmp_path, clock, file_status):
+    magic_folder = MagicFolder(Tahoe(tmp_path / "nodedir"))
+
+    async def get_folders():
+        return {"TestFolder": {"magic_path": str(tmp_path)}}
+
+    async def get_folder_backups():
+        return {}
+
+    async def stream_file_status(_, collector):
+        for entry in file_status:
+            collector(dict(entry))
+
+    magic_folder.get_folders = get_folders
+    magic_folder.get_folder_backups = get_folder_backups
+    magic_folder.stream_file_status = stream_file_status
+    return MagicFolderMonitor(magic_folder, clock=clock)
+
+
+def test_magic_folder_monitor_emits_uploads_started_once(
+    monitor, clock, qtbot
+):
+    monitor.compare_states(_status_with_uploads("a"), {})
+    clock.advance(1)
+    with qtbot.wait_signal(monitor.uploads_started) as blocker:
+        monitor.compare_states(_status_with_uploads("a", "b"), {})
+        clock.advance(1)
+    assert blocker.args == ["TestFolder", [("b", {"relpath": "b"})]]
+
+
+def test_magic_folder_monitor_emits_uploads_finished(monitor, clock, qtbot):
+    monitor.compare_states(_status_with_uploads("a", "b"), {})
+    with qtbot.wait_signal(monitor.uploads_finished) as blocker:
+        monitor.compare_states(_status_with_uploads("b"), {})
+        clock.advance(1)
+    assert blocker.args == ["TestFolder", [("a", {"relpath": "a"})]]
+
+
+def test_magic_folder_monitor_emits_files_updated_when_folder_finishes(
+    monitor, qtbot
+):
+    monitor.compare_states(_status_with_uploads("a", "b"), {})
+    monitor.compare_states(_status_with_uploads("b"), {})
+    with qtbot.wait_signal(monitor.files_updated) as blocker:
+        monitor.compare_states(_status_with_uploads(), {})
+    assert blocker.args == ["TestFolder", ["a", "b"]]
+
+
+def test_magic_folder_monitor_batches_uploads_started(monitor, clock, qtbot):
+    with qtbot.wait_signal(monitor.uploads_started) as blocker:
+        monitor.compare_states(_status_with_uploads("a"), {})
+        monitor.compare_states(_status_with_uploads("a", "b"), {})
+        clock.advance(1)
+    assert blocker.args == [
+        "TestFolder",
+        [("a", {"relpath": "a"}), ("b", {"relpath": "b"})],
+    ]
+
+
+def test_magic_folder_monitor_delays_signals_until_batch_interval(
+    monitor, clock, qtbot
+):
+    with qtbot.assert_not_emitted(monitor.uploads_started):
+        monitor.compare_states(_status_with_uploads("a"), {})
+        clock.advance(0.1)
+
+
+def test_magic_folder_monitor_flushes_signals_at_max_batch_size(
+    monitor, clock, qtbot
+):
+    monitor = MagicFolderMonitor(
+        monitor.magic_folder, clock=clock, max_batch_size=2
+    )
+    with qtbot.wait_signal(monitor.uploads_started) as blocker:
+        monitor.compare_states(_status_with_uploads("a", "b"), {})
+    assert len(blocker.args[1]) == 2
+
+
+def test_magic_folder_monitor_emits_batches_in_queued_order(monitor, clock):
+    emitted = []
+    monitor.uploads_started.connect(lambda *a: emitted.append(("started", a)))
+    monitor.uploads_finished.connect(
+        lambda *a: emitted.append(("finished", a))
+    )
+    monitor.compare_states(_status_with_uploads("a"), {})
+    monitor.compare_states(_status_with_uploads(), {})
+    clock.advance(1)
+    assert emitted == [
+        ("started", ("TestFolder", [("a", {"relpath": "a"})])),
+        ("finished", ("TestFolder", [("a", {"relpath": "a"})])),
+    ]
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_do_check_emits_files_added(
+    monitor, clock, file_status, qtbot
+):
+    file_status.append({"relpath": "a", "size": 1, "last-updated": 1})
+    with qtbot.wait_signal(monitor.files_added) as blocker:
+        await monitor.do_check()
+        clock.advance(1)
+    assert [relpath for relpath, _ in blocker.args[1]] == ["a"]
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_do_check_emits_folder_size_updated(
+    monitor, file_status, qtbot
+):
+    file_status.append({"relpath": "a", "size": 1, "last-updated": 1})
+    await monitor.do_check()
+    file_status.append({"relpath": "b", "size": 2, "last-updated": 2})
+    with qtbot.wait_signal(monitor.folder_size_updated) as blocker:
+        await monitor.do_check()
+    assert blocker.args == ["TestFolder", 3]
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_get_recent_file_statuses(
+    monitor, file_status
+):
+    file_status.extend(
+        [
+            {"relpath": "a", "size": 1, "last-updated": 2},
+            {"relpath": "b", "size": 1, "last-updated": 3},
+            {"relpath": "c", "size": 1, "last-updated": 1},
+        ]
+    )
+    await monitor.do_check()
+    statuses = monitor.get_recent_file_statuses(2)
+    assert [status["relpath"] for status in statuses] == ["b", "a"]
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_total_folders_size(monitor, file_status):
+    file_status.append({"relpath": "a", "size": 5, "last-updated": 1})
+    await monitor.do_check()
+    assert monitor.total_folders_size == 5
+
+
+@pytest.fixture()
+def file_index_store(tmp_path):
+    store = FileIndexStore(tmp_path / "file-index.sqlite")
+    index = FileIndex(str(tmp_path))
+    changes = index.update([{"relpath": "a", "size": 1, "last-updated": 1}])
+    store.save("TestFolder", index, changes)
+    store.wait()
+    return store
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_load_file_index_emits_folder_added(
+    monitor, clock, file_index_store, qtbot
+):
+    monitor = MagicFolderMonitor(
+        monitor.magic_folder, clock=clock, file_index_store=file_index_store
+    )
+    with qtbot.wait_signal(monitor.folder_added) as blocker:
+        await monitor.load_file_index()
+    assert blocker.args == ["TestFolder"]
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_load_file_index_emits_files_added(
+    monitor, clock, file_index_store, qtbot
+):
+    monitor = MagicFolderMonitor(
+        monitor.magic_folder, clock=clock, file_index_store=file_index_store
+    )
+    with qtbot.wait_signal(monitor.files_added) as blocker:
+        await monitor.load_file_index()
+    assert [relpath for relpath, _ in blocker.args[1]] == ["a"]
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_do_check_after_load_file_index(
+    monitor, clock, file_index_store, file_status, qtbot
+):
+    monitor = MagicFolderMonitor(
+        monitor.magic_folder, clock=clock, file_index_store=file_index_store
+    )
+    await monitor.load_file_index()
+    file_status.append({"relpath": "a", "size": 1, "last-updated": 1})
+    with qtbot.assert_not_emitted(monitor.folder_added):
+        with qtbot.assert_not_emitted(monitor.files_added):
+            await monitor.do_check()
+            clock.advance(1)
+
+
+@ensureDeferred
+async def test_magic_folder_monitor_do_check_saves_file_index(
+    monitor, clock, tmp_path, file_status
+):
+    store = FileIndexStore(tmp_path / "file-index.sqlite")
+    monitor = MagicFolderMonitor(
+        monitor.magic_folder, clock=clock, file_index_store=store
+    )
+    file_status.append({"relpath": "b", "size": 2, "last-updated": 2})
+    await monitor.do_check()
+    store.wait()
+    loaded = await FileIndexStore(tmp_path / "file-index.sqlite").load()
+    assert list(loaded["TestFolder"].files) == ["b"]
+
+
+@pytest.mark.parametrize(
+    "line,expected",
+    [
+        ('{"timestamp": 1.5, "task_uuid": "abc", "task_level": [1]}', True),
+        ('  {"task_uuid": "abc", "timestamp": 1.5}\r', True),
+        ('{"timestamp": 1.5}', False),
+        ("Traceback (most recent call last):", False),
+        ('"timestamp": 1, "task_uuid": 2', False),
+    ],
+)
+def test__is_eliot_log_message(line, expected):
+    assert MagicFolder._is_eliot_log_message(line) is expected
@@ -3,11 +3,15 @@
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Awaitable, Callable, TypeVar
-from unittest.mock import MagicMock, Mock, call
+from unittest.mock import MagicMock, Mock
 
 from pytest_twisted import inlineCallbacks
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.task import Clock
 
+from gridsync.magic_folder import MagicFolderStatus
 from gridsync.monitor import GridChecker, Monitor, ZKAPChecker, _parse_vouchers
+from gridsync.scheduler import Scheduler
 
 T = TypeVar("T")
 
@@ -62,20 +66,25 @@ def test_grid_checker_not_connected(qtbot):
     assert gc.num_connected == 0
 
 
-@inlineCallbacks
-def test_monitor_emit_check_finished(monkeypatch, qtbot):
-    gateway = Mock(zkap_auth_required=False)
-    monitor = Monitor(gateway)
+def test_monitor_scheduled_checks_emit_check_finished_once():
+    clock = Clock()
+    monitor = Monitor(Mock(zkap_auth_required=False), Scheduler(clock))
     monitor.grid_checker = MagicMock()
-    with qtbot.wait_signal(monitor.check_finished):
-        yield monitor.do_checks()
+    monitor.grid_checker.do_check = Mock(return_value=succeed(None))
+    monitor.zkap_checker = MagicMock()
+    monitor.zkap_checker.do_check = Mock(return_value=succeed(None))
+    emitted = []
+    monitor.check_finished.connect(lambda: emitted.append(True))
+    monitor.start()
+    clock.advance(0)
+    assert emitted == [True]
 
 
 def test_monitor_start():
-    monitor = Monitor(MagicMock())
-    monitor.timer = MagicMock()
+    scheduler = MagicMock()
+    monitor = Monitor(MagicMock(), scheduler=scheduler)
     monitor.start()
-    assert monitor.timer.mock_calls == [call.start(2, now=True)]
+    assert len(scheduler.add.mock_calls) == 1
 
 
 def test_monitor_multiple_start():
@@ -83,11 +92,27 @@ def test_monitor_multiple_start():
     Calling ``Monitor.start`` multiple times has no effects beyond those of
     calling it once.
     """
-    monitor = Monitor(MagicMock())
-    monitor.timer = MagicMock()
+    scheduler = MagicMock()
+    monitor = Monitor(MagicMock(), scheduler=scheduler)
     monitor.start()
     monitor.start()
-    assert monitor.timer.mock_calls == [call.start(2, now=True)]
+    assert len(scheduler.add.mock_calls) == 1
+
+
+def test_monitor_stop_removes_tasks():
+    scheduler = Scheduler(Clock())
+    monitor = Monitor(MagicMock(), scheduler=scheduler)
+    monitor.start()
+    monitor.stop()
+    assert scheduler._tasks == []
+
+
+def test_monitor_wakes_tasks_when_syncing_starts():
+    scheduler = MagicMock()
+    monitor = Monitor(MagicMock(), scheduler=scheduler)
+    monitor.start()
+    monitor.on_sync_status_changed(MagicFolderStatus.SYNCING)
+    assert len(scheduler.wake.mock_calls) == 1
 
 
 def test_zkaps_update_last_redeemed(tahoe):
@@ -164,3 +189,30 @@ def test__update_redeeming_vouchers_emits_redeeming_vouchers_updated(tahoe):
     checker.redeeming_vouchers_updated.connect(redeeming_vouchers.extend)
     checker._update_redeeming_vouchers(parsed.redeeming_vouchers)
     assert redeeming_vouchers == ["0MH30nxh9iup727nTi3u51Ir9HcQYIM8"]
+
+
+def test_zkap_checker_update_price_coalesces_calls(monkeypatch):
+    pending = []
+
+    def fake_update_price(_):
+        pending.append(Deferred())
+        return pending[-1]
+
+    monkeypatch.setattr(ZKAPChecker, "_update_price", fake_update_price)
+    checker = ZKAPChecker(MagicMock())
+    checker.update_price()
+    checker.update_price()
+    checker.update_price()
+    pending[0].callback(None)
+    assert len(pending) == 2  # One follow-up update for both later calls
+
+
+def test_zkap_checker_update_price_runs_again_after_completion(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        ZKAPChecker, "_update_price", lambda _: succeed(calls.append(1))
+    )
+    checker = ZKAPChecker(MagicMock())
+    checker.update_price()
+    checker.update_price()
+    assert len(calls) == 2
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import sys
+
+import pytest
+
+from gridsync.profiling import ImportTimer
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    pkg = tmp_path / "profiled_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("from profiled_pkg import child\n")
+    (pkg / "child.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "profiled_pkg"
+    for name in ("profiled_pkg", "profiled_pkg.child"):
+        sys.modules.pop(name, None)
+
+
+def test_import_timer_records_nested_imports(package):
+    timer = ImportTimer()
+    timer.install()
+    try:
+        __import__(package)
+    finally:
+        timer.uninstall()
+    assert [(name, depth) for name, depth, _, _ in timer.records] == [
+        ("profiled_pkg.child", 1),
+        ("profiled_pkg", 0),
+    ]
+
+
+def test_import_timer_cumulative_time_includes_nested_imports(package):
+    timer = ImportTimer()
+    timer.install()
+    try:
+        __import__(package)
+    finally:
+        timer.uninstall()
+    (_, _, child_self, child_total), (
+        _,
+        _,
+        parent_self,
+        parent_total,
+    ) = timer.records
+    assert parent_total >= parent_self + child_total - 1  # Rounding
+
+
+def test_import_timer_restores_original_loader(package):
+    timer = ImportTimer()
+    timer.install()
+    try:
+        module = __import__(package)
+    finally:
+        timer.uninstall()
+    assert type(module.__loader__).__name__ == "SourceFileLoader"
+
+
+def test_import_timer_uninstall_removes_finder():
+    timer = ImportTimer()
+    timer.install()
+    timer.uninstall()
+    assert timer not in sys.meta_path
+
+
+def test_import_timer_report_is_formatted_like_importtime():
+    timer = ImportTimer()
+    timer.records = [("b", 1, 10, 10), ("a", 0, 5, 15)]
+    assert timer.report() == (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:        10 |         10 |   b\n"
+        "import time:         5 |         15 | a"
+    )
+
+
+def test_import_timer_report_limit_keeps_slowest_in_import_order():
+    timer = ImportTimer()
+    timer.records = [("c", 0, 30, 30), ("b", 0, 1, 1), ("a", 0, 20, 20)]
+    assert timer.report(limit=2).splitlines()[1:] == [
+        "import time:        30 |         30 | c",
+        "import time:        20 |         20 | a",
+    ]
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import Mock
+
+import pytest
+from pytest_twisted import ensureDeferred
+from twisted.internet.defer import Deferred, succeed
+
+from gridsync.rootcap import RootcapManager
+
+
+@pytest.fixture
+def fake_gateway(tmpdir):
+    listings = {
+        "URI:DIR2:rootcap": {
+            "v0": {"cap": "URI:DIR2:v0", "type": "dirnode"},
+        },
+        "URI:DIR2:v0": {
+            ".magic-folders": {"cap": "URI:DIR2:mf", "type": "dirnode"},
+            ".zkapauthorizer": {"cap": "URI:DIR2:zk", "type": "dirnode"},
+        },
+        "URI:DIR2:mf": {
+            "Test (personal)": {"cap": "URI:DIR2:p", "type": "dirnode"},
+        },
+        "URI:DIR2:zk": {},
+    }
+    gateway = Mock()
+    gateway.nodedir = str(tmpdir)
+    gateway.ls = Mock(side_effect=lambda cap: succeed(dict(listings[cap])))
+    gateway.set_children = Mock(return_value=succeed(None))
+    gateway.unlink = Mock(return_value=succeed(None))
+    return gateway
+
+
+@pytest.fixture
+def manager(fake_gateway, tmpdir):
+    tmpdir.mkdir("private")
+    rm = RootcapManager(fake_gateway)
+    rm.set_rootcap("URI:DIR2:rootcap")
+    return rm
+
+
+@ensureDeferred
+async def test_get_backups_uses_cached_listing(manager, fake_gateway):
+    await manager.get_backups(".magic-folders")
+    fake_gateway.ls.reset_mock()
+    backups = await manager.get_backups(".magic-folders")
+    assert "Test (personal)" in backups
+    assert fake_gateway.ls.call_count == 0
+
+
+@ensureDeferred
+async def test_get_backups_relists_after_listing_ttl(manager, fake_gateway):
+    manager.listing_ttl = 0
+    await manager.get_backups(".magic-folders")
+    fake_gateway.ls.reset_mock()
+    await manager.get_backups(".magic-folders")
+    assert fake_gateway.ls.call_count == 1
+
+
+@ensureDeferred
+async def test_add_backups_writes_through_to_cached_listing(
+    manager, fake_gateway
+):
+    await manager.get_backups(".magic-folders")
+    fake_gateway.ls.reset_mock()
+    await manager.add_backups(".magic-folders", {"New": "URI:DIR2:new"})
+    backup = await manager.get_backup(".magic-folders", "New")
+    assert (backup, fake_gateway.ls.call_count) == ("URI:DIR2:new", 0)
+
+
+@ensureDeferred
+async def test_remove_backups_writes_through_to_cached_listing(
+    manager, fake_gateway
+):
+    await manager.get_backups(".magic-folders")
+    await manager.remove_backups(".magic-folders", ["Test (personal)"])
+    assert await manager.get_backups(".magic-folders") == {}
+
+
+@ensureDeferred
+async def test_writes_to_different_directories_do_not_block(
+    manager, fake_gateway
+):
+    await manager.get_backup_cap(".magic-folders")
+    await manager.get_backup_cap(".zkapauthorizer")
+    pending = Deferred()
+    fake_gateway.set_children = Mock(return_value=pending)
+    Deferred.fromCoroutine(
+        manager.add_backup(".magic-folders", "A", "URI:DIR2:a")
+    )
+    fake_gateway.set_children = Mock(return_value=succeed(None))
+    d = Deferred.fromCoroutine(
+        manager.add_backup(".zkapauthorizer", "B", "URI:DIR2:b")
+    )
+    assert d.called
+    assert manager.busy
+    pending.callback(None)
+    assert not manager.busy
+
+
+@ensureDeferred
+async def test_reads_wait_for_pending_write_to_same_directory(
+    manager, fake_gateway
+):
+    await manager.get_backups(".magic-folders")
+    pending = Deferred()
+    fake_gateway.set_children = Mock(return_value=pending)
+    Deferred.fromCoroutine(
+        manager.add_backup(".magic-folders", "A", "URI:DIR2:a")
+    )
+    d = Deferred.fromCoroutine(manager.get_backups(".magic-folders"))
+    assert not d.called
+    pending.callback(None)
+    assert "A" in d.result
@@ -0,0 +1,154 @@
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.task import Clock
+
+from gridsync.scheduler import PollingTask, Scheduler, shared_scheduler
+
+
+def test_polling_task_backs_off_if_unchanged():
+    task = PollingTask(lambda: succeed(False), 2, 60)
+    task.update_interval(False)
+    task.update_interval(False)
+    assert task.interval == 8
+
+
+def test_polling_task_backoff_limited_to_max_interval():
+    task = PollingTask(lambda: succeed(False), 2, 5)
+    for _ in range(5):
+        task.update_interval(False)
+    assert task.interval == 5
+
+
+def test_polling_task_resets_interval_if_changed():
+    task = PollingTask(lambda: succeed(False), 2, 60)
+    task.update_interval(False)
+    task.update_interval(True)
+    assert task.interval == 2
+
+
+def test_polling_task_resets_interval_while_active():
+    task = PollingTask(lambda: succeed(False), 2, 60, is_active=lambda: True)
+    task.update_interval(False)
+    assert task.interval == 2
+
+
+def test_scheduler_runs_task_immediately():
+    calls = []
+    clock = Clock()
+    Scheduler(clock).add(lambda: succeed(calls.append(clock.seconds())))
+    clock.advance(0)
+    assert calls == [0]
+
+
+def test_scheduler_backs_off_unchanged_task():
+    calls = []
+    clock = Clock()
+    Scheduler(clock).add(lambda: succeed(calls.append(clock.seconds())), 2)
+    clock.pump([0] + [2] * 6)
+    assert calls == [0, 4, 12]
+
+
+def test_scheduler_runs_changed_task_at_min_interval():
+    calls = []
+    clock = Clock()
+
+    def check():
+        calls.append(clock.seconds())
+        return succeed(True)
+
+    Scheduler(clock).add(check, 2)
+    clock.pump([0, 2, 2, 2])
+    assert calls == [0, 2, 4, 6]
+
+
+def test_scheduler_uses_single_delayed_call():
+    clock = Clock()
+    scheduler = Scheduler(clock)
+    scheduler.add(lambda: succeed(False), 2)
+    scheduler.add(lambda: succeed(False), 3)
+    clock.advance(0)
+    assert len(clock.getDelayedCalls()) == 1
+
+
+def test_scheduler_does_not_overlap_runs_of_a_task():
+    pending = []
+    clock = Clock()
+
+    def check():
+        pending.append(Deferred())
+        return pending[-1]
+
+    Scheduler(clock).add(check, 2)
+    clock.pump([0, 2, 2])
+    assert len(pending) == 1
+
+
+def test_scheduler_runs_at_max_interval_while_paused():
+    calls = []
+    clock = Clock()
+    scheduler = Scheduler(clock)
+    scheduler.pause()
+    scheduler.add(lambda: succeed(calls.append(clock.seconds())), 2, 10)
+    clock.pump([0] + [1] * 20)
+    assert calls == [0, 10, 20]
+
+
+def test_scheduler_can_start_paused():
+    calls = []
+    clock = Clock()
+    scheduler = Scheduler(clock, paused=True)
+    scheduler.add(lambda: succeed(calls.append(clock.seconds())), 2, 10)
+    clock.pump([0] + [1] * 10)
+    assert calls == [0, 10]
+
+
+def test_shared_scheduler_starts_unpaused(monkeypatch):
+    # So that it backs off as usual if the main window is never shown
+    monkeypatch.setattr("gridsync.scheduler._shared_scheduler", None)
+    assert not shared_scheduler().paused
+
+
+def test_scheduler_resume_runs_tasks_immediately():
+    calls = []
+    clock = Clock()
+    scheduler = Scheduler(clock)
+    scheduler.pause()
+    scheduler.add(lambda: succeed(calls.append(clock.seconds())), 2, 10)
+    clock.pump([0, 1])
+    scheduler.resume()
+    clock.advance(0)
+    assert calls == [0, 1]
+
+
+def test_scheduler_wake_resets_interval():
+    calls = []
+    clock = Clock()
+    scheduler = Scheduler(clock)
+    task = scheduler.add(lambda: succeed(calls.append(clock.seconds())), 2)
+    clock.pump([0, 4, 1])
+    scheduler.wake(task)
+    clock.advance(0)
+    assert calls == [0, 4, 5]
+
+
+def test_scheduler_remove_stops_task():
+    calls = []
+    clock = Clock()
+    scheduler = Scheduler(clock)
+    task = scheduler.add(lambda: succeed(calls.append(clock.seconds())), 2)
+    clock.advance(0)
+    scheduler.remove(task)
+    clock.pump([2, 2])
+    assert calls == [0]
+
+
+def test_scheduler_backs_off_after_errors():
+    calls = []
+    clock = Clock()
+
+    def check():
+        calls.append(clock.seconds())
+        raise ValueError()
+
+    Scheduler(clock).add(check, 2)
+    clock.pump([0] + [2] * 6)
+    assert calls == [0, 4, 12]
@@ -642,12 +642,12 @@ async def test_ensure_recovery_create_rootcap_pass_on_error(
 async def test_join_folders_emit_joined_folders_signal(
     monkeypatch, qtbot, tmpdir
 ):
-    async def fake_link(self, dircap, name, childcap):
+    async def fake_set_children(self, dircap, children):
         return None
 
     monkeypatch.setattr(
-        "gridsync.tahoe.Tahoe.link",
-        fake_link,
+        "gridsync.tahoe.Tahoe.set_children",
+        fake_set_children,
     )
     sr = SetupRunner([])
     sr.gateway = Tahoe(str(tmpdir.mkdir("TestGrid")))
@@ -658,6 +658,34 @@ async def test_join_folders_emit_joined_folders_signal(
     assert blocker.args == [["TestFolder"]]
 
 
+@ensureDeferred
+async def test_join_folders_links_all_folders_at_once(monkeypatch, tmpdir):
+    calls = []
+
+    async def fake_set_children(self, dircap, children):
+        calls.append(children)
+
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.set_children",
+        fake_set_children,
+    )
+    sr = SetupRunner([])
+    sr.gateway = Tahoe(str(tmpdir.mkdir("TestGrid")))
+    folders_data = {
+        "TestFolder1": {"code": "URI:1+URI:2"},
+        "TestFolder2": {"code": "URI:3+URI:4"},
+    }
+    await Deferred.fromCoroutine(sr.join_folders(folders_data))
+    assert calls == [
+        {
+            "TestFolder1 (collective)": "URI:1",
+            "TestFolder1 (personal)": "URI:2",
+            "TestFolder2 (collective)": "URI:3",
+            "TestFolder2 (personal)": "URI:4",
+        }
+    ]
+
+
 @inlineCallbacks
 def test_run_raise_upgrade_required_error():
     sr = SetupRunner([])
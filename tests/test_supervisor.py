@@ -6,7 +6,6 @@ from twisted.internet import reactor
 from twisted.internet.task import deferLater
 
 from gridsync.supervisor import Supervisor
-from gridsync.util import until
 
 PROCESS_ARGS = [sys.executable, "-c", "while True: print('OK')"]
 
@@ -78,9 +77,26 @@ def test_supervisor_restarts_process_when_killed(tmp_path):
     supervisor = Supervisor(pidfile=pidfile, restart_delay=0)
     pid, _ = yield supervisor.start(PROCESS_ARGS, started_trigger="OK")
     reactor.callLater(0.1, Process(pid).kill)
-    yield until(supervisor.is_running, False)
-    yield until(supervisor.is_running, True)
-    assert True
+    yield supervisor.running.wait(False)
+    yield supervisor.running.wait(True)
+    assert supervisor.pid != pid
+    yield supervisor.stop()
+
+
+@inlineCallbacks
+def test_supervisor_running_flag_is_set_on_start(tmp_path):
+    supervisor = Supervisor(pidfile=tmp_path / "python.pid")
+    yield supervisor.start(PROCESS_ARGS, started_trigger="OK")
+    assert supervisor.running
+    yield supervisor.stop()
+
+
+@inlineCallbacks
+def test_supervisor_running_flag_is_cleared_on_stop(tmp_path):
+    supervisor = Supervisor(pidfile=tmp_path / "python.pid")
+    yield supervisor.start(PROCESS_ARGS, started_trigger="OK")
+    yield supervisor.stop()
+    assert not supervisor.running
 
 
 @inlineCallbacks
@@ -1,7 +1,17 @@
+import sys
+
 import pytest
+from pytest_twisted import ensureDeferred
+from twisted.internet.error import ProcessDone, ProcessTerminated
+from twisted.python.failure import Failure
 
 from gridsync.crypto import randstr
-from gridsync.system import which
+from gridsync.system import (
+    SubprocessError,
+    SubprocessProtocol,
+    get_version,
+    which,
+)
 
 
 def test_which():
@@ -12,3 +22,101 @@ def test_which():
 def test_which_raises_environment_error():
     with pytest.raises(EnvironmentError):
         which(randstr(32))
+
+
+def test_subprocess_protocol_reassembles_lines_split_across_reads():
+    lines = []
+    protocol = SubprocessProtocol(stderr_line_collector=lines.append)
+    for data in [b"fir", b"st\nsec", "ond \u2603".encode()[:-1], b"\x83\n"]:
+        protocol.childDataReceived(2, data)
+    assert lines == ["first", "second \u2603"]
+
+
+def test_subprocess_protocol_collects_unterminated_line_when_ended():
+    lines = []
+    protocol = SubprocessProtocol(stdout_line_collector=lines.append)
+    protocol.childDataReceived(1, b"one\r\ntwo")
+    protocol.processEnded(Failure(ProcessDone(0)))
+    assert lines == ["one", "two"]
+
+
+def test_subprocess_protocol_fires_on_earliest_trigger():
+    protocol = SubprocessProtocol(
+        callback_triggers=["ready"], errback_triggers=[("oops", ValueError)]
+    )
+    protocol.childDataReceived(1, b"oops\nready\n")
+    with pytest.raises(ValueError):
+        protocol.done.result.raiseException()
+    protocol.done.addErrback(lambda _: None)
+
+
+def test_subprocess_protocol_waits_for_whole_line_to_trigger():
+    protocol = SubprocessProtocol(callback_triggers=["client running"])
+    protocol.childDataReceived(1, b"client run")
+    assert not protocol.done.called
+    protocol.childDataReceived(1, b"ning\n")
+    assert protocol.done.result == "client running"
+
+
+def test_subprocess_protocol_keeps_most_recent_output():
+    protocol = SubprocessProtocol(max_output=10)
+    for i in range(100):
+        protocol.childDataReceived(2, b"%d\n" % i)
+    protocol.processEnded(Failure(ProcessTerminated(1)))
+    errors = []
+    protocol.done.addErrback(errors.append)
+    assert errors[0].check(SubprocessError)
+    assert str(errors[0].value) == "97\n98\n99"
+
+
+@pytest.fixture
+def fake_executable(tmp_path):
+    path = tmp_path / "fake-tahoe"
+    path.write_text(
+        f"#!{sys.executable}\nprint('fake-tahoe: 1.2.3')\n", encoding="utf-8"
+    )
+    path.chmod(0o755)
+    return path
+
+
+@ensureDeferred
+async def test_get_version_runs_executable(fake_executable):
+    version = await get_version(str(fake_executable))
+    assert version == "fake-tahoe: 1.2.3"
+
+
+@ensureDeferred
+async def test_get_version_reuses_cached_version(
+    fake_executable, tmp_path, monkeypatch
+):
+    cache_path = tmp_path / "versions.json"
+    await get_version(str(fake_executable), cache_path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Executable was run again")
+
+    monkeypatch.setattr("gridsync.system.reactor.spawnProcess", fail)
+    version = await get_version(str(fake_executable), cache_path)
+    assert version == "fake-tahoe: 1.2.3"
+
+
+@ensureDeferred
+async def test_get_version_reruns_executable_when_it_changes(
+    fake_executable, tmp_path
+):
+    cache_path = tmp_path / "versions.json"
+    await get_version(str(fake_executable), cache_path)
+    fake_executable.write_text(
+        f"#!{sys.executable}\nprint('fake-tahoe: 1.2.30')\n",
+        encoding="utf-8",
+    )
+    version = await get_version(str(fake_executable), cache_path)
+    assert version == "fake-tahoe: 1.2.30"
+
+
+@ensureDeferred
+async def test_get_version_ignores_corrupt_cache(fake_executable, tmp_path):
+    cache_path = tmp_path / "versions.json"
+    cache_path.write_text("{not json", encoding="utf-8")
+    version = await get_version(str(fake_executable), cache_path)
+    assert version == "fake-tahoe: 1.2.3"
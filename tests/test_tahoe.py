@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import json
 import os
 from pathlib import Path
 from typing import Awaitable, Callable, TypeVar
@@ -15,13 +16,17 @@ from pytest_twisted import ensureDeferred, inlineCallbacks
 from twisted.internet.defer import Deferred, succeed
 from twisted.internet.testing import MemoryReactorClock
 
+from gridsync.config import Config
 from gridsync.crypto import randstr
 from gridsync.errors import TahoeCommandError, TahoeError, TahoeWebError
 from gridsync.tahoe import (
     Tahoe,
+    get_log_histories,
+    get_log_redactors,
     get_nodedirs,
     is_valid_furl,
     storage_options_to_config,
+    write_servers_yaml,
 )
 from gridsync.zkapauthorizer import PLUGIN_NAME as ZKAPAUTHZ_PLUGIN_NAME
 
@@ -29,36 +34,42 @@ from gridsync.zkapauthorizer import PLUGIN_NAME as ZKAPAUTHZ_PLUGIN_NAME
 def fake_get(*args, **kwargs):
     response = MagicMock()
     response.code = 200
+    response.length = 0  # No body
     return succeed(response)
 
 
 def fake_get_code_500(*args, **kwargs):
     response = MagicMock()
     response.code = 500
+    response.length = 0  # No body
     return succeed(response)
 
 
 def fake_put(*args, **kwargs):
     response = MagicMock()
     response.code = 200
+    response.length = 0  # No body
     return succeed(response)
 
 
 def fake_put_code_500(*args, **kwargs):
     response = MagicMock()
     response.code = 500
+    response.length = 0  # No body
     return succeed(response)
 
 
 def fake_post(*args, **kwargs):
     response = MagicMock()
     response.code = 200
+    response.length = 0  # No body
     return succeed(response)
 
 
 def fake_post_code_500(*args, **kwargs):
     response = MagicMock()
     response.code = 500
+    response.length = 0  # No body
     return succeed(response)
 
 
@@ -136,6 +147,62 @@ def test_tahoe_set_streamedlogs_maxlen_from_config_txt(
     assert client.streamedlogs._buffer.maxlen == expected
 
 
+def test_get_log_histories_disabled_by_default():
+    assert get_log_histories("/nodedir", {"log_maxlen": "100"}) == {}
+
+
+def test_get_log_redactors_disabled_by_default():
+    assert get_log_redactors({"log_maxlen": "100"}, 100, {}) == {}
+
+
+def test_get_log_redactors_keep_filtered_histories():
+    settings = {"log_history_max_bytes": "1024", "redact_logs_at_ingest": "1"}
+    histories = get_log_histories("/nodedir", settings)
+    redactors = get_log_redactors(settings, 100, histories)
+    assert (
+        redactors["tahoe"].buffer.history,
+        redactors["magic-folder"].buffer.maxlen,
+    ) == (histories["tahoe-filtered"], 100)
+
+
+def test_iter_filtered_streamed_log_messages_uses_gateway_identifier(
+    monkeypatch,
+):
+    monkeypatch.setattr(
+        "gridsync.tahoe.global_settings",
+        {"debug": {"redact_logs_at_ingest": "true"}},
+    )
+    client = Tahoe()
+    client.streamedlogs.add_message(
+        b'{"action_type": "magic-folder:stop", "nickname": "TestGrid"}'
+    )
+    assert list(client.iter_filtered_streamed_log_messages("2")) == [
+        '{"action_type": "magic-folder:stop", '
+        '"nickname": "<Filtered:GatewayName:2>"}'
+    ]
+
+
+def test_iter_filtered_streamed_log_messages_none_if_not_filtered():
+    assert Tahoe().iter_filtered_streamed_log_messages("1") is None
+
+
+def test_get_log_histories_kept_in_private_logs_dir():
+    histories = get_log_histories(
+        "/nodedir",
+        {"log_history_max_bytes": "1024", "log_history_max_age": "60"},
+    )
+    assert histories["tahoe"].directory == Path(
+        "/nodedir", "private", "logs", "tahoe"
+    )
+    assert (
+        histories["magic-folder"].max_bytes,
+        histories["tahoe"].max_age,
+    ) == (
+        1024,
+        60.0,
+    )
+
+
 def test_tahoe_load_newscap_from_global_settings(tahoe, monkeypatch):
     global_settings = {
         "news:{}".format(tahoe.name): {"newscap": "URI:NewscapFromSettings"}
@@ -235,6 +302,48 @@ def test_add_storage_servers(tmpdir):
     assert client.get_storage_servers() == storage_servers
 
 
+def test_add_storage_servers_writes_each_file_once(tmpdir, monkeypatch):
+    nodedir = str(tmpdir.mkdir("TestGrid"))
+    os.makedirs(os.path.join(nodedir, "private"))
+    client = Tahoe(nodedir)
+    client.add_storage_server("v0-old", "pb://old")
+    writes = []
+    monkeypatch.setattr(
+        "gridsync.tahoe.write_servers_yaml",
+        lambda path, data, write=write_servers_yaml: writes.append(path)
+        or write(path, data),
+    )
+    monkeypatch.setattr(
+        "gridsync.config.Config.save",
+        lambda self, settings, save=Config.save: writes.append(self.filename)
+        or save(self, settings),
+    )
+    storage_servers = {
+        f"v0-{i}": {
+            "anonymous-storage-FURL": f"pb://{i}",
+            "storage-options": [
+                {"name": ZKAPAUTHZ_PLUGIN_NAME, "ristretto-issuer-root-url": i}
+            ],
+        }
+        for i in range(50)
+    }
+    client.add_storage_servers(storage_servers)
+    assert sorted(writes) == sorted(
+        [client.servers_yaml_path, client.config.filename]
+    )
+    assert len(client.get_storage_servers()) == 51
+
+
+def test_config_transaction_not_committed_on_error(tahoe):
+    with pytest.raises(ValueError):
+        with tahoe.config_transaction() as transaction:
+            transaction.add_storage_server("v0-ccc", "pb://c.c")
+            transaction.config_set("node", "nickname", "Carol")
+            raise ValueError()
+    assert "v0-ccc" not in tahoe.get_storage_servers()
+    assert tahoe.config_get("node", "nickname") != "Carol"
+
+
 def test_add_storage_servers_no_add_missing_furl(tmpdir):
     nodedir = str(tmpdir.mkdir("TestGrid"))
     os.makedirs(os.path.join(nodedir, "private"))
@@ -492,6 +601,14 @@ async def test_tahoe_stop_kills_pid_in_pidfile(tahoe, monkeypatch):
     assert fake_process.call_args[0][0] == 4194305
 
 
+@ensureDeferred
+async def test_tahoe_stop_stops_log_redactors(tahoe):
+    redactor = Mock()
+    tahoe.log_redactors = {"tahoe": redactor}
+    await tahoe.stop()
+    assert redactor.stop.call_count == 1
+
+
 @pytest.mark.parametrize("locked,call_count", [(True, 1), (False, 0)])
 @ensureDeferred
 async def test_tahoe_stop_locked(locked, call_count, tahoe, monkeypatch):
@@ -594,7 +711,7 @@ def fake_awaitable_method(value: T) -> Callable[[], Awaitable[T]]:
 def test_is_ready_false_not_connected_servers(tahoe, monkeypatch):
     tahoe.shares_happy = 7
     monkeypatch.setattr(
-        "gridsync.tahoe.Tahoe.get_connected_servers",
+        "gridsync.tahoe.Tahoe.get_grid_status",
         fake_awaitable_method(None),
     )
     output = yield Deferred.fromCoroutine(tahoe.is_ready())
@@ -605,8 +722,8 @@ def test_is_ready_false_not_connected_servers(tahoe, monkeypatch):
 def test_is_ready_true(tahoe, monkeypatch):
     tahoe.shares_happy = 7
     monkeypatch.setattr(
-        "gridsync.tahoe.Tahoe.get_connected_servers",
-        fake_awaitable_method(10),
+        "gridsync.tahoe.Tahoe.get_grid_status",
+        fake_awaitable_method((10, 10, 0)),
     )
     output = yield Deferred.fromCoroutine(tahoe.is_ready())
     assert output is True
@@ -616,8 +733,8 @@ def test_is_ready_true(tahoe, monkeypatch):
 def test_is_ready_false_connected_less_than_happy(tahoe, monkeypatch):
     tahoe.shares_happy = 7
     monkeypatch.setattr(
-        "gridsync.tahoe.Tahoe.get_connected_servers",
-        fake_awaitable_method(3),
+        "gridsync.tahoe.Tahoe.get_grid_status",
+        fake_awaitable_method((3, 10, 0)),
     )
     output = yield Deferred.fromCoroutine(tahoe.is_ready())
     assert output is False
@@ -625,6 +742,7 @@ def test_is_ready_false_connected_less_than_happy(tahoe, monkeypatch):
 
 @inlineCallbacks
 def test_await_ready(tahoe, monkeypatch):
+    tahoe.node_started.set()
     monkeypatch.setattr(
         "gridsync.tahoe.Tahoe.is_ready", fake_awaitable_method(True)
     )
@@ -632,6 +750,63 @@ def test_await_ready(tahoe, monkeypatch):
     assert True
 
 
+def test_await_ready_uses_cached_readiness(tahoe, monkeypatch):
+    tahoe.shares_happy = 1
+    monkeypatch.setattr("treq.get", fake_get)
+    monkeypatch.setattr(
+        "treq.content",
+        lambda _: succeed(
+            b'{"servers": [{"connection_status": "Connected", '
+            b'"available_space": 0}]}'
+        ),
+    )
+    Deferred.fromCoroutine(tahoe.get_grid_status())
+    monkeypatch.setattr("gridsync.tahoe.Tahoe.is_ready", Mock())
+    assert tahoe.await_ready().result is True
+    assert tahoe.is_ready.call_count == 0
+
+
+def test_await_ready_polls_after_ready_ttl_expires(tahoe, monkeypatch):
+    tahoe.node_started.set()
+    tahoe._last_ready = 0.0
+    tahoe.ready_ttl = 0
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.is_ready", fake_awaitable_method(True)
+    )
+    tahoe._ready_poller.wait_for_completion = Mock()
+    tahoe.await_ready()
+    assert tahoe._ready_poller.wait_for_completion.call_count == 1
+
+
+@pytest.mark.parametrize("age,polls", [(100, 0), (130, 1)])
+def test_await_ready_ttl_outlasts_monitor_max_interval(
+    tahoe, monkeypatch, age, polls
+):
+    tahoe.node_started.set()
+    tahoe.monitor.max_interval = 60
+    monkeypatch.setattr("gridsync.tahoe.monotonic", lambda: 1000.0)
+    tahoe._last_ready = 1000.0 - age
+    tahoe._ready_poller.wait_for_completion = Mock()
+    tahoe.await_ready()
+    assert tahoe._ready_poller.wait_for_completion.call_count == polls
+
+
+def test_await_ready_does_not_poll_until_node_has_started(tahoe):
+    tahoe._ready_poller.wait_for_completion = Mock(return_value=succeed(None))
+    d = tahoe.await_ready()
+    assert tahoe._ready_poller.wait_for_completion.call_count == 0
+    tahoe.node_started.set()
+    assert tahoe._ready_poller.wait_for_completion.call_count == 1
+    assert d.called
+
+
+def test_get_grid_status_clears_cached_readiness_on_error(tahoe, monkeypatch):
+    tahoe._last_ready = 0.0
+    monkeypatch.setattr("treq.get", fake_get_code_500)
+    Deferred.fromCoroutine(tahoe.get_grid_status())
+    assert tahoe._last_ready is None
+
+
 @inlineCallbacks
 def test_concurrent_await_ready(tahoe, monkeypatch):
     """
@@ -642,6 +817,7 @@ def test_concurrent_await_ready(tahoe, monkeypatch):
     # anything.  Replace it with a scheduler we control.
     clock = MemoryReactorClock()
     tahoe._ready_poller.clock = clock
+    tahoe.node_started.set()
 
     @inlineCallbacks
     def measure_poll_count(how_many_waiters):
@@ -792,6 +968,41 @@ async def test_tahoe_link_fail_code_500(tahoe, monkeypatch):
         await tahoe.link("test_dircap", "test_childname", "test_childcap")
 
 
+@ensureDeferred
+async def test_tahoe_set_children_sends_single_request(tahoe, monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    fake = Mock(side_effect=fake_post)
+    monkeypatch.setattr("treq.post", fake)
+    await tahoe.set_children("URI:DIR2:aaa", {"a": "URI:1", "b": "URI:2"})
+    assert fake.call_count == 1
+    assert "t=set_children" in fake.call_args[0][0]
+    assert json.loads(fake.call_args[1]["data"]) == {
+        "a": ["unknown", {"rw_uri": "URI:1"}],
+        "b": ["unknown", {"rw_uri": "URI:2"}],
+    }
+
+
+@ensureDeferred
+async def test_tahoe_set_children_no_children_no_request(tahoe, monkeypatch):
+    fake = Mock(side_effect=fake_post)
+    monkeypatch.setattr("treq.post", fake)
+    await tahoe.set_children("URI:DIR2:aaa", {})
+    assert fake.call_count == 0
+
+
+@ensureDeferred
+async def test_tahoe_set_children_fail_code_500(tahoe, monkeypatch):
+    monkeypatch.setattr(
+        "gridsync.tahoe.Tahoe.await_ready", lambda _: succeed(None)
+    )
+    monkeypatch.setattr("treq.post", fake_post_code_500)
+    monkeypatch.setattr("treq.content", lambda _: succeed(b"test content"))
+    with pytest.raises(TahoeWebError):
+        await tahoe.set_children("URI:DIR2:aaa", {"a": "URI:1"})
+
+
 @ensureDeferred
 async def test_tahoe_unlink(tahoe, monkeypatch):
     monkeypatch.setattr(
@@ -3,11 +3,19 @@
 from binascii import hexlify, unhexlify
 
 import pytest
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.task import Clock
 
 from gridsync.util import (
+    Batcher,
+    Flag,
+    JSONArrayParser,
+    PhaseTimer,
+    ReadWriteLock,
     b58decode,
     b58encode,
     humanized_list,
+    map_bounded,
     strip_html_tags,
     to_bool,
 )
@@ -102,3 +110,255 @@ def test_humanized_list(items, kind, humanized):
 )
 def test_strip_html_tags(s, expected):
     assert strip_html_tags(s) == expected
+
+
+def test_batcher_delivers_items_after_interval():
+    clock = Clock()
+    batches = []
+    batcher = Batcher(clock, batches.append, interval=1)
+    batcher.add("a")
+    batcher.add("b")
+    clock.advance(1)
+    assert batches == [["a", "b"]]
+
+
+def test_batcher_does_not_deliver_before_interval():
+    clock = Clock()
+    batches = []
+    batcher = Batcher(clock, batches.append, interval=1)
+    batcher.add("a")
+    clock.advance(0.5)
+    assert batches == []
+
+
+def test_batcher_delivers_items_at_max_size():
+    clock = Clock()
+    batches = []
+    batcher = Batcher(clock, batches.append, max_size=2)
+    batcher.add("a")
+    batcher.add("b")
+    batcher.add("c")
+    assert (batches, clock.getDelayedCalls()[0].active()) == (
+        [["a", "b"]],
+        True,
+    )
+
+
+def test_batcher_flush_cancels_scheduled_delivery():
+    clock = Clock()
+    batches = []
+    batcher = Batcher(clock, batches.append)
+    batcher.add("a")
+    batcher.flush()
+    assert (batches, clock.getDelayedCalls()) == ([["a"]], [])
+
+
+def test_json_array_parser_yields_elements_across_chunks():
+    parser = JSONArrayParser()
+    elements = parser.feed(b'[{"a": 1}, {"b"')
+    elements += parser.feed(b": 2}]")
+    assert elements + parser.close() == [{"a": 1}, {"b": 2}]
+
+
+def test_json_array_parser_handles_split_utf8_sequences():
+    data = '["é"]'.encode("utf-8")
+    parser = JSONArrayParser()
+    elements = parser.feed(data[:3]) + parser.feed(data[3:])
+    assert elements + parser.close() == ["é"]
+
+
+def test_json_array_parser_waits_for_terminated_scalars():
+    parser = JSONArrayParser()
+    elements = parser.feed(b"[12")
+    elements += parser.feed(b"3]")
+    assert elements + parser.close() == [123]
+
+
+@pytest.mark.parametrize("data", [b"{}", b"[1 2]", b"[1, 2"])
+def test_json_array_parser_raises_value_error_if_malformed(data):
+    parser = JSONArrayParser()
+    with pytest.raises(ValueError):
+        parser.feed(data)
+        parser.close()
+
+
+def test_map_bounded_returns_results_in_order():
+    pending = {}
+
+    def f(item):
+        pending[item] = Deferred()
+        return pending[item]
+
+    d = Deferred.fromCoroutine(map_bounded(f, ["a", "b"]))
+    pending["b"].callback("B")
+    pending["a"].callback("A")
+    assert d.result == ["A", "B"]
+
+
+def test_map_bounded_limits_concurrent_calls():
+    pending = []
+
+    def f(item):
+        pending.append(Deferred())
+        return pending[-1]
+
+    Deferred.fromCoroutine(map_bounded(f, range(5), limit=2))
+    assert len(pending) == 2
+
+
+def test_map_bounded_starts_next_call_when_one_completes():
+    pending = []
+
+    def f(item):
+        pending.append(Deferred())
+        return pending[-1]
+
+    Deferred.fromCoroutine(map_bounded(f, range(5), limit=2))
+    pending[0].callback(None)
+    assert len(pending) == 3
+
+
+def test_map_bounded_accepts_coroutine_functions():
+    async def f(item):
+        return item * 2
+
+    d = Deferred.fromCoroutine(map_bounded(f, [1, 2]))
+    assert d.result == [2, 4]
+
+
+def test_map_bounded_raises_first_failure():
+    def f(item):
+        if item == 2:
+            raise ValueError(item)
+        return succeed(item)
+
+    d = Deferred.fromCoroutine(map_bounded(f, [1, 2, 3]))
+    failures = []
+    d.addErrback(failures.append)
+    assert failures[0].check(ValueError)
+
+
+def test_map_bounded_cancels_remaining_calls_on_failure():
+    pending = []
+
+    def f(item):
+        pending.append(Deferred())
+        return pending[-1]
+
+    d = Deferred.fromCoroutine(map_bounded(f, range(5), limit=2))
+    failures = []
+    d.addErrback(failures.append)
+    pending[0].errback(ValueError())
+    assert (
+        failures[0].check(ValueError),
+        len(pending),
+        pending[1].called,
+    ) == (ValueError, 2, True)
+    pending[1].addErrback(lambda _: None)
+
+
+def test_read_write_lock_allows_concurrent_readers():
+    lock = ReadWriteLock()
+    d1 = lock.acquire_read()
+    d2 = lock.acquire_read()
+    assert d1.called and d2.called
+    assert lock.readers == 2
+
+
+def test_read_write_lock_writer_waits_for_readers():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    d = lock.acquire_write()
+    assert not d.called
+    lock.release_read()
+    assert d.called
+    assert lock.writing
+
+
+def test_read_write_lock_readers_queue_behind_waiting_writer():
+    lock = ReadWriteLock()
+    lock.acquire_read()
+    write = lock.acquire_write()
+    read = lock.acquire_read()
+    assert not read.called
+    lock.release_read()
+    assert write.called and not read.called
+    lock.release_write()
+    assert read.called
+    assert not lock.writing
+
+
+def test_read_write_lock_not_locked_when_released():
+    lock = ReadWriteLock()
+    lock.acquire_write()
+    lock.release_write()
+    assert not lock.locked
+
+
+def test_flag_wait_returns_immediately_if_already_set():
+    flag = Flag(True)
+    assert flag.wait().called
+
+
+def test_flag_wait_fires_when_set():
+    flag = Flag()
+    d = flag.wait()
+    assert not d.called
+    flag.set()
+    assert d.called
+
+
+def test_flag_wait_for_false_fires_when_cleared():
+    flag = Flag(True)
+    d = flag.wait(False)
+    flag.set()
+    assert not d.called
+    flag.clear()
+    assert d.called
+
+
+def test_flag_cancelled_waiter_is_not_fired():
+    flag = Flag()
+    d = flag.wait()
+    d.addErrback(lambda _: None)
+    d.cancel()
+    flag.set()
+    assert flag._waiting[True] == []
+
+
+def test_flag_does_not_wake_waiters_if_changed_back_by_callback():
+    flag = Flag()
+    first = flag.wait()
+    first.addCallback(lambda _: flag.clear())
+    second = flag.wait()
+    flag.set()
+    assert first.called and not second.called
+    flag.set()
+    assert second.called
+
+
+def test_phase_timer_records_first_time_each_phase_is_reached(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("gridsync.util.time", lambda: now[0])
+    timer = PhaseTimer("test")
+    timer.start()
+    now[0] = 101.5
+    timer.mark("spawn", when=100.25)
+    timer.mark("trigger")
+    now[0] = 103.0
+    timer.mark("trigger")  # E.g., after a restart
+    assert timer.report() == "spawn 0.250s, trigger 1.500s"
+
+
+def test_phase_timer_ignores_marks_before_start():
+    timer = PhaseTimer("test")
+    timer.mark("spawn")
+    assert timer.phases == {}
+
+
+def test_phase_timer_start_at_given_time(monkeypatch):
+    monkeypatch.setattr("gridsync.util.time", lambda: 110.0)
+    timer = PhaseTimer("test")
+    timer.start(when=100.0)
+    timer.mark("imports done")
+    assert timer.report() == "imports done 10.000s"
@@ -3,6 +3,7 @@ from unittest.mock import Mock
 
 import pytest
 from pytest_twisted import inlineCallbacks
+from twisted.internet.defer import succeed
 
 from gridsync.tahoe import TahoeWebError
 from gridsync.zkapauthorizer import PLUGIN_NAME, ZKAPAuthorizer
@@ -12,14 +13,14 @@ def fake_treq_request_resp_code_200(*args, **kwargs):
     fake_resp = Mock()
     fake_resp.code = 200
     fake_resp.content = Mock(return_value=b"")
-    fake_request = Mock(return_value=fake_resp)
+    fake_request = Mock(return_value=succeed(fake_resp))
     return fake_request
 
 
 def fake_treq_request_resp_code_500(*args, **kwargs):
     fake_resp = Mock()
     fake_resp.code = 500
-    fake_request = Mock(return_value=fake_resp)
+    fake_request = Mock(return_value=succeed(fake_resp))
     return fake_request
 
 
@@ -27,7 +28,7 @@ def fake_treq_request_resp_code_500(*args, **kwargs):
 def test__request_url(tahoe, monkeypatch):
     fake_request = fake_treq_request_resp_code_200()
     monkeypatch.setattr("treq.request", fake_request)
-    monkeypatch.setattr("treq.content", lambda _: b"")
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
     yield ZKAPAuthorizer(tahoe)._request("GET", "/test")
     assert fake_request.call_args[0][1] == (
         tahoe.nodeurl + f"storage-plugins/{PLUGIN_NAME}/test"
@@ -38,7 +39,7 @@ def test__request_url(tahoe, monkeypatch):
 def test__request_headers(tahoe, monkeypatch):
     fake_request = fake_treq_request_resp_code_200()
     monkeypatch.setattr("treq.request", fake_request)
-    monkeypatch.setattr("treq.content", lambda _: b"")
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
     yield ZKAPAuthorizer(tahoe)._request("GET", "/test")
     assert fake_request.call_args[1]["headers"] == {
         "Authorization": f"tahoe-lafs {tahoe.api_token}",
@@ -49,7 +50,7 @@ def test__request_headers(tahoe, monkeypatch):
 @inlineCallbacks
 def test_add_voucher_with_voucher(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_200())
-    monkeypatch.setattr("treq.content", lambda _: b"")
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
     result = yield ZKAPAuthorizer(tahoe).add_voucher("Test1234")
     assert result == "Test1234"
 
@@ -57,7 +58,7 @@ def test_add_voucher_with_voucher(tahoe, monkeypatch):
 @inlineCallbacks
 def test_add_voucher_without_voucher(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_200())
-    monkeypatch.setattr("treq.content", lambda _: b"")
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
     result = yield ZKAPAuthorizer(tahoe).add_voucher()
     assert len(result) == 44
 
@@ -65,7 +66,7 @@ def test_add_voucher_without_voucher(tahoe, monkeypatch):
 @inlineCallbacks
 def test_add_voucher_raise_tahoe_web_error(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_500())
-    monkeypatch.setattr("treq.content", lambda _: b"")
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
     with pytest.raises(TahoeWebError):
         yield ZKAPAuthorizer(tahoe).add_voucher()
 
@@ -73,7 +74,7 @@ def test_add_voucher_raise_tahoe_web_error(tahoe, monkeypatch):
 @inlineCallbacks
 def test_get_voucher(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_200())
-    monkeypatch.setattr("treq.content", lambda _: b'{"A": "A"}')
+    monkeypatch.setattr("treq.content", lambda _: succeed(b'{"A": "A"}'))
     result = yield ZKAPAuthorizer(tahoe).get_voucher("Test1234")
     assert result == {"A": "A"}
 
@@ -81,7 +82,7 @@ def test_get_voucher(tahoe, monkeypatch):
 @inlineCallbacks
 def test_get_voucher_raise_tahoe_web_error(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_500())
-    monkeypatch.setattr("treq.content", lambda _: b"")
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
     with pytest.raises(TahoeWebError):
         yield ZKAPAuthorizer(tahoe).get_voucher("Test1234")
 
@@ -90,7 +91,8 @@ def test_get_voucher_raise_tahoe_web_error(tahoe, monkeypatch):
 def test_get_vouchers(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_200())
     monkeypatch.setattr(
-        "treq.content", lambda _: b'{"vouchers": [{"A": "A"}, {"B": "B"}]}'
+        "treq.content",
+        lambda _: succeed(b'{"vouchers": [{"A": "A"}, {"B": "B"}]}'),
     )
     result = yield ZKAPAuthorizer(tahoe).get_vouchers()
     assert result == [{"A": "A"}, {"B": "B"}]
@@ -99,7 +101,7 @@ def test_get_vouchers(tahoe, monkeypatch):
 @inlineCallbacks
 def test_get_vouchers_raise_tahoe_web_error(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_500())
-    monkeypatch.setattr("treq.content", lambda _: b"")
+    monkeypatch.setattr("treq.content", lambda _: succeed(b""))
     with pytest.raises(TahoeWebError):
         yield ZKAPAuthorizer(tahoe).get_vouchers()
 
@@ -139,7 +141,7 @@ def test_zkap_payment_url_empty_zkap_payment_root_url(tahoe):
 def test__get_content(tahoe, monkeypatch):
     monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", Mock())
     monkeypatch.setattr("treq.get", fake_treq_request_resp_code_200())
-    monkeypatch.setattr("treq.content", Mock(return_value=b"test"))
+    monkeypatch.setattr("treq.content", lambda _: succeed(b"test"))
     result = yield ZKAPAuthorizer(tahoe)._get_content("URI:TEST")
     assert result == b"test"
 
@@ -148,7 +150,7 @@ def test__get_content(tahoe, monkeypatch):
 def test__get_content_raise_tahoe_web_error(tahoe, monkeypatch):
     monkeypatch.setattr("gridsync.tahoe.Tahoe.await_ready", Mock())
     monkeypatch.setattr("treq.get", fake_treq_request_resp_code_500())
-    monkeypatch.setattr("treq.content", Mock(return_value=b"test"))
+    monkeypatch.setattr("treq.content", lambda _: succeed(b"test"))
     with pytest.raises(TahoeWebError):
         yield ZKAPAuthorizer(tahoe)._get_content("URI:TEST")
 
@@ -156,6 +158,125 @@ def test__get_content_raise_tahoe_web_error(tahoe, monkeypatch):
 @inlineCallbacks
 def test_get_version(tahoe, monkeypatch):
     monkeypatch.setattr("treq.request", fake_treq_request_resp_code_200())
-    monkeypatch.setattr("treq.content", Mock(return_value=b'{"version": "9"}'))
+    monkeypatch.setattr("treq.content", lambda _: succeed(b'{"version": "9"}'))
     result = yield ZKAPAuthorizer(tahoe).get_version()
     assert result == "9"
+
+
+ROOTCAP_JSON = (
+    b'["dirnode", {"children": {'
+    b'"a": ["dirnode", {"rw_uri": "URI:A"}], '
+    b'"b": ["dirnode", {"ro_uri": "URI:B"}]}}]'
+)
+DIRCAP_JSON = b'["dirnode", {"children": {"x": ["filenode", {"size": 5}]}}]'
+
+
+@pytest.fixture()
+def fake_caps(tahoe, monkeypatch):
+    contents = {"URI:ROOT/?t=json": ROOTCAP_JSON, "URI:A/?t=json": DIRCAP_JSON}
+    requested = []
+
+    def get_content(_, cap):
+        requested.append(cap)
+        return succeed(contents[cap])
+
+    async def get_folders():
+        return {"TestFolder": {}}
+
+    async def get_object_sizes(folder_name):
+        requested.append(folder_name)
+        return [7]
+
+    monkeypatch.setattr(tahoe, "get_rootcap", lambda: "URI:ROOT")
+    monkeypatch.setattr(ZKAPAuthorizer, "_get_content", get_content)
+    tahoe.magic_folder.get_folders = get_folders
+    tahoe.magic_folder.get_object_sizes = get_object_sizes
+    return requested
+
+
+@inlineCallbacks
+def test_get_sizes(tahoe, fake_caps):
+    sizes = yield ZKAPAuthorizer(tahoe).get_sizes()
+    assert sizes == [len(ROOTCAP_JSON), len(DIRCAP_JSON), 5, 7]
+
+
+@inlineCallbacks
+def test_get_sizes_uses_cache(tahoe, fake_caps):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    yield zkapauthorizer.get_sizes()
+    fake_caps.clear()
+    yield zkapauthorizer.get_sizes()
+    assert fake_caps == []
+
+
+@inlineCallbacks
+def test_get_sizes_refetches_invalidated_dircap(tahoe, fake_caps):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    yield zkapauthorizer.get_sizes()
+    fake_caps.clear()
+    zkapauthorizer.invalidate_dircap("URI:A")
+    yield zkapauthorizer.get_sizes()
+    assert fake_caps == ["URI:A/?t=json"]
+
+
+@inlineCallbacks
+def test_get_sizes_refetches_expired_listings(tahoe, fake_caps):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    yield zkapauthorizer.get_sizes()
+    fake_caps.clear()
+    zkapauthorizer.listing_ttl = 0
+    yield zkapauthorizer.get_sizes()
+    assert sorted(fake_caps) == ["URI:A/?t=json", "URI:ROOT/?t=json"]
+
+
+@inlineCallbacks
+def test_get_sizes_refetches_invalidated_folder(tahoe, fake_caps):
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    yield zkapauthorizer.get_sizes()
+    fake_caps.clear()
+    zkapauthorizer.invalidate_folder("TestFolder")
+    yield zkapauthorizer.get_sizes()
+    assert fake_caps == ["TestFolder"]
+
+
+@inlineCallbacks
+def test_get_sizes_raises_first_error_if_both_branches_fail(
+    tahoe, fake_caps, monkeypatch
+):
+    def get_content(_, cap):
+        if cap == "URI:ROOT/?t=json":
+            return succeed(ROOTCAP_JSON)
+        raise TahoeWebError("Rootcap traversal failed")
+
+    async def get_folders():
+        raise ValueError("Magic-Folder failed")
+
+    monkeypatch.setattr(ZKAPAuthorizer, "_get_content", get_content)
+    tahoe.magic_folder.get_folders = get_folders
+    with pytest.raises(TahoeWebError, match="Rootcap traversal failed"):
+        yield ZKAPAuthorizer(tahoe).get_sizes()
+
+
+@inlineCallbacks
+def test_get_sizes_raises_if_rootcap_listing_is_malformed(
+    tahoe, fake_caps, monkeypatch
+):
+    monkeypatch.setattr(
+        ZKAPAuthorizer, "_get_content", lambda *_: succeed(b"Not JSON")
+    )
+    with pytest.raises(ValueError):
+        yield ZKAPAuthorizer(tahoe).get_sizes()
+
+
+@inlineCallbacks
+def test_get_price_skips_calculation_if_sizes_unchanged(
+    tahoe, fake_caps, monkeypatch
+):
+    fake_calculate_price = Mock(return_value=succeed({"price": 1}))
+    monkeypatch.setattr(
+        ZKAPAuthorizer, "calculate_price", lambda _, s: fake_calculate_price(s)
+    )
+    zkapauthorizer = ZKAPAuthorizer(tahoe)
+    yield zkapauthorizer.get_price()
+    price = yield zkapauthorizer.get_price()
+    assert (price, fake_calculate_price.call_count) == ({"price": 1}, 1)